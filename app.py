@@ -1,34 +1,778 @@
 from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for
+from queue import LifoQueue, Empty
+from flask import Flask, render_template, request, redirect, url_for, g, jsonify, has_request_context, stream_with_context
+from urllib.parse import urlencode
+import base64
+import click
+import csv
+import functools
+import glob
+import hashlib
+import io
+import itertools
+import json
+import os
+import re
 import sqlite3
+import threading
 
 app = Flask(__name__)
 
 DATABASE = "student_support_center.db"
 
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE)
-    conn.row_factory = sqlite3.Row  # access columns by name
-    return conn
+# Connection pool sizing. Requests that find every connection checked out
+# wait up to DB_POOL_TIMEOUT seconds for one to be handed back.
+DB_POOL_SIZE = 8
+DB_POOL_TIMEOUT = 10
+
+# Storage mode. In WAL mode readers never block behind the writer, and with
+# synchronous=NORMAL commits only append to the WAL (fsync happens at checkpoint
+# time), so back-to-back write transactions share a single sync.
+DB_WAL_MODE = True
+DB_SYNCHRONOUS = "NORMAL"
+DB_MMAP_SIZE = 256 * 1024 * 1024  # bytes
+DB_CACHE_SIZE = -16000  # negative = KiB per connection
+DB_BUSY_TIMEOUT = 5000  # ms
+
+# An item the student hasn't reported back on counts as overdue after this many days
+OVERDUE_AFTER_DAYS = 14
+
+# The SQL console page shows at most this many rows of a result; its CSV download has no cap
+SQL_CONSOLE_ROW_LIMIT = 1000
+STREAM_BUFFER = 200  # template pieces per chunk of a streamed page
+
+
+class ConnectionPool:
+    """
+    Bounded pool of SQLite connections shared by all request threads.
+    Connections are opened lazily (up to `size`), configured once when they are
+    opened, and reused afterwards so requests skip the connect/setup cost.
+    A read-only pool opens `mode=ro` URI connections; a pool of size 1 is a
+    single serialized connection (used for the writer).
+    """
+
+    def __init__(self, database, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, readonly=False):
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.readonly = readonly
+        self._idle = LifoQueue()  # most recently used first -> warm page cache
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._stats = {"checkouts": 0, "hits": 0, "waits": 0, "timeouts": 0}
+
+    def _connect(self):
+        if self.readonly:
+            conn = sqlite3.connect(f"file:{self.database}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.database, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # access columns by name
+
+        # Per-connection setup, done once for the lifetime of the pooled connection
+        conn.execute(f"PRAGMA busy_timeout = {int(DB_BUSY_TIMEOUT)}")
+        conn.execute(f"PRAGMA cache_size = {int(DB_CACHE_SIZE)}")
+        conn.execute(f"PRAGMA mmap_size = {int(DB_MMAP_SIZE)}")
+        if not self.readonly:
+            if DB_WAL_MODE:
+                conn.execute("PRAGMA journal_mode = WAL")  # persistent, stored in the db file
+            conn.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS}")
+        if app.config.get("CAPTURE_SQL"):
+            conn.set_trace_callback(capture_sql)
+        return conn
+
+    def acquire(self):
+        with self._lock:
+            self._stats["checkouts"] += 1
+            try:
+                conn = self._idle.get_nowait()
+                self._stats["hits"] += 1
+                return conn
+            except Empty:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+                else:
+                    self._stats["waits"] += 1
+
+        if can_open:
+            try:
+                return self._connect()
+            except sqlite3.Error:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        # Pool exhausted: block until another request releases a connection
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except Empty:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise RuntimeError("Timed out waiting for a database connection")
+
+    def release(self, conn):
+        # Never hand a half-finished transaction to the next request
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    def stats(self):
+        with self._lock:
+            idle = self._idle.qsize()
+            return dict(
+                self._stats,
+                size=self.size,
+                opened=self._opened,
+                idle=idle,
+                in_use=self._opened - idle,
+            )
+
+
+# All writes go through one connection, so write requests are serialized in-process
+# and never fight each other for the database lock. Reads use the read-only pool.
+writer = ConnectionPool(DATABASE, size=1)
+readers = ConnectionPool(DATABASE, size=DB_POOL_SIZE, readonly=True)
+
+
+# ---------- SCHEMA MIGRATIONS ----------
+# create.sql + insert.sql build the base schema; every later schema change lives in
+# migrations/NNN_name.sql. PRAGMA user_version records the last migration applied.
+MIGRATIONS_DIR = os.path.join(app.root_path, "migrations")
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+
+def apply_migrations(conn):
+    """Run every migration newer than PRAGMA user_version, each in its own transaction."""
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    applied = []
+    for name in sorted(os.listdir(MIGRATIONS_DIR)):
+        if not name.endswith(".sql"):
+            continue
+        version = int(name.split("_", 1)[0])
+        if version <= current:
+            continue
+
+        with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+            script = f.read()
+        try:
+            conn.executescript(f"BEGIN IMMEDIATE;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        applied.append(name)
+    return applied
+
+
+def ensure_schema():
+    """
+    Apply pending migrations the first time a request needs the database. The check runs
+    once per process whatever it finds: on a database without the base schema it only logs
+    a hint, so later get_db() calls never go back to the writer for it. It uses the
+    request's writer connection if the request already holds it, since the writer pool has
+    a single connection and acquiring it again would wait on itself.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        held = g.get("db_writer") if has_request_context() else None
+        conn = held or writer.acquire()
+        try:
+            # Nothing to migrate until create.sql has been run
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Student'").fetchone():
+                apply_migrations(conn)
+            else:
+                app.logger.warning(
+                    "%s has no Student table: build it from create.sql and insert.sql, "
+                    "then run `flask migrate-db` or restart the app", DATABASE)
+            _schema_ready = True
+        finally:
+            if held is None:
+                writer.release(conn)
+
+
+@app.cli.command("migrate-db")
+def migrate_db_command():
+    """Apply pending migrations from the migrations/ folder."""
+    conn = writer.acquire()
+    try:
+        applied = apply_migrations(conn)
+    finally:
+        writer.release(conn)
+    for name in applied:
+        click.echo(f"Applied {name}")
+    if not applied:
+        click.echo("Schema is up to date.")
+
+
+# ---------- DERIVED TABLES ----------
+# Tables that triggers keep in step with the base tables (see their migrations). Each
+# entry is the query that computes the table's whole contents from scratch, in column
+# order; `flask check-derived` compares it with what the triggers have produced.
+DERIVED_TABLES = {
+    "Student_Stats": """
+        SELECT
+            s.student_id,
+            (SELECT COUNT(*) FROM Visit v WHERE v.student_id = s.student_id),
+            (SELECT COUNT(*) FROM Visit v JOIN Issue i ON i.visit_id = v.visit_id
+             WHERE v.student_id = s.student_id),
+            (SELECT COALESCE(SUM(i.severity), 0) FROM Visit v JOIN Issue i ON i.visit_id = v.visit_id
+             WHERE v.student_id = s.student_id)
+        FROM Student s
+    """,
+    # Before Visit_Summary: rebuilding it moves open_items through its triggers
+    "Outstanding_Item": """
+        SELECT 'Suggestion', sg.suggestion_id, NULL, sg.visit_id, v.student_id, v.date
+        FROM Suggestion sg
+        LEFT JOIN Visit v ON v.visit_id = sg.visit_id
+        WHERE sg.student_reported_at IS NULL OR sg.student_reported_at = ''
+        UNION ALL
+        SELECT 'Referral', r.referral_id, r.issue_id, i.visit_id, v.student_id, r.created_at
+        FROM Referral r
+        LEFT JOIN Issue i ON i.issue_id = r.issue_id
+        LEFT JOIN Visit v ON v.visit_id = i.visit_id
+        WHERE r.student_reported_at IS NULL OR r.student_reported_at = ''
+        UNION ALL
+        SELECT 'Financial', f.financial_id, f.issue_id, i.visit_id, v.student_id, f.created_at
+        FROM Financial f
+        LEFT JOIN Issue i ON i.issue_id = f.issue_id
+        LEFT JOIN Visit v ON v.visit_id = i.visit_id
+        WHERE f.student_reported_at IS NULL OR f.student_reported_at = ''
+        UNION ALL
+        SELECT 'Coursework', cw.coursework_id, cw.issue_id, i.visit_id, v.student_id, cw.created_at
+        FROM Coursework cw
+        LEFT JOIN Issue i ON i.issue_id = cw.issue_id
+        LEFT JOIN Visit v ON v.visit_id = i.visit_id
+        WHERE cw.student_reported_at IS NULL OR cw.student_reported_at = ''
+    """,
+    "Visit_Summary": """
+        SELECT
+            v.visit_id,
+            v.student_id,
+            v.date,
+            v.mode,
+            (SELECT COUNT(*) FROM Issue i WHERE i.visit_id = v.visit_id),
+            (SELECT COALESCE(SUM(i.severity), 0) FROM Issue i WHERE i.visit_id = v.visit_id),
+            (SELECT COUNT(*) FROM Suggestion sg
+             WHERE sg.visit_id = v.visit_id
+               AND (sg.student_reported_at IS NULL OR sg.student_reported_at = ''))
+            + (SELECT COUNT(*) FROM Referral r JOIN Issue i ON i.issue_id = r.issue_id
+               WHERE i.visit_id = v.visit_id
+                 AND (r.student_reported_at IS NULL OR r.student_reported_at = ''))
+            + (SELECT COUNT(*) FROM Financial f JOIN Issue i ON i.issue_id = f.issue_id
+               WHERE i.visit_id = v.visit_id
+                 AND (f.student_reported_at IS NULL OR f.student_reported_at = ''))
+            + (SELECT COUNT(*) FROM Coursework cw JOIN Issue i ON i.issue_id = cw.issue_id
+               WHERE i.visit_id = v.visit_id
+                 AND (cw.student_reported_at IS NULL OR cw.student_reported_at = ''))
+        FROM Visit v
+    """,
+    # Before Course_Stats: rebuilding it moves num_difficulty_students through its triggers
+    "Course_Difficulty": """
+        SELECT v.student_id, cw.course_id, COUNT(*)
+        FROM Coursework cw
+        JOIN Issue i ON i.issue_id = cw.issue_id
+        JOIN Visit v ON v.visit_id = i.visit_id
+        JOIN Student s ON s.student_id = v.student_id
+        GROUP BY v.student_id, cw.course_id
+    """,
+    "Course_Stats": """
+        SELECT
+            c.course_id,
+            (SELECT COUNT(*) FROM Student_Course sc WHERE sc.course_id = c.course_id),
+            (SELECT COUNT(*) FROM Coursework cw WHERE cw.course_id = c.course_id),
+            (SELECT COUNT(DISTINCT v.student_id)
+             FROM Coursework cw
+             JOIN Issue i ON i.issue_id = cw.issue_id
+             JOIN Visit v ON v.visit_id = i.visit_id
+             JOIN Student s ON s.student_id = v.student_id
+             WHERE cw.course_id = c.course_id)
+        FROM Course c
+    """,
+    "Open_Followup": """
+        SELECT f.counselor_id, f.followup_id, f.visit_id, v.student_id, s.name, v.date
+        FROM Followup f
+        LEFT JOIN Visit v ON v.visit_id = f.visit_id
+        LEFT JOIN Student s ON s.student_id = v.student_id
+        WHERE f.complete = 0
+    """,
+    "Facet_Value": """
+        SELECT 'country', country_of_birth, COUNT(*) FROM Student GROUP BY country_of_birth
+        UNION ALL SELECT 'gender', gender, COUNT(*) FROM Student GROUP BY gender
+        UNION ALL SELECT 'zip', zip_code, COUNT(*) FROM Student GROUP BY zip_code
+        UNION ALL SELECT 'teacher', teacher, COUNT(*) FROM Course GROUP BY teacher
+        UNION ALL SELECT 'period', period, COUNT(*) FROM Course GROUP BY period
+        UNION ALL SELECT 'classroom', classroom, COUNT(*) FROM Course GROUP BY classroom
+    """,
+    # Last: counts rows of Open_Followup and Outstanding_Item, whose rebuilds move it
+    "Dashboard_Counter": """
+        SELECT 'students', COUNT(*) FROM Student
+        UNION ALL SELECT 'visits', COUNT(*) FROM Visit
+        UNION ALL SELECT 'open_followups', COUNT(*) FROM Open_Followup
+        UNION ALL SELECT 'critical_issues', COUNT(*) FROM Issue WHERE severity = 1
+        UNION ALL SELECT 'outstanding_items', COUNT(*) FROM Outstanding_Item
+    """,
+}
+
+
+def stored_columns(conn, table):
+    """The table's columns minus generated ones, i.e. what DERIVED_TABLES computes."""
+    return ", ".join(row["name"] for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def derived_drift(conn, table):
+    """(rows missing from the table, rows it holds that shouldn't be there)."""
+    sql = f"SELECT * FROM ({DERIVED_TABLES[table]})"  # a compound SELECT must not bind to the EXCEPT
+    stored = f"SELECT {stored_columns(conn, table)} FROM {table}"
+    missing = conn.execute(f"SELECT COUNT(*) FROM ({sql} EXCEPT {stored})").fetchone()[0]
+    extra = conn.execute(f"SELECT COUNT(*) FROM ({stored} EXCEPT {sql})").fetchone()[0]
+    return missing, extra
+
+
+def rebuild_derived(conn, table):
+    """Replace the table's contents with a from-scratch computation, in one transaction."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(f"INSERT INTO {table} ({stored_columns(conn, table)}) {DERIVED_TABLES[table]}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+@app.cli.command("check-derived")
+@click.option("--rebuild", is_flag=True, help="Recompute every table that has drifted.")
+def check_derived_command(rebuild):
+    """Compare each trigger-maintained table with a from-scratch computation."""
+    with app.app_context():
+        ensure_schema()
+    conn = writer.acquire()
+    try:
+        drifted = []
+        for table in DERIVED_TABLES:
+            missing, extra = derived_drift(conn, table)
+            if missing or extra:
+                drifted.append(table)
+                click.echo(f"{table}: {missing} row(s) missing or stale, {extra} unexpected")
+                if rebuild:
+                    rebuild_derived(conn, table)
+                    click.echo(f"{table}: rebuilt")
+            else:
+                click.echo(f"{table}: ok")
+    finally:
+        writer.release(conn)
+    if drifted and not rebuild:
+        raise SystemExit("Run `flask check-derived --rebuild` to repair.")
+
+
+def get_db(write=None):
+    """
+    Return the connection bound to the current request.
+    By default GET requests get a read-only pooled connection and every other
+    method gets the single writer connection; pass `write` to override (e.g. a
+    GET route that deletes, or a POST that only reads).
+    """
+    ensure_schema()
+    if write is None:
+        write = request.method != "GET"
+
+    if write:
+        if "db_writer" not in g:
+            g.db_writer = writer.acquire()
+        return g.db_writer
+
+    if "db_reader" not in g:
+        g.db_reader = readers.acquire()
+    return g.db_reader
+
+
+@app.teardown_appcontext
+def release_db(exception=None):
+    conn = g.pop("db_reader", None)
+    if conn is not None:
+        readers.release(conn)
+    conn = g.pop("db_writer", None)
+    if conn is not None:
+        writer.release(conn)
+
+
+def group_rows(rows, key):
+    """Group query rows into {row[key]: [rows...]}, keeping the query's order within each group."""
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row[key], []).append(row)
+    return grouped
+
+
+def load_visit_issues(conn, visit_ids):
+    """
+    Load the issues of a batch of visits together with their categories, types and
+    referrals, using one query per relationship however many visits/issues there are.
+    Returns {visit_id: [issue, ...]} with issues ordered by issue_id; each issue is a
+    dict with issue_id, visit_id, issue_description, severity, categories and
+    types (lists of names) and referrals (only for Referral-type issues).
+    """
+    ids = json.dumps(list(visit_ids))
+
+    issues = [dict(row) for row in conn.execute("""
+        SELECT
+            i.visit_id,
+            i.issue_id,
+            i.issue_description,
+            i.severity
+        FROM Issue i
+        WHERE i.visit_id IN (SELECT value FROM json_each(?))
+        ORDER BY i.issue_id
+    """, (ids,)).fetchall()]
+
+    categories = group_rows(conn.execute("""
+        SELECT ic.issue_id, c.name
+        FROM Issue_Category ic
+        JOIN Category c ON c.category_id = ic.category_id
+        JOIN Issue i ON i.issue_id = ic.issue_id
+        WHERE i.visit_id IN (SELECT value FROM json_each(?))
+        ORDER BY ic.issue_id, ic.category_id
+    """, (ids,)).fetchall(), "issue_id")
+
+    types = group_rows(conn.execute("""
+        SELECT it.issue_id, it.issue_type
+        FROM Issue_Type it
+        JOIN Issue i ON i.issue_id = it.issue_id
+        WHERE i.visit_id IN (SELECT value FROM json_each(?))
+        ORDER BY it.issue_id, it.issue_type
+    """, (ids,)).fetchall(), "issue_id")
+
+    referrals = group_rows(conn.execute("""
+        SELECT r.issue_id, r.referral_id, r.details
+        FROM Referral r
+        JOIN Issue i ON i.issue_id = r.issue_id
+        WHERE i.visit_id IN (SELECT value FROM json_each(?))
+        ORDER BY r.issue_id, r.referral_id
+    """, (ids,)).fetchall(), "issue_id")
+
+    by_visit = {visit_id: [] for visit_id in visit_ids}
+    for issue in issues:
+        issue_id = issue["issue_id"]
+        issue["categories"] = [c["name"] for c in categories.get(issue_id, [])]
+        issue["types"] = [t["issue_type"] for t in types.get(issue_id, [])]
+        if "Referral" in issue["types"]:
+            issue["referrals"] = [
+                {"referral_id": r["referral_id"], "details": r["details"]}
+                for r in referrals.get(issue_id, [])
+            ]
+        else:
+            issue["referrals"] = []
+        by_visit.setdefault(issue["visit_id"], []).append(issue)
+    return by_visit
+
+
+# ---------- ID ALLOCATION ----------
+# Primary key column of every table whose ids are handed out from Id_Sequence
+ID_COLUMNS = {
+    "Student": "student_id",
+    "Counselor": "counselor_id",
+    "Visit": "visit_id",
+    "Issue": "issue_id",
+    "Followup": "followup_id",
+    "Suggestion": "suggestion_id",
+    "Referral": "referral_id",
+    "Financial": "financial_id",
+    "Coursework": "coursework_id",
+    "Diagnosis": "diagnosis_id",
+    "Symptom": "symptom_id",
+}
+
+
+def allocate_ids(conn, table, count=1):
+    """
+    Reserve a block of `count` consecutive ids for `table` and return the first one.
+    This is a single-row UPDATE on Id_Sequence, so it costs the same no matter how big
+    the table is. It runs inside the caller's write transaction: the reservation holds
+    the write lock until commit (no two workers can get the same id), and it rolls back
+    together with the rows if the transaction fails.
+    """
+    rows = conn.execute(
+        "UPDATE Id_Sequence SET next_id = next_id + ? WHERE table_name = ? RETURNING next_id - ?",
+        (count, table, count)
+    ).fetchall()
+    if rows:
+        return rows[0][0]
+
+    # First allocation for a table that is not seeded yet: continue after the current max
+    first = conn.execute(
+        f"SELECT COALESCE(MAX({ID_COLUMNS[table]}), 0) + 1 FROM {table}"
+    ).fetchone()[0]
+    conn.execute(
+        "INSERT INTO Id_Sequence (table_name, next_id) VALUES (?, ?)",
+        (table, first + count)
+    )
+    return first
+
+
+# ---------- LOOKUP CACHE ----------
+# Dropdown contents, shared by every request in the process. Each entry remembers the
+# Table_Generation of its table when it was loaded and is reloaded once that moves.
+LOOKUPS = {
+    "students": ("Student", "SELECT student_id, name FROM Student"),
+    "students_by_name": ("Student", "SELECT student_id, name FROM Student ORDER BY name"),
+    "student_names": ("Student", "SELECT DISTINCT name FROM Student ORDER BY name"),
+    "counselors": ("Counselor", "SELECT counselor_id, name FROM Counselor"),
+    "counselors_by_name": ("Counselor", "SELECT counselor_id, name FROM Counselor ORDER BY name"),
+    "categories": ("Category", "SELECT category_id, name FROM Category"),
+    "categories_by_name": ("Category", "SELECT category_id, name FROM Category ORDER BY name"),
+    "courses": ("Course", "SELECT course_id, course_name FROM Course"),
+    "courses_by_id": ("Course", "SELECT course_id, course_name FROM Course ORDER BY course_id"),
+    "providers": ("Provider", "SELECT provider_id, name FROM Provider"),
+    "diagnosis_list": ("Diagnosis_List", "SELECT diagnosis_code, diagnosis FROM Diagnosis_List"),
+    "symptom_list": ("Symptom_List", "SELECT symptom_code, symptom FROM Symptom_List"),
+    # Filter dropdowns: each value with how many rows carry it (see migration 013)
+    "countries": ("Facet_Value", "SELECT value, refs FROM Facet_Value WHERE facet = 'country' ORDER BY value"),
+    "genders": ("Facet_Value", "SELECT value, refs FROM Facet_Value WHERE facet = 'gender' ORDER BY value"),
+    "zips": ("Facet_Value", "SELECT value, refs FROM Facet_Value WHERE facet = 'zip' ORDER BY value"),
+    "teachers": ("Facet_Value", "SELECT value, refs FROM Facet_Value WHERE facet = 'teacher' ORDER BY value"),
+    "periods": ("Facet_Value", "SELECT value, refs FROM Facet_Value WHERE facet = 'period' ORDER BY value"),
+    "classrooms": ("Facet_Value", "SELECT value, refs FROM Facet_Value WHERE facet = 'classroom' ORDER BY value"),
+}
+
+GENERATIONS_SQL = "SELECT table_name, generation FROM Table_Generation"
+
+_cache_lock = threading.Lock()
+_generation_stamps = {}   # connection -> ((data_version, total_changes), {table_name: generation}) it last read
+_lookup_cache = {}        # lookup name -> (generation, rows)
+lookup_stats = {"hits": 0, "misses": 0}
+
+
+def table_generations(conn):
+    """The per-table generation counters, re-read only when the database has changed since
+    this connection last read them. PRAGMA data_version moves when another connection
+    commits; total_changes moves when this one writes. A request checks at most once
+    per connection unless it writes in between.
+    The counters are kept per connection, as of that connection's own snapshot: a reader
+    still on an older snapshot must not overwrite what a newer one has already seen.
+    Each refresh builds a new dict, so the one returned is never changed afterwards."""
+    checked = (conn, conn.total_changes)
+    if has_request_context() and g.get("generations_checked") == checked:
+        return g.generations
+
+    stamp = (conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+    with _cache_lock:
+        cached = _generation_stamps.get(conn)
+    if cached is None or cached[0] != stamp:
+        rows = conn.execute(GENERATIONS_SQL).fetchall()
+        cached = (stamp, {row["table_name"]: row["generation"] for row in rows})
+        with _cache_lock:
+            _generation_stamps[conn] = cached
+    if has_request_context():
+        g.generations_checked = checked
+        g.generations = cached[1]
+    return cached[1]
+
+
+def lookup(conn, name):
+    """Rows for a dropdown in LOOKUPS, from the cache unless its table has changed."""
+    table, sql = LOOKUPS[name]
+    generation = table_generations(conn).get(table)
+    with _cache_lock:
+        cached = _lookup_cache.get(name)
+        if cached and generation is not None and cached[0] == generation:
+            lookup_stats["hits"] += 1
+            return cached[1]
+        lookup_stats["misses"] += 1
+
+    # The generation was read first, so these rows are at least that new
+    rows = tuple(conn.execute(sql).fetchall())
+    with _cache_lock:
+        _lookup_cache[name] = (generation, rows)
+    return rows
+
+
+# ---------- CONDITIONAL GET ----------
+# Tables each list page reads. The page's ETag is built from their generations plus the
+# query string, so a browser revalidating an unchanged page gets a 304 before any of the
+# view's queries or template rendering run. report_detail depends on the report shown.
+PAGE_TABLES = {
+    "list_students": ("Student", "Student_Stats", "Facet_Value"),
+    "list_visits": ("Visit_Summary", "Student"),
+    "list_counselors": ("Counselor", "Counselor_Salary"),
+    "list_courses": ("Course", "Course_Stats", "Student_Course", "Student", "Facet_Value"),
+    "list_referrals": ("Referral", "Coursework", "Financial", "Issue", "Visit", "Student"),
+    "report_detail": lambda report_id: REPORTS.get(report_id, {}).get("tables", ()),
+    "report_export": lambda report_id: REPORTS.get(report_id, {}).get("tables", ()),
+}
+
+# Changes whenever app.py or a template does, so browsers don't keep pages rendered by old code
+PAGE_VERSION = str(max(
+    os.path.getmtime(path) for path in [__file__] + glob.glob(os.path.join(app.root_path, "templates", "*.html"))
+))
+
+
+def page_etag(conn, tables):
+    """ETag for the current request, or None if one of the tables has no generation counter."""
+    generations = table_generations(conn)
+    stamp = [generations.get(table) for table in tables]
+    if None in stamp:
+        return None
+    args = sorted(request.args.items(multi=True))
+    key = json.dumps([PAGE_VERSION, request.path, stamp, args])
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def conditional_page(view):
+    """Answer GETs whose If-None-Match still matches with 304, and tag the rest with an ETag."""
+    @functools.wraps(view)
+    def wrapper(**kwargs):
+        if request.method != "GET":
+            return view(**kwargs)
+
+        tables = PAGE_TABLES[request.endpoint]
+        if callable(tables):
+            tables = tables(**kwargs)
+        etag = page_etag(get_db(), tables)
+        if etag is None:
+            return view(**kwargs)
+
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            response = app.make_response(view(**kwargs))
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+    return wrapper
+
+
+# ---------- PAGINATION ----------
+# List pages are paged by key, not OFFSET: a page is "the next N rows after the
+# last one shown" in the page's sort order, so each page is one index range no
+# matter how deep it is, and rows inserted meanwhile never shift a page or show
+# up twice. The cursors in the prev/next links are the sort-key values of the
+# first/last row shown.
+
+PAGE_SIZES = (25, 50, 100, 250)
+DEFAULT_PAGE_SIZE = 50
+
+
+def page_size(args, name="per_page"):
+    """The requested page size if it is one of PAGE_SIZES, else the default."""
+    size = args.get(name, DEFAULT_PAGE_SIZE, type=int)
+    return size if size in PAGE_SIZES else DEFAULT_PAGE_SIZE
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, length):
+    """The key values in a cursor, or None if it is missing or malformed."""
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError:
+        return None
+    if not isinstance(values, list) or len(values) != length:
+        return None
+    if not all(isinstance(value, (str, int, float)) for value in values):
+        return None
+    return values
+
+
+def keyset_page(conn, select_sql, where_clauses, params, keys, per_page,
+                after=None, before=None, descending=False):
+    """
+    Run one page of `select_sql` (SELECT ... FROM ... without WHERE/ORDER BY).
+    `keys` is the sort key as (SQL expression, result column) pairs, unique
+    together and ideally the columns of an index; the page starts after the
+    `after` cursor, or ends before the `before` one. Fetches one extra row to
+    know whether there is a further page.
+    Returns (rows, prev_cursor, next_cursor); a cursor is None at either end.
+    """
+    expressions = ", ".join(expression for expression, _ in keys)
+    boundary = decode_cursor(before, len(keys))
+    backward = boundary is not None
+    if not backward:
+        boundary = decode_cursor(after, len(keys))
+
+    clauses = list(where_clauses)
+    params = list(params)
+    if boundary is not None:
+        # Row-value comparison, so SQLite walks the index from the boundary
+        op = ">" if backward == descending else "<"
+        clauses.append(f"({expressions}) {op} ({', '.join('?' * len(keys))})")
+        params.extend(boundary)
+    direction = "DESC" if backward != descending else "ASC"
+    order_sql = ", ".join(f"{expression} {direction}" for expression, _ in keys)
+    where_sql = " AND ".join(clauses) or "1 = 1"
+    rows = conn.execute(
+        f"{select_sql} WHERE {where_sql} ORDER BY {order_sql} LIMIT ?", params + [per_page + 1]
+    ).fetchall()
+
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backward:
+        rows.reverse()
+    cursor = lambda row: encode_cursor([row[column] for _, column in keys]) if row else None
+    first_row, last_row = (rows[0], rows[-1]) if rows else (None, None)
+    if backward:
+        return rows, cursor(first_row) if more else None, cursor(last_row)
+    return rows, cursor(first_row) if boundary is not None else None, cursor(last_row) if more else None
+
+
+def iso_date(value):
+    """`value` if it is a YYYY-MM-DD date (what <input type="date"> sends), else None."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def page_args(names):
+    """The current query string's values for `names` only, to pass to url_for for a link back to
+    the same page. Passing request.args whole would let keys like `endpoint` or `_anchor`
+    collide with url_for's own arguments."""
+    return {name: request.args[name] for name in names if name in request.args}
+
+
+def page_links(prev_cursor, next_cursor, prefix=""):
+    """URLs of the previous/next page: the current URL with the cursor swapped.
+    A page with several paged sections gives each a `prefix` for its cursor arguments."""
+    after, before = f"{prefix}after", f"{prefix}before"
+    args = [(key, value) for key, value in request.args.items(multi=True) if key not in (after, before)]
+    link = lambda name, token: f"{request.path}?{urlencode(args + [(name, token)])}" if token else None
+    return {"prev": link(before, prev_cursor), "next": link(after, next_cursor)}
+
+
+@app.route("/stats/db")
+def db_stats():
+    return jsonify(
+        readers=readers.stats(),
+        writer=writer.stats(),
+        lookups=dict(lookup_stats),
+        reports=dict(report_cache_stats, entries=len(_report_cache)),
+    )
 
 
 @app.route("/")
 def home():
-    conn = get_db_connection()
+    # Totals come from the trigger-maintained Dashboard_Counter table, not COUNT(*) scans
     try:
-        student_count = conn.execute(
-            "SELECT COUNT(*) AS c FROM Student"
-        ).fetchone()["c"]
+        conn = get_db()
+        counters = dict(conn.execute("SELECT name, value FROM Dashboard_Counter").fetchall())
     except sqlite3.OperationalError:
-        student_count = None
-    finally:
-        conn.close()
+        counters = None
 
-    return render_template("index.html", student_count=student_count)
+    return render_template("index.html", counters=counters)
 
 # ---------- STUDENTS ----------
 
 @app.route("/students")
+@conditional_page
 def list_students():
     search = request.args.get("search", "")
     country_filter = request.args.get("country", "")
@@ -43,21 +787,17 @@ def list_students():
 
     critical_filter = request.args.get("critical_filter", "")
 
-    conn = get_db_connection()
+    conn = get_db()
 
-    # Dropdown values
-    countries = [row["country_of_birth"] for row in conn.execute(
-        "SELECT DISTINCT country_of_birth FROM Student ORDER BY country_of_birth"
-    ).fetchall()]
-    genders = [row["gender"] for row in conn.execute(
-        "SELECT DISTINCT gender FROM Student ORDER BY gender"
-    ).fetchall()]
-    zips = [row["zip_code"] for row in conn.execute(
-        "SELECT DISTINCT zip_code FROM Student ORDER BY zip_code"
-    ).fetchall()]
+    # Dropdown values (with student counts)
+    countries = lookup(conn, "countries")
+    genders = lookup(conn, "genders")
+    zips = lookup(conn, "zips")
 
-    # Build WHERE (pre-group) clauses + params
-    where_clauses = ["1 = 1"]
+    per_page = page_size(request.args)
+
+    # Build WHERE clauses + params
+    where_clauses = []
     where_params = []
 
     if search:
@@ -73,35 +813,12 @@ def list_students():
         where_clauses.append("s.zip_code = ?")
         where_params.append(zip_filter)
 
-    where_sql = " AND ".join(where_clauses)
-
-    # Build main query. Note: compute `critical` as 0/1 robustly (handles boolean or text)
-    query = f"""
-        SELECT
-            s.*,
-            COUNT(DISTINCT v.visit_id) AS num_visits,
-            COUNT(i.issue_id) AS num_issues,
-            MAX(CASE
-                    WHEN i.severity IN (1, '1', 't', 'T', 'true', 'TRUE') THEN 1
-                    ELSE 0
-                END) AS critical
-        FROM Student s
-        LEFT JOIN Visit v ON v.student_id = s.student_id
-        LEFT JOIN Issue i ON i.visit_id = v.visit_id
-        WHERE {where_sql}
-        GROUP BY s.student_id
-    """
-
-    # Build HAVING clauses (post-group) and params separately to avoid ordering bugs
-    having_clauses = ["1 = 1"]
-    having_params = []
-
     # visits filter
     if visits_op in ("<", "=", ">") and visits_num != "":
         try:
             vn = int(visits_num)
-            having_clauses.append(f"num_visits {visits_op} ?")
-            having_params.append(vn)
+            where_clauses.append(f"st.num_visits {visits_op} ?")
+            where_params.append(vn)
         except ValueError:
             # ignore invalid input (non-integer); could also flash a message
             pass
@@ -110,31 +827,44 @@ def list_students():
     if issues_op in ("<", "=", ">") and issues_num != "":
         try:
             inum = int(issues_num)
-            having_clauses.append(f"num_issues {issues_op} ?")
-            having_params.append(inum)
+            where_clauses.append(f"st.num_issues {issues_op} ?")
+            where_params.append(inum)
         except ValueError:
             pass
 
-    # critical filter (we computed critical as 0/1 above)
+    # critical filter
     if critical_filter == "Yes":
-        having_clauses.append("critical = 1")
+        where_clauses.append("st.num_critical > 0")
     elif critical_filter == "No":
-        having_clauses.append("critical = 0")
-
-    having_sql = " AND ".join(having_clauses)
+        where_clauses.append("st.num_critical = 0")
 
-    # final query
-    final_query = query + " HAVING " + having_sql + " ORDER BY s.name"
-
-    # combine params: WHERE params come first (bound to the WHERE placeholders), then HAVING params
-    all_params = where_params + having_params
-
-    students = conn.execute(final_query, all_params).fetchall()
-    conn.close()
+    # Counts come from Student_Stats, which triggers keep current, so there is no
+    # GROUP BY over visits and issues and the count filters can use its indexes.
+    # Paged by (name, student_id), which idx_student_name covers in order.
+    students, prev_cursor, next_cursor = keyset_page(
+        conn,
+        """
+        SELECT
+            s.*,
+            st.num_visits,
+            st.num_issues,
+            CASE WHEN st.num_critical > 0 THEN 1 ELSE 0 END AS critical
+        FROM Student s
+        JOIN Student_Stats st ON st.student_id = s.student_id
+        """,
+        where_clauses, where_params,
+        keys=[("s.name", "name"), ("s.student_id", "student_id")],
+        per_page=per_page,
+        after=request.args.get("after"),
+        before=request.args.get("before"),
+    )
 
     return render_template(
         "students.html",
         students=students,
+        pages=page_links(prev_cursor, next_cursor),
+        per_page=per_page,
+        page_sizes=PAGE_SIZES,
         search=search,
         countries=countries,
         genders=genders,
@@ -161,11 +891,8 @@ def new_student():
         consent = 1 if request.form.get("consent") == "on" else 0
         zip_code = request.form["zip_code"]
 
-        conn = get_db_connection()
-        row = conn.execute(
-            "SELECT COALESCE(MAX(student_id), 0) + 1 AS next_id FROM Student"
-        ).fetchone()
-        next_id = row["next_id"]
+        conn = get_db()
+        next_id = allocate_ids(conn, "Student")
 
         conn.execute(
             """
@@ -175,7 +902,6 @@ def new_student():
             (next_id, name, dob, country_of_birth, gender, consent, zip_code),
         )
         conn.commit()
-        conn.close()
         return redirect(url_for("list_students"))
 
     return render_template("student_form.html")
@@ -183,7 +909,7 @@ def new_student():
 
 @app.route("/students/<int:student_id>", methods=["GET", "POST"])
 def view_student(student_id):
-    conn = get_db_connection()
+    conn = get_db()
 
     # ---------- BASIC INFO ----------
     student = conn.execute(
@@ -208,51 +934,36 @@ def view_student(student_id):
         return redirect(url_for("view_student", student_id=student_id))
 
     # ---------- VISITS ----------
+    # Everything below the student is loaded with one query per relationship
+    # (joined on student_id) and grouped in Python, so the number of queries
+    # stays the same no matter how many visits/issues/diagnoses the student has.
     visits = conn.execute("""
         SELECT * FROM Visit
         WHERE student_id = ?
         ORDER BY date DESC
     """, (student_id,)).fetchall()
 
+    issues_by_visit = load_visit_issues(conn, [v["visit_id"] for v in visits])
+
+    # Suggestions (per visit, shown under each of the visit's issues)
+    suggestions_by_visit = group_rows(conn.execute("""
+        SELECT s.visit_id, s.details, c.name AS counselor_name
+        FROM Suggestion s
+        JOIN Counselor c ON s.counselor_id = c.counselor_id
+        JOIN Visit v ON v.visit_id = s.visit_id
+        WHERE v.student_id = ?
+        ORDER BY s.visit_id, s.suggestion_id
+    """, (student_id,)).fetchall(), "visit_id")
+
     visit_data = []
     for visit in visits:
-        # Get issues for each visit
-        issues = conn.execute("""
-            SELECT i.issue_id, i.issue_description, i.severity
-            FROM Issue i
-            WHERE i.visit_id = ?
-        """, (visit["visit_id"],)).fetchall()
-
+        suggestions = suggestions_by_visit.get(visit["visit_id"], [])
         issue_list = []
-        for issue in issues:
-            # Issue-Type
-            types = conn.execute("""
-                SELECT issue_type FROM Issue_Type
-                WHERE issue_id = ?
-            """, (issue["issue_id"],)).fetchall()
-            type_list = [t["issue_type"] for t in types]
-
-            # Issue-Category -> Category name
-            categories = conn.execute("""
-                SELECT c.name
-                FROM Issue_Category ic
-                JOIN Category c ON ic.category_id = c.category_id
-                WHERE ic.issue_id = ?
-            """, (issue["issue_id"],)).fetchall()
-            category_list = [c["name"] for c in categories]
-
-            # Suggestions for this visit
-            suggestions = conn.execute("""
-                SELECT s.details, c.name AS counselor_name
-                FROM Suggestion s
-                JOIN Counselor c ON s.counselor_id = c.counselor_id
-                WHERE s.visit_id = ?
-            """, (visit["visit_id"],)).fetchall()
-
+        for issue in issues_by_visit[visit["visit_id"]]:
             issue_list.append({
                 "issue": issue,
-                "types": type_list,
-                "categories": category_list,
+                "types": issue["types"],
+                "categories": issue["categories"],
                 "suggestions": suggestions
             })
 
@@ -274,15 +985,18 @@ def view_student(student_id):
         WHERE d.student_id = ?
     """, (student_id,)).fetchall()
 
+    symptoms_by_diagnosis = group_rows(conn.execute("""
+        SELECT s.diagnosis_id, sl.symptom
+        FROM Symptom s
+        JOIN Symptom_List sl ON s.symptom_code = sl.symptom_code
+        JOIN Diagnosis d ON d.diagnosis_id = s.diagnosis_id
+        WHERE d.student_id = ?
+        ORDER BY s.diagnosis_id, s.symptom_code
+    """, (student_id,)).fetchall(), "diagnosis_id")
+
     diagnosis_data = []
     for diag in diagnoses:
-        symptoms = conn.execute("""
-            SELECT sl.symptom
-            FROM Symptom s
-            JOIN Symptom_List sl ON s.symptom_code = sl.symptom_code
-            WHERE s.diagnosis_id = ?
-        """, (diag["diagnosis_id"],)).fetchall()
-        symptom_list = [s["symptom"] for s in symptoms]
+        symptom_list = [s["symptom"] for s in symptoms_by_diagnosis.get(diag["diagnosis_id"], [])]
 
         diagnosis_data.append({
             "diagnosis_id": diag["diagnosis_id"],
@@ -296,9 +1010,9 @@ def view_student(student_id):
         })
 
     # ---------- DIAGNOSIS DROPDOWN DATA ----------
-    providers = conn.execute("SELECT provider_id, name FROM Provider").fetchall()
-    diag_list = conn.execute("SELECT diagnosis_code, diagnosis FROM Diagnosis_List").fetchall()
-    symptoms_all = conn.execute("SELECT symptom_code, symptom FROM Symptom_List").fetchall()
+    providers = lookup(conn, "providers")
+    diag_list = lookup(conn, "diagnosis_list")
+    symptoms_all = lookup(conn, "symptom_list")
 
 
     # ---------- COURSES ----------
@@ -310,9 +1024,17 @@ def view_student(student_id):
     """, (student_id,)).fetchall()
 
     # For adding new course
-    all_courses = conn.execute("SELECT course_id, course_name FROM Course").fetchall()
+    all_courses = lookup(conn, "courses")
 
-    conn.close()
+    # ---------- OUTSTANDING ITEMS ----------
+    # Counted from the Outstanding_Item ledger (one index range per student)
+    outstanding = conn.execute("""
+        SELECT
+            COUNT(*) AS total,
+            COALESCE(SUM(opened_on < date('now', ?)), 0) AS overdue
+        FROM Outstanding_Item
+        WHERE student_id = ?
+    """, (f"-{OVERDUE_AFTER_DAYS} days", student_id)).fetchone()
 
     return render_template(
         "student_view.html",
@@ -323,22 +1045,23 @@ def view_student(student_id):
         providers=providers,
         diag_list=diag_list,
         symptoms_all=symptoms_all,
-        all_courses=all_courses
+        all_courses=all_courses,
+        outstanding=outstanding,
+        overdue_after_days=OVERDUE_AFTER_DAYS
     )
 
 
 @app.route("/students/<int:student_id>/delete", methods=["POST"])
 def delete_student(student_id):
-    conn = get_db_connection()
+    conn = get_db()
     conn.execute("DELETE FROM Student WHERE student_id = ?", (student_id,))
     conn.commit()
-    conn.close()
     return redirect(url_for("list_students"))
 
 
 @app.route("/students/<int:student_id>/edit", methods=["GET", "POST"])
 def edit_student(student_id):
-    conn = get_db_connection()
+    conn = get_db()
     student = conn.execute(
         "SELECT * FROM Student WHERE student_id = ?",
         (student_id,)
@@ -359,16 +1082,15 @@ def edit_student(student_id):
         """, (name, dob, country_of_birth, gender, consent, zip_code, student_id))
 
         conn.commit()
-        conn.close()
         return redirect(url_for('list_students'))
 
-    conn.close()
     return render_template("student_form.html", student=student)
 
 # ---------- COUNSELORS ----------
 @app.route("/counselors")
+@conditional_page
 def list_counselors():
-    conn = get_db_connection()
+    conn = get_db()
 
     # Get filters
     type_filter = request.args.get("type", "")
@@ -444,8 +1166,6 @@ def list_counselors():
         for row in conn.execute("SELECT DISTINCT education FROM Counselor").fetchall()
     ]
 
-    conn.close()
-
     return render_template(
         "counselors.html",
         counselors=counselors,
@@ -463,7 +1183,7 @@ def list_counselors():
 
 @app.route("/counselor/<int:counselor_id>/delete", methods=["POST"])
 def delete_counselor(counselor_id):
-    conn = get_db_connection()
+    conn = get_db()
 
     # Delete salary row first (if exists) to maintain FK integrity
     conn.execute("DELETE FROM Counselor_Salary WHERE counselor_id = ?", (counselor_id,))
@@ -472,7 +1192,6 @@ def delete_counselor(counselor_id):
     conn.execute("DELETE FROM Counselor WHERE counselor_id = ?", (counselor_id,))
 
     conn.commit()
-    conn.close()
 
     return redirect(url_for("list_counselors"))
 
@@ -481,7 +1200,7 @@ def delete_counselor(counselor_id):
 
 @app.route("/counselor/<int:counselor_id>", methods=["GET"])
 def counselor_view(counselor_id):
-    conn = get_db_connection()
+    conn = get_db()
 
     # Basic counselor info (including salary if exists)
     counselor = conn.execute("""
@@ -513,31 +1232,27 @@ def counselor_view(counselor_id):
     """, (counselor_id,)).fetchall()
 
     # --- Followups ---
-    # Incomplete (NULL, empty string, or 0)
+    # Incomplete: the counselor's range of the Open_Followup queue, oldest first.
+    # Followup is only probed by primary key for the date and notes.
     incomplete_followups = conn.execute("""
         SELECT 
-            f.followup_id,
-            f.visit_id,
-            v.date AS visit_date,
-            s.student_id,
-            s.name AS student_name,
+            q.followup_id,
+            q.visit_id,
+            q.visit_date,
+            q.student_id,
+            q.student_name,
             f.date AS followup_date,
             f.notes
-        FROM Followup f
-        JOIN Visit v ON v.visit_id = f.visit_id
-        JOIN Student s ON s.student_id = v.student_id
-        WHERE f.counselor_id = ?
-        AND (
-            f.complete IS NULL
-            OR f.complete = ''
-            OR f.complete = 0
-        )
-        ORDER BY f.followup_id ASC
+        FROM Open_Followup q
+        JOIN Followup f ON f.followup_id = q.followup_id
+        WHERE q.counselor_id = ?
+        AND q.student_name IS NOT NULL
+        ORDER BY q.followup_id ASC
     """, (counselor_id,)).fetchall()
 
 
 
-    # Completed (complete is present and not empty/zero)
+    # Completed
     completed_followups = conn.execute("""
         SELECT 
             f.followup_id,
@@ -552,11 +1267,7 @@ def counselor_view(counselor_id):
         JOIN Visit v ON v.visit_id = f.visit_id
         JOIN Student s ON s.student_id = v.student_id
         WHERE f.counselor_id = ?
-        AND NOT (
-            f.complete IS NULL
-            OR f.complete = ''
-            OR f.complete = 0
-        )
+        AND f.complete = 1
         ORDER BY f.date DESC
     """, (counselor_id,)).fetchall()
 
@@ -598,8 +1309,6 @@ def counselor_view(counselor_id):
         ORDER BY (c.student_reported_at IS NOT NULL) ASC, c.created_at DESC
     """, (counselor_id,)).fetchall()
 
-    conn.close()
-
     return render_template(
         "counselor_view.html",
         counselor=counselor,
@@ -615,7 +1324,7 @@ def counselor_view(counselor_id):
 
 @app.route("/counselor/<int:counselor_id>/edit", methods=["POST"])
 def edit_counselor_info(counselor_id):
-    conn = get_db_connection()
+    conn = get_db()
 
     name = request.form["name"]
     paid_volunteer = request.form["paid_volunteer"]  # lowercase now
@@ -643,7 +1352,6 @@ def edit_counselor_info(counselor_id):
         conn.execute("DELETE FROM Counselor_Salary WHERE counselor_id = ?", (counselor_id,))
 
     conn.commit()
-    conn.close()
 
     return redirect(url_for("counselor_view", counselor_id=counselor_id))
 
@@ -658,10 +1366,8 @@ def add_counselor():
         experience = request.form.get("experience", "") or None
         salary = request.form.get("salary", "") or None
 
-        conn = get_db_connection()
-        # next id
-        row = conn.execute("SELECT COALESCE(MAX(counselor_id), 0) + 1 AS next_id FROM Counselor").fetchone()
-        next_id = row["next_id"]
+        conn = get_db()
+        next_id = allocate_ids(conn, "Counselor")
 
         conn.execute("""
             INSERT INTO Counselor (counselor_id, name, paid_volunteer, education, experience)
@@ -672,7 +1378,6 @@ def add_counselor():
             conn.execute("INSERT OR REPLACE INTO Counselor_Salary (counselor_id, salary) VALUES (?, ?)",
                          (next_id, salary))
         conn.commit()
-        conn.close()
         return redirect(url_for("list_counselors"))
 
     # GET
@@ -687,7 +1392,7 @@ def update_followup(followup_id):
     notes = request.form.get("notes")
     complete_checkbox = request.form.get("complete")  # None if unchecked
 
-    conn = get_db_connection()
+    conn = get_db()
 
     # 1. Look up the followup being edited
     f = conn.execute("""
@@ -710,13 +1415,11 @@ def update_followup(followup_id):
     """, (date, notes, followup_id))
 
     # 3. If the counselor did NOT check "complete", create a new future followup
-    cur = conn.execute("SELECT COALESCE(MAX(followup_id), 0) + 1 FROM Followup")
-    new_id = cur.fetchone()[0]
-
     if not complete_checkbox:
+        new_id = allocate_ids(conn, "Followup")
         conn.execute("""
             INSERT INTO Followup (followup_id, visit_id, counselor_id, date, notes, complete)
-            VALUES (?, ?, ?, NULL, NULL, NULL)
+            VALUES (?, ?, ?, NULL, NULL, 0)
         """, (new_id, visit_id, counselor_id))
 
     conn.commit()
@@ -733,11 +1436,10 @@ def update_referral(referral_id):
     student_reported_at = request.form.get("student_reported_at", None) or None
     details = request.form.get("details", None) or None
 
-    conn = get_db_connection()
+    conn = get_db()
     # optional: fetch counselor id to redirect back
     row = conn.execute("SELECT r.* FROM Referral r WHERE referral_id = ?", (referral_id,)).fetchone()
     if not row:
-        conn.close()
         return "Referral not found", 404
 
     # Find counselor via visit -> issue -> visit_counselor
@@ -753,7 +1455,6 @@ def update_referral(referral_id):
     """, (student_report, student_reported_at, details, referral_id))
 
     conn.commit()
-    conn.close()
     if counselor_id:
         return redirect(url_for("counselor_view", counselor_id=counselor_id))
     return redirect(url_for("list_counselors"))
@@ -766,10 +1467,9 @@ def update_financial(financial_id):
     student_reported_at = request.form.get("student_reported_at", None) or None
     job_notes = request.form.get("job_notes", None) or None
 
-    conn = get_db_connection()
+    conn = get_db()
     row = conn.execute("SELECT f.* FROM Financial f WHERE financial_id = ?", (financial_id,)).fetchone()
     if not row:
-        conn.close()
         return "Financial not found", 404
 
     issue_id = row["issue_id"]
@@ -784,7 +1484,6 @@ def update_financial(financial_id):
     """, (student_report, student_reported_at, job_notes, financial_id))
 
     conn.commit()
-    conn.close()
     if counselor_id:
         return redirect(url_for("counselor_view", counselor_id=counselor_id))
     return redirect(url_for("list_counselors"))
@@ -795,10 +1494,9 @@ def update_financial(financial_id):
 def update_coursework(coursework_id):
     student_report = request.form.get("student_report", None) or None
     student_reported_at = request.form.get("student_reported_at", None) or None
-    conn = get_db_connection()
+    conn = get_db()
     row = conn.execute("SELECT * FROM Coursework WHERE coursework_id = ?", (coursework_id,)).fetchone()
     if not row:
-        conn.close()
         return "Coursework not found", 404
 
     issue_id = row["issue_id"]
@@ -813,7 +1511,6 @@ def update_coursework(coursework_id):
     """, (student_report, student_reported_at, coursework_id))
 
     conn.commit()
-    conn.close()
     if counselor_id:
         return redirect(url_for("counselor_view", counselor_id=counselor_id))
     return redirect(url_for("list_counselors"))
@@ -822,9 +1519,10 @@ def update_coursework(coursework_id):
 # ---------- VISITS & ISSUES ----------
 
 @app.route("/visits")
+@conditional_page
 def list_visits():
-    conn = get_db_connection()
-    all_students = conn.execute("SELECT student_id, name FROM Student").fetchall()
+    conn = get_db()
+    all_students = lookup(conn, "students")
 
     # Filters
     selected_students = request.args.getlist("students")
@@ -833,36 +1531,27 @@ def list_visits():
     issue_val = request.args.get("issue_val")
     critical = request.args.get("critical")
     report_needed = request.args.get("report_needed")  # NEW
+    date_from = iso_date(request.args.get("from"))
+    date_to = iso_date(request.args.get("to"))
+    per_page = page_size(request.args)
 
+    # Per-visit counts come from Visit_Summary, which triggers keep current, so every
+    # filter is a plain WHERE on an indexed column instead of HAVING over a GROUP BY
     query = """
         SELECT
-            v.visit_id,
-            v.date,
-            v.mode,
+            vs.visit_id,
+            vs.date,
+            vs.visit_on,
+            vs.mode,
             s.name AS student_name,
-            COUNT(i.issue_id) AS issue_count,
-
-            COALESCE(MAX(
-                CASE
-                    WHEN i.severity IN (1, '1', 'TRUE', 'True', 'true') THEN 1
-                    ELSE 0
-                END
-            ), 0) AS has_critical_issue,
-
-            -- Report Needed: ANY suggestion where student_report IS NULL
-            CASE
-                WHEN EXISTS (
-                    SELECT 1 FROM Suggestion sg
-                    WHERE sg.visit_id = v.visit_id
-                    AND (sg.student_report IS NULL OR sg.student_report = '')
-                )
-                THEN 1
-                ELSE 0
-            END AS report_needed
+            vs.issue_count,
+            CASE WHEN vs.num_critical > 0 THEN 1 ELSE 0 END AS has_critical_issue,
 
-        FROM Visit v
-        JOIN Student s ON s.student_id = v.student_id
-        LEFT JOIN Issue i ON i.visit_id = v.visit_id
+            -- Report Needed: the visit has an item the student hasn't reported back on
+            CASE WHEN vs.open_items > 0 THEN 1 ELSE 0 END AS report_needed
+
+        FROM Visit_Summary vs
+        JOIN Student s ON s.student_id = vs.student_id
     """
 
     conditions = []
@@ -870,56 +1559,62 @@ def list_visits():
 
     # Student filter
     if selected_students:
-        conditions.append("v.student_id IN ({})".format(",".join("?" * len(selected_students))))
+        conditions.append("vs.student_id IN ({})".format(",".join("?" * len(selected_students))))
         params.extend(selected_students)
 
     # Mode filter
     if mode:
-        conditions.append("v.mode = ?")
+        conditions.append("vs.mode = ?")
         params.append(mode)
 
-    # Apply WHERE
-    if conditions:
-        query += " WHERE " + " AND ".join(conditions)
-
-    # Grouping
-    query += " GROUP BY v.visit_id HAVING 1=1"
-
     # Issue count filter
     if issue_val:
         try:
             iv = int(issue_val)
             if issue_op in (">", "<", "=", ">=", "<="):
-                query += f" AND COUNT(i.issue_id) {issue_op} ?"
+                conditions.append(f"vs.issue_count {issue_op} ?")
                 params.append(iv)
         except ValueError:
             pass
 
     # Critical filter
-    if critical in ("0", "1"):
-        query += """
-            AND COALESCE(MAX(
-                CASE
-                    WHEN i.severity IN (1, '1', 'TRUE', 'True', 'true') THEN 1
-                    ELSE 0
-                END
-            ), 0) = ?
-        """
-        params.append(int(critical))
+    if critical == "1":
+        conditions.append("vs.num_critical > 0")
+    elif critical == "0":
+        conditions.append("vs.num_critical = 0")
 
     # Report Needed filter
-    if report_needed in ("0", "1"):
-        query += " AND CASE WHEN EXISTS (SELECT 1 FROM Suggestion sg WHERE sg.visit_id = v.visit_id AND (sg.student_report IS NULL OR sg.student_report = '')) THEN 1 ELSE 0 END = ?"
-        params.append(int(report_needed))
-
-    query += " ORDER BY v.date DESC, v.visit_id DESC"
-
-    visits = conn.execute(query, params).fetchall()
-    conn.close()
+    if report_needed == "1":
+        conditions.append("vs.open_items > 0")
+    elif report_needed == "0":
+        conditions.append("vs.open_items = 0")
+
+    # Date range (visit_on is the visit date as YYYY-MM-DD)
+    if date_from:
+        conditions.append("vs.visit_on >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("vs.visit_on <= ?")
+        params.append(date_to)
+
+    # Newest first, paged by (visit_on, visit_id) along idx_visit_summary_visit_on
+    visits, prev_cursor, next_cursor = keyset_page(
+        conn, query, conditions, params,
+        keys=[("vs.visit_on", "visit_on"), ("vs.visit_id", "visit_id")],
+        per_page=per_page,
+        after=request.args.get("after"),
+        before=request.args.get("before"),
+        descending=True,
+    )
 
     return render_template(
         "visits.html",
         visits=visits,
+        pages=page_links(prev_cursor, next_cursor),
+        per_page=per_page,
+        page_sizes=PAGE_SIZES,
+        date_from=date_from,
+        date_to=date_to,
         all_students=all_students,
         selected_students=selected_students,
         mode=mode,
@@ -933,218 +1628,231 @@ def list_visits():
 
 
 
-@app.route("/visits/new", methods=["GET", "POST"])
-def new_visit():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    students = cursor.execute("SELECT student_id, name FROM Student ORDER BY name").fetchall()
-    counselors = cursor.execute("SELECT counselor_id, name FROM Counselor ORDER BY name").fetchall()
-    categories = cursor.execute("SELECT category_id, name FROM Category ORDER BY name").fetchall()
-    courses = cursor.execute("SELECT course_id, course_name FROM Course ORDER BY course_id").fetchall()
+# Counselor automatically added to any visit with a critical issue
+HEAD_COUNSELOR_ID = 113
 
-    HEAD_COUNSELOR_ID = 113
 
-    if request.method == "POST":
-        app.logger.info("Form data: %s", request.form.to_dict(flat=False))
+def parse_visit_form(form):
+    """
+    Turn the new-visit form into an in-memory visit bundle (plain dicts/lists).
+    Nothing here touches the database; write_visit_bundle() does all the inserts.
+    """
+    student_id = form.get("student_id", "").strip()
+    date = form.get("date", "").strip()       # used also as created_at
+    mode = form.get("mode", "").strip()
+
+    # ----------------------------
+    # Collect counselor IDs
+    # ----------------------------
+    form_values = form.getlist("counselor_ids") + form.getlist("counselor_ids[]")
+    counselor_ids = set()
+    for v in form_values:
+        try:
+            counselor_ids.add(int(v))
+        except ValueError:
+            continue
+
+    # ----------------------------
+    # Detect critical issues
+    # ----------------------------
+    issue_count = int(form.get("issueCount", 0))
+    critical_issue_added = any(
+        form.get(f"issues[{i}][critical]") == "1"
+        for i in range(issue_count)
+    )
+    if critical_issue_added:
+        counselor_ids.add(HEAD_COUNSELOR_ID)
 
-        student_id = request.form.get("student_id", "").strip()
-        date = request.form.get("date", "").strip()       # used also as created_at
-        mode = request.form.get("mode", "").strip()
+    # ----------------------------
+    # Issues + categories + types
+    # ----------------------------
+    issues = []
+    for i in range(issue_count):
+        desc = form.get(f"issues[{i}][description]", "").strip()
+        if not desc:
+            continue
 
-        # ----------------------------
-        # Collect counselor IDs
-        # ----------------------------
-        form_values = request.form.getlist("counselor_ids") + request.form.getlist("counselor_ids[]")
-        selected_counselor_ids = set()
-        for v in form_values:
+        category_ids = []
+        for cat_id in form.getlist(f"issues[{i}][categories][]"):
             try:
-                selected_counselor_ids.add(int(v))
+                cat_id = int(cat_id)
             except ValueError:
                 continue
+            if cat_id not in category_ids:
+                category_ids.append(cat_id)
+
+        issues.append({
+            "description": desc,
+            "critical": form.get(f"issues[{i}][critical]") == "1",
+            "category_ids": category_ids,
+            "referral": f"issues[{i}][referral]" in form,
+            "referral_details": form.get(f"issues[{i}][referral_details]", ""),
+            "coursework": f"issues[{i}][coursework]" in form,
+            "course_id": form.get(f"issues[{i}][course_id]", "").strip() or None,
+            "financial": f"issues[{i}][financial]" in form,
+        })
 
-        # ----------------------------
-        # Detect critical issues
-        # ----------------------------
-        issueCount = int(request.form.get("issueCount", 0))
-        critical_issue_added = any(
-            request.form.get(f"issues[{i}][critical]") == "1"
-            for i in range(issueCount)
-        )
-        if critical_issue_added:
-            selected_counselor_ids.add(HEAD_COUNSELOR_ID)
-            app.logger.info("Critical issue detected, added counselor 113")
-
-        # ----------------------------
-        # Insert Visit
-        # ----------------------------
-        next_visit_id = cursor.execute("SELECT COALESCE(MAX(visit_id),0)+1 FROM Visit").fetchone()[0]
-        cursor.execute(
-            "INSERT INTO Visit (visit_id, student_id, date, mode) VALUES (?, ?, ?, ?)",
-            (next_visit_id, student_id, date, mode)
-        )
-
-        # ----------------------------
-        # Insert Visit_Counselor
-        # ----------------------------
-        for cid in sorted(selected_counselor_ids):
-            cursor.execute(
-                "INSERT OR IGNORE INTO Visit_Counselor (visit_id, counselor_id) VALUES (?, ?)",
-                (next_visit_id, cid)
-            )
+    # ----------------------------
+    # Suggestions
+    # ----------------------------
+    suggestions = []
+    suggestion_count = int(form.get("suggestionCount", 0))
+    for i in range(suggestion_count):
+        raw_cid = form.get(f"suggestions[{i}][counselor_id]")
+        details = form.get(f"suggestions[{i}][details]", "").strip()
+        if not raw_cid or not details:
+            continue
+        try:
+            suggestions.append((int(raw_cid), details))
+        except ValueError:
+            continue
 
-        # ----------------------------
-        # Auto-create Followup entries
-        # ----------------------------
-        if selected_counselor_ids:
-            next_followup_id = cursor.execute(
-                "SELECT COALESCE(MAX(followup_id),0)+1 FROM Followup"
-            ).fetchone()[0]
-
-            for cid in sorted(selected_counselor_ids):
-                cursor.execute(
-                    """
-                    INSERT INTO Followup (followup_id, visit_id, counselor_id, date, notes, complete)
-                    VALUES (?, ?, ?, NULL, NULL, NULL)
-                    """,
-                    (next_followup_id, next_visit_id, cid),
-                )
-                next_followup_id += 1
+    return {
+        "student_id": student_id,
+        "date": date,
+        "mode": mode,
+        "counselor_ids": sorted(counselor_ids),
+        "critical_issue_added": critical_issue_added,
+        "issues": issues,
+        "suggestions": suggestions,
+    }
 
-        # ----------------------------
-        # INSERT ISSUES + Issue_Category + Referral + Coursework + Financial
-        # ----------------------------
-        for i in range(issueCount):
 
-            desc = request.form.get(f"issues[{i}][description]", "").strip()
-            if not desc:
-                continue
+def write_visit_bundle(conn, bundle):
+    """
+    Insert a parsed visit bundle in a single BEGIN IMMEDIATE transaction.
+    Ids are reserved one block per table and every child table is written
+    with one executemany. Returns the new visit_id.
+    """
+    date = bundle["date"]
+    counselor_ids = bundle["counselor_ids"]
+    issues = bundle["issues"]
+    suggestions = bundle["suggestions"]
 
-            critical = request.form.get(f"issues[{i}][critical]") == "1"
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        visit_id = allocate_ids(conn, "Visit")
+        conn.execute(
+            "INSERT INTO Visit (visit_id, student_id, date, mode) VALUES (?, ?, ?, ?)",
+            (visit_id, bundle["student_id"], date, bundle["mode"])
+        )
 
-            # --- Create Issue ---
-            next_issue_id = cursor.execute(
-                "SELECT COALESCE(MAX(issue_id),0)+1 FROM Issue"
-            ).fetchone()[0]
+        # Visit_Counselor + one open Followup per counselor
+        if counselor_ids:
+            conn.executemany(
+                "INSERT OR IGNORE INTO Visit_Counselor (visit_id, counselor_id) VALUES (?, ?)",
+                [(visit_id, cid) for cid in counselor_ids]
+            )
+            first_followup_id = allocate_ids(conn, "Followup", len(counselor_ids))
+            conn.executemany(
+                """
+                INSERT INTO Followup (followup_id, visit_id, counselor_id, date, notes, complete)
+                VALUES (?, ?, ?, NULL, NULL, 0)
+                """,
+                [(first_followup_id + n, visit_id, cid) for n, cid in enumerate(counselor_ids)]
+            )
 
-            cursor.execute(
+        # Issues and everything hanging off them
+        issue_rows, category_rows, type_rows = [], [], []
+        referral_rows, coursework_rows, financial_rows = [], [], []
+        next_issue_id = allocate_ids(conn, "Issue", len(issues)) if issues else None
+        for n, issue in enumerate(issues):
+            issue_id = next_issue_id + n
+            issue_rows.append((issue_id, visit_id, issue["description"], int(issue["critical"])))
+            category_rows.extend((issue_id, cat_id) for cat_id in issue["category_ids"])
+            if issue["referral"]:
+                type_rows.append((issue_id, "Referral"))
+                referral_rows.append((issue_id, issue["referral_details"], date))
+            if issue["coursework"]:
+                type_rows.append((issue_id, "Coursework"))
+                coursework_rows.append((issue["course_id"], issue_id, date))
+            if issue["financial"]:
+                type_rows.append((issue_id, "Financial"))
+                financial_rows.append((issue_id, date))
+
+        if issue_rows:
+            conn.executemany(
                 "INSERT INTO Issue (issue_id, visit_id, issue_description, severity) VALUES (?, ?, ?, ?)",
-                (next_issue_id, next_visit_id, desc, int(critical))
+                issue_rows
+            )
+        if category_rows:
+            conn.executemany(
+                "INSERT OR IGNORE INTO Issue_Category (issue_id, category_id) VALUES (?, ?)",
+                category_rows
+            )
+        if type_rows:
+            conn.executemany(
+                "INSERT INTO Issue_Type (issue_id, issue_type) VALUES (?, ?)",
+                type_rows
+            )
+        if referral_rows:
+            first_id = allocate_ids(conn, "Referral", len(referral_rows))
+            conn.executemany(
+                """
+                INSERT INTO Referral
+                    (referral_id, issue_id, details, student_report, created_at, student_reported_at)
+                VALUES (?, ?, ?, NULL, ?, NULL)
+                """,
+                [(first_id + n,) + row for n, row in enumerate(referral_rows)]
+            )
+        if coursework_rows:
+            first_id = allocate_ids(conn, "Coursework", len(coursework_rows))
+            conn.executemany(
+                """
+                INSERT INTO Coursework
+                    (coursework_id, course_id, issue_id, dean_notes, student_report,
+                     created_at, student_reported_at)
+                VALUES (?, ?, ?, NULL, NULL, ?, NULL)
+                """,
+                [(first_id + n,) + row for n, row in enumerate(coursework_rows)]
+            )
+        if financial_rows:
+            first_id = allocate_ids(conn, "Financial", len(financial_rows))
+            conn.executemany(
+                """
+                INSERT INTO Financial
+                    (financial_id, issue_id, student_report, job_notes,
+                     created_at, student_reported_at)
+                VALUES (?, ?, NULL, NULL, ?, NULL)
+                """,
+                [(first_id + n,) + row for n, row in enumerate(financial_rows)]
             )
 
-            # --- Categories ---
-            for cat_id in request.form.getlist(f"issues[{i}][categories][]"):
-                if cat_id.strip():
-                    try:
-                        cursor.execute(
-                            "INSERT INTO Issue_Category (issue_id, category_id) VALUES (?, ?)",
-                            (next_issue_id, int(cat_id))
-                        )
-                    except Exception:
-                        pass
-
-            # ============================================================
-            # REFERRAL
-            # ============================================================
-            if f"issues[{i}][referral]" in request.form:
-                cursor.execute(
-                    "INSERT INTO Issue_Type (issue_id, issue_type) VALUES (?, 'Referral')",
-                    (next_issue_id,)
-                )
-
-                referral_details = request.form.get(f"issues[{i}][referral_details]", "")
-
-                next_ref_id = cursor.execute(
-                    "SELECT COALESCE(MAX(referral_id),0)+1 FROM Referral"
-                ).fetchone()[0]
-
-                cursor.execute(
-                    """
-                    INSERT INTO Referral
-                        (referral_id, issue_id, details, student_report, created_at, student_reported_at)
-                    VALUES (?, ?, ?, NULL, ?, NULL)
-                    """,
-                    (next_ref_id, next_issue_id, referral_details, date)
-                )
-
-            # ============================================================
-            # COURSEWORK
-            # ============================================================
-            if f"issues[{i}][coursework]" in request.form:
-
-                cursor.execute(
-                    "INSERT INTO Issue_Type (issue_id, issue_type) VALUES (?, 'Coursework')",
-                    (next_issue_id,)
-                )
-
-                course_id = request.form.get(f"issues[{i}][course_id]", "").strip() or None
-
-                next_coursework_id = cursor.execute(
-                    "SELECT COALESCE(MAX(coursework_id),0)+1 FROM Coursework"
-                ).fetchone()[0]
-
-                cursor.execute(
-                    """
-                    INSERT INTO Coursework
-                        (coursework_id, course_id, issue_id, dean_notes, student_report,
-                         created_at, student_reported_at)
-                    VALUES (?, ?, ?, NULL, NULL, ?, NULL)
-                    """,
-                    (next_coursework_id, course_id, next_issue_id, date)
-                )
+        # Suggestions
+        if suggestions:
+            first_id = allocate_ids(conn, "Suggestion", len(suggestions))
+            conn.executemany(
+                "INSERT INTO Suggestion (suggestion_id, visit_id, counselor_id, details) VALUES (?, ?, ?, ?)",
+                [(first_id + n, visit_id, cid, details) for n, (cid, details) in enumerate(suggestions)]
+            )
 
-            # ============================================================
-            # FINANCIAL
-            # ============================================================
-            if f"issues[{i}][financial]" in request.form:
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
 
-                cursor.execute(
-                    "INSERT INTO Issue_Type (issue_id, issue_type) VALUES (?, 'Financial')",
-                    (next_issue_id,)
-                )
+    return visit_id
 
-                next_fin_id = cursor.execute(
-                    "SELECT COALESCE(MAX(financial_id),0)+1 FROM Financial"
-                ).fetchone()[0]
-
-                cursor.execute(
-                    """
-                    INSERT INTO Financial
-                        (financial_id, issue_id, student_report, job_notes,
-                         created_at, student_reported_at)
-                    VALUES (?, ?, NULL, NULL, ?, NULL)
-                    """,
-                    (next_fin_id, next_issue_id, date)
-                )
 
-        # ----------------------------
-        # SUGGESTIONS
-        # ----------------------------
-        suggestionCount = int(request.form.get("suggestionCount", 0))
-        for i in range(suggestionCount):
-            raw_cid = request.form.get(f"suggestions[{i}][counselor_id]")
-            details = request.form.get(f"suggestions[{i}][details]", "").strip()
-            if not raw_cid or not details:
-                continue
-            try:
-                c_id = int(raw_cid)
-            except ValueError:
-                continue
+@app.route("/visits/new", methods=["GET", "POST"])
+def new_visit():
+    conn = get_db()
 
-            next_sugg_id = cursor.execute(
-                "SELECT COALESCE(MAX(suggestion_id),0)+1 FROM Suggestion"
-            ).fetchone()[0]
+    if request.method == "POST":
+        app.logger.info("Form data: %s", request.form.to_dict(flat=False))
 
-            cursor.execute(
-                "INSERT INTO Suggestion (suggestion_id, visit_id, counselor_id, details) VALUES (?, ?, ?, ?)",
-                (next_sugg_id, next_visit_id, c_id, details)
-            )
+        bundle = parse_visit_form(request.form)
+        if bundle["critical_issue_added"]:
+            app.logger.info("Critical issue detected, added counselor %s", HEAD_COUNSELOR_ID)
 
-        conn.commit()
-        conn.close()
+        write_visit_bundle(conn, bundle)
         return redirect(url_for("list_visits"))
 
-    conn.close()
+    students = lookup(conn, "students_by_name")
+    counselors = lookup(conn, "counselors_by_name")
+    categories = lookup(conn, "categories_by_name")
+    courses = lookup(conn, "courses_by_id")
+
     return render_template(
         "visit_form.html",
         students=students,
@@ -1154,21 +1862,17 @@ def new_visit():
     )
 
 
-
-
-
 @app.route("/visits/<int:visit_id>/delete", methods=["POST"])
 def delete_visit(visit_id):
-    conn = get_db_connection()
+    conn = get_db()
     conn.execute("DELETE FROM Visit WHERE visit_id = ?", (visit_id,))
     conn.commit()
-    conn.close()
     return redirect(url_for("list_visits"))
 
 
 @app.route("/visits/<int:visit_id>")
 def visit_detail(visit_id):
-    conn = get_db_connection()
+    conn = get_db()
 
     # Fetch visit info
     visit = conn.execute(
@@ -1187,7 +1891,6 @@ def visit_detail(visit_id):
     ).fetchone()
 
     if not visit:
-        conn.close()
         return "Visit not found", 404
 
     # Fetch counselors
@@ -1201,58 +1904,12 @@ def visit_detail(visit_id):
         (visit_id,)
     ).fetchall()
 
-    # Fetch issues
-    issues_raw = conn.execute(
-        """
-        SELECT
-            i.issue_id,
-            i.issue_description,
-            CASE
-              WHEN i.severity IN (1, '1', 'TRUE', 'True', 'true', 't', 'T') THEN 1
-              ELSE 0
-            END AS severity
-        FROM Issue i
-        WHERE i.visit_id = ?
-        ORDER BY i.issue_id
-        """,
-        (visit_id,)
-    ).fetchall()
-
+    # Fetch issues with their categories, types and referrals
     issues = []
-    for i in issues_raw:
-        issue = dict(i)
-
-        # Categories
-        categories = conn.execute(
-            """
-            SELECT c.name
-            FROM Category c
-            JOIN Issue_Category ic ON ic.category_id = c.category_id
-            WHERE ic.issue_id = ?
-            """,
-            (i["issue_id"],)
-        ).fetchall()
-        issue["categories"] = ", ".join([c["name"] for c in categories]) if categories else ""
-
-        # Types
-        types_rows = conn.execute(
-            "SELECT issue_type FROM Issue_Type WHERE issue_id = ?",
-            (i["issue_id"],)
-        ).fetchall()
-        issue_types_list = [t["issue_type"] for t in types_rows] if types_rows else []
-        issue["issue_types_list"] = issue_types_list
-        issue["issue_types"] = ", ".join(issue_types_list) if issue_types_list else ""
-
-        # Referral
-        if "Referral" in issue_types_list:
-            referral_rows = conn.execute(
-                "SELECT referral_id, details FROM Referral WHERE issue_id = ?",
-                (i["issue_id"],)
-            ).fetchall()
-            issue["referrals"] = [dict(r) for r in referral_rows]
-        else:
-            issue["referrals"] = []
-
+    for issue in load_visit_issues(conn, [visit_id])[visit_id]:
+        issue["categories"] = ", ".join(issue["categories"])
+        issue["issue_types_list"] = issue["types"]
+        issue["issue_types"] = ", ".join(issue["types"])
         issues.append(issue)
 
     # Fetch suggestions for this visit
@@ -1275,8 +1932,6 @@ def visit_detail(visit_id):
 
     suggestions = [dict(row) for row in suggestions_raw]
 
-    conn.close()
-
     return render_template(
         "visit_detail.html",
         visit=visit,
@@ -1291,7 +1946,7 @@ def update_suggestion(suggestion_id):
     student_report = request.form.get("student_report")
     reported_at = request.form.get("student_reported_at")
 
-    conn = get_db_connection()
+    conn = get_db()
     conn.execute(
         """
         UPDATE Suggestion
@@ -1308,7 +1963,6 @@ def update_suggestion(suggestion_id):
         (suggestion_id,)
     ).fetchone()["visit_id"]
 
-    conn.close()
     return redirect(url_for("visit_detail", visit_id=visit_id))
 
 
@@ -1317,19 +1971,18 @@ def update_suggestion(suggestion_id):
 
 @app.route("/visits/<int:visit_id>/edit", methods=["GET", "POST"])
 def edit_visit(visit_id):
-    conn = get_db_connection()
+    conn = get_db()
     
     # Get visit info
     visit = conn.execute(
         "SELECT * FROM Visit WHERE visit_id = ?", (visit_id,)
     ).fetchone()
     if not visit:
-        conn.close()
         return "Visit not found", 404
 
     # Students and counselors for dropdowns
-    students = conn.execute("SELECT student_id, name FROM Student").fetchall()
-    counselors = conn.execute("SELECT counselor_id, name FROM Counselor").fetchall()
+    students = lookup(conn, "students")
+    counselors = lookup(conn, "counselors")
     selected_counselors = [c['counselor_id'] for c in conn.execute(
         "SELECT counselor_id FROM Visit_Counselor WHERE visit_id = ?", (visit_id,)
     ).fetchall()]
@@ -1355,10 +2008,8 @@ def edit_visit(visit_id):
             )
 
         conn.commit()
-        conn.close()
         return redirect(url_for("visit_detail", visit_id=visit_id))
 
-    conn.close()
     return render_template("edit_visit.html",
                            visit=visit,
                            students=students,
@@ -1368,12 +2019,11 @@ def edit_visit(visit_id):
 
 @app.route("/issues/<int:issue_id>/edit", methods=["GET", "POST"])
 def edit_issue(issue_id):
-    conn = get_db_connection()
+    conn = get_db()
 
     # Fetch issue
     issue = conn.execute("SELECT * FROM Issue WHERE issue_id = ?", (issue_id,)).fetchone()
     if not issue:
-        conn.close()
         return "Issue not found", 404
 
     # Pull the visit date so that created_at = visit.created_at ALWAYS
@@ -1383,7 +2033,7 @@ def edit_issue(issue_id):
     ).fetchone()["date"]
 
     # Load categories
-    categories = conn.execute("SELECT category_id, name FROM Category").fetchall()
+    categories = lookup(conn, "categories")
     selected_categories = [row["category_id"] for row in conn.execute(
         "SELECT category_id FROM Issue_Category WHERE issue_id = ?", (issue_id,)
     ).fetchall()]
@@ -1410,7 +2060,7 @@ def edit_issue(issue_id):
     financial_exists = ("Financial" in types)
 
     # Load courses
-    all_courses = conn.execute("SELECT course_id, course_name FROM Course").fetchall()
+    all_courses = lookup(conn, "courses")
 
     # ============= POST =============
     if request.method == "POST":
@@ -1456,7 +2106,7 @@ def edit_issue(issue_id):
                     (referral_text, issue_id)
                 )
             else:
-                new_id = conn.execute("SELECT COALESCE(MAX(referral_id),0)+1 FROM Referral").fetchone()[0]
+                new_id = allocate_ids(conn, "Referral")
                 conn.execute(
                     "INSERT INTO Referral (referral_id, issue_id, details, created_at) "
                     "VALUES (?, ?, ?, ?)",
@@ -1479,7 +2129,7 @@ def edit_issue(issue_id):
                     (course_id, issue_id)
                 )
             else:
-                new_id = conn.execute("SELECT COALESCE(MAX(coursework_id),0)+1 FROM Coursework").fetchone()[0]
+                new_id = allocate_ids(conn, "Coursework")
                 conn.execute(
                     "INSERT INTO Coursework (coursework_id, issue_id, course_id, created_at) "
                     "VALUES (?, ?, ?, ?)",
@@ -1497,7 +2147,7 @@ def edit_issue(issue_id):
 
             exists = conn.execute("SELECT 1 FROM Financial WHERE issue_id=?", (issue_id,)).fetchone()
             if not exists:
-                new_id = conn.execute("SELECT COALESCE(MAX(financial_id),0)+1 FROM Financial").fetchone()[0]
+                new_id = allocate_ids(conn, "Financial")
                 conn.execute(
                     "INSERT INTO Financial (financial_id, issue_id, created_at) "
                     "VALUES (?, ?, ?)",
@@ -1508,10 +2158,8 @@ def edit_issue(issue_id):
             conn.execute("DELETE FROM Financial WHERE issue_id=?", (issue_id,))
 
         conn.commit()
-        conn.close()
         return redirect(url_for("visit_detail", visit_id=issue["visit_id"]))
 
-    conn.close()
     return render_template(
         "edit_issue.html",
         issue=issue,
@@ -1529,61 +2177,144 @@ def edit_issue(issue_id):
 
 
 # ---------- SQL Console ----------
+def run_console_query(query):
+    """(cursor, error) for a console query; only SELECTs run, on a read-only connection."""
+    if not query.lstrip().upper().startswith("SELECT"):
+        return None, "Only SELECT queries are allowed (read-only)."
+    try:
+        # Always a mode=ro connection, so the database itself rejects writes
+        return get_db(write=False).execute(query), None
+    except sqlite3.Error as e:
+        return None, f"SQL error: {e}"
+
+
+def capped_rows(cur, limit, result):
+    """
+    Yield at most `limit` rows, fetched EXPORT_BATCH_SIZE at a time. Sets result["truncated"]
+    if the query had more, and result["error"] if fetching failed part way through.
+    """
+    shown = 0
+    try:
+        for rows in iter(lambda: cur.fetchmany(EXPORT_BATCH_SIZE), []):
+            for row in rows:
+                if shown == limit:
+                    result["truncated"] = True
+                    return
+                shown += 1
+                yield row
+    except sqlite3.Error as e:
+        result["error"] = f"SQL error: {e}"
+    finally:
+        cur.close()  # the rest of a truncated result is never stepped through
+
+
+def stream_page(template_name, **context):
+    """
+    Like render_template, but the page is sent while the template renders, so a long loop
+    goes out in pieces instead of being built in memory first. Output is grouped
+    STREAM_BUFFER template pieces at a time rather than sent one tiny string per tag.
+    """
+    app.update_template_context(context)
+    stream = app.jinja_env.get_template(template_name).stream(context)
+    stream.enable_buffering(STREAM_BUFFER)
+    return app.response_class(stream_with_context(stream))
+
+
 @app.route("/sql", methods=["GET", "POST"])
 def sql_console():
+    """
+    Runs a read-only query and streams the result table as it is fetched, stopping after
+    SQL_CONSOLE_ROW_LIMIT rows with a notice; the full result is available as a CSV download.
+    """
     query = ""
     headers = []
     rows = []
+    result = {"truncated": False, "error": None}
     error = None
 
     if request.method == "POST":
         query = request.form.get("query", "").strip()
 
         if query:
-            upper = query.lstrip().upper()
-            if not upper.startswith("SELECT"):
-                error = "Only SELECT queries are allowed (read-only)."
-            else:
-                conn = None
-                try:
-                    conn = get_db_connection()
-                    cur = conn.execute(query)
-                    rows = cur.fetchall()
-                    # cur.description has column metadata
-                    if cur.description:
-                        headers = [col[0] for col in cur.description]
-                except sqlite3.Error as e:
-                    error = f"SQL error: {e}"
-                finally:
-                    if conn:
-                        conn.close()
-
-    return render_template(
+            cur, error = run_console_query(query)
+            if cur is not None:
+                # cur.description has column metadata
+                if cur.description:
+                    headers = [col[0] for col in cur.description]
+                rows = capped_rows(cur, SQL_CONSOLE_ROW_LIMIT, result)
+
+    return stream_page(
         "sql_console.html",
         query=query,
         headers=headers,
         rows=rows,
+        result=result,
+        row_limit=SQL_CONSOLE_ROW_LIMIT,
         error=error,
     )
 
+
+@app.route("/sql/export", methods=["POST"])
+def sql_export():
+    """Streams the full result of a console query as CSV, however many rows it has."""
+    cur, error = run_console_query(request.form.get("query", "").strip())
+    if error:
+        return error, 400
+    if not cur.description:
+        return "The query returned no columns", 400
+    return download(stream_csv(cur), "query.csv", EXPORT_FORMATS["csv"])
+
 # ---------- REFERRALS & FOLLOWUPS ----------
+# The referrals page's filters and section cursors: what its inline forms carry along
+# so saving a row returns to the same pages
+REFERRAL_PAGE_ARGS = (
+    "student", "outstanding", "per_page",
+    "ref_after", "ref_before", "cw_after", "cw_before", "fin_after", "fin_before",
+)
+
+
 @app.route("/referrals")
+@conditional_page
 def list_referrals():
     student_filter = request.args.get("student", None)
 
-    conn = get_db_connection()
+    conn = get_db()
 
     # For dropdown filter
-    students = conn.execute("""
-        SELECT DISTINCT name FROM Student ORDER BY name
-    """).fetchall()
+    students = lookup(conn, "student_names")
+
+    outstanding_only = request.args.get("outstanding") == "1"
+    per_page = page_size(request.args)
+
+    # Each section is paged on its own cursor (ref_/cw_/fin_after and _before),
+    # newest first by (created_on, id): created_at as YYYY-MM-DD (migration 015), so the
+    # order is by date even though the dates are typed as M/D/YYYY. In outstanding-only mode the unreported
+    # condition matches the partial indexes from migration 015 word for word, so
+    # SQLite pages through those instead of the whole table.
+    def section(select_sql, alias, key, prefix):
+        conditions, params = [], []
+        if student_filter:
+            conditions.append("s.name = ?")
+            params.append(student_filter)
+        if outstanding_only:
+            conditions.append(f"({alias}.student_reported_at IS NULL OR {alias}.student_reported_at = '')")
+        rows, prev_cursor, next_cursor = keyset_page(
+            conn, select_sql, conditions, params,
+            keys=[(f"{alias}.created_on", "created_on"), (f"{alias}.{key}", key)],
+            per_page=per_page,
+            after=request.args.get(f"{prefix}after"),
+            before=request.args.get(f"{prefix}before"),
+            descending=True,
+        )
+        return rows, page_links(prev_cursor, next_cursor, prefix)
 
     # Referrals --------------------------------------------------------------------
-    referrals_query = """
+    referrals, referral_pages = section("""
         SELECT
           r.referral_id,
           r.issue_id,
           r.created_at,
+          r.created_on,
           r.details,
           r.student_report,
           r.student_reported_at,
@@ -1593,20 +2324,10 @@ def list_referrals():
         JOIN Issue i ON i.issue_id = r.issue_id
         JOIN Visit v ON v.visit_id = i.visit_id
         JOIN Student s ON s.student_id = v.student_id
-    """
-
-    params = []
-
-    if student_filter:
-        referrals_query += " WHERE s.name = ? "
-        params.append(student_filter)
-
-    referrals_query += " ORDER BY r.created_at DESC, r.referral_id DESC "
-
-    referrals = conn.execute(referrals_query, params).fetchall()
+    """, "r", "referral_id", "ref_")
 
     # Coursework -------------------------------------------------------------------
-    coursework = conn.execute(f"""
+    coursework, coursework_pages = section("""
         SELECT
           c.coursework_id,
           c.course_id,
@@ -1615,18 +2336,17 @@ def list_referrals():
           c.student_report,
           c.student_reported_at,
           c.created_at,
+          c.created_on,
           v.visit_id,
           s.name AS student_name
         FROM Coursework c
         JOIN Issue i ON i.issue_id = c.issue_id
         JOIN Visit v ON v.visit_id = i.visit_id
         JOIN Student s ON s.student_id = v.student_id
-        { "WHERE s.name = ?" if student_filter else "" }
-        ORDER BY c.created_at DESC, c.coursework_id DESC
-    """, params if student_filter else []).fetchall()
+    """, "c", "coursework_id", "cw_")
 
     # Financial --------------------------------------------------------------------
-    financial = conn.execute(f"""
+    financial, financial_pages = section("""
         SELECT
           f.financial_id,
           f.issue_id,
@@ -1634,17 +2354,14 @@ def list_referrals():
           f.student_report,
           f.student_reported_at,
           f.created_at,
+          f.created_on,
           v.visit_id,
           s.name AS student_name
         FROM Financial f
         JOIN Issue i ON i.issue_id = f.issue_id
         JOIN Visit v ON v.visit_id = i.visit_id
         JOIN Student s ON s.student_id = v.student_id
-        { "WHERE s.name = ?" if student_filter else "" }
-        ORDER BY f.created_at DESC, f.financial_id DESC
-    """, params if student_filter else []).fetchall()
-
-    conn.close()
+    """, "f", "financial_id", "fin_")
 
     return render_template(
         "referrals.html",
@@ -1652,6 +2369,13 @@ def list_referrals():
         referrals=referrals,
         coursework=coursework,
         financial=financial,
+        referral_pages=referral_pages,
+        coursework_pages=coursework_pages,
+        financial_pages=financial_pages,
+        outstanding_only=outstanding_only,
+        per_page=per_page,
+        page_sizes=PAGE_SIZES,
+        page_args=page_args(REFERRAL_PAGE_ARGS),
         student_filter=student_filter
     )
 
@@ -1663,16 +2387,16 @@ def update_referral_inline(referral_id):
     new_report = request.form.get("student_report")
     new_reported_at = request.form.get("student_reported_at")
 
-    conn = get_db_connection()
+    conn = get_db()
     conn.execute("""
         UPDATE Referral
         SET student_report = ?, student_reported_at = ?
         WHERE referral_id = ?
     """, (new_report, new_reported_at, referral_id))
     conn.commit()
-    conn.close()
 
-    return redirect(url_for("list_referrals"))
+    # The form posts with the page's query string, so this lands back on the same pages
+    return redirect(url_for("list_referrals", **page_args(REFERRAL_PAGE_ARGS)))
 
 
 @app.route("/update_coursework_inline/<int:coursework_id>", methods=["POST"])
@@ -1681,16 +2405,16 @@ def update_coursework_inline(coursework_id):
     student_report = request.form.get("student_report")
     student_reported_at = request.form.get("student_reported_at")
 
-    conn = get_db_connection()
+    conn = get_db()
     conn.execute("""
         UPDATE Coursework
         SET dean_notes = ?, student_report = ?, student_reported_at = ?
         WHERE coursework_id = ?
     """, (dean_notes, student_report, student_reported_at, coursework_id))
     conn.commit()
-    conn.close()
 
-    return redirect(url_for("list_referrals"))
+    # The form posts with the page's query string, so this lands back on the same pages
+    return redirect(url_for("list_referrals", **page_args(REFERRAL_PAGE_ARGS)))
 
 
 @app.route("/update_financial_inline/<int:financial_id>", methods=["POST"])
@@ -1699,23 +2423,23 @@ def update_financial_inline(financial_id):
     student_report = request.form.get("student_report")
     student_reported_at = request.form.get("student_reported_at")
 
-    conn = get_db_connection()
+    conn = get_db()
     conn.execute("""
         UPDATE Financial
         SET job_notes = ?, student_report = ?, student_reported_at = ?
         WHERE financial_id = ?
     """, (job_notes, student_report, student_reported_at, financial_id))
     conn.commit()
-    conn.close()
 
-    return redirect(url_for("list_referrals"))
+    # The form posts with the page's query string, so this lands back on the same pages
+    return redirect(url_for("list_referrals", **page_args(REFERRAL_PAGE_ARGS)))
 
 
 # ------------------ DIAGNOSIS ROUTES ------------------
 
 @app.route("/diagnosis/<int:diagnosis_id>/edit", methods=["POST"])
 def edit_diagnosis(diagnosis_id):
-    conn = get_db_connection()
+    conn = get_db()
     diagnosis_date = request.form["diagnosis_date"]
     provider_id = request.form["provider_id"]
     diagnosis_code = request.form["diagnosis_code"]
@@ -1731,22 +2455,23 @@ def edit_diagnosis(diagnosis_id):
     # Remove old symptoms
     conn.execute("DELETE FROM Symptom WHERE diagnosis_id=?", (diagnosis_id,))
     # Insert new symptoms
-    for s in symptoms:
-        conn.execute("INSERT INTO Symptom (diagnosis_id, symptom_code) VALUES (?, ?)",
-                     (diagnosis_id, s))
+    if symptoms:
+        first_id = allocate_ids(conn, "Symptom", len(symptoms))
+        for offset, s in enumerate(symptoms):
+            conn.execute("INSERT INTO Symptom (symptom_id, diagnosis_id, symptom_code) VALUES (?, ?, ?)",
+                         (first_id + offset, diagnosis_id, s))
 
     conn.commit()
 
     # Get the student_id to redirect back to their page
     student_id = conn.execute("SELECT student_id FROM Diagnosis WHERE diagnosis_id=?",
                               (diagnosis_id,)).fetchone()["student_id"]
-    conn.close()
     return redirect(url_for("view_student", student_id=student_id))
 
 
 @app.route("/diagnosis/<int:diagnosis_id>/delete", methods=["GET", "POST"])
 def delete_diagnosis(diagnosis_id):
-    conn = get_db_connection()
+    conn = get_db(write=True)
     # Get student_id before deleting
     student_id = conn.execute("SELECT student_id FROM Diagnosis WHERE diagnosis_id=?",
                               (diagnosis_id,)).fetchone()["student_id"]
@@ -1755,21 +2480,19 @@ def delete_diagnosis(diagnosis_id):
     # Also remove associated symptoms
     conn.execute("DELETE FROM Symptom WHERE diagnosis_id=?", (diagnosis_id,))
     conn.commit()
-    conn.close()
     return redirect(url_for("view_student", student_id=student_id))
 
 
 @app.route("/students/<int:student_id>/diagnosis/add", methods=["POST"])
 def add_diagnosis(student_id):
-    conn = get_db_connection()
+    conn = get_db()
     diagnosis_date = request.form["diagnosis_date"]
     provider_id = request.form["provider_id"]
     diagnosis_code = request.form["diagnosis_code"]
     symptoms = request.form.getlist("symptoms")
 
     # Generate a new diagnosis_id
-    row = conn.execute("SELECT COALESCE(MAX(diagnosis_id), 0) + 1 AS next_id FROM Diagnosis").fetchone()
-    new_id = row["next_id"]
+    new_id = allocate_ids(conn, "Diagnosis")
 
     # Insert new diagnosis
     conn.execute("""
@@ -1778,11 +2501,13 @@ def add_diagnosis(student_id):
     """, (new_id, student_id, provider_id, diagnosis_code, diagnosis_date))
 
     # Insert symptoms
-    for s in symptoms:
-        conn.execute("INSERT INTO Symptom (diagnosis_id, symptom_code) VALUES (?, ?)", (new_id, s))
+    if symptoms:
+        first_id = allocate_ids(conn, "Symptom", len(symptoms))
+        for offset, s in enumerate(symptoms):
+            conn.execute("INSERT INTO Symptom (symptom_id, diagnosis_id, symptom_code) VALUES (?, ?, ?)",
+                         (first_id + offset, new_id, s))
 
     conn.commit()
-    conn.close()
     return redirect(url_for("view_student", student_id=student_id))
 
 
@@ -1791,25 +2516,24 @@ def add_diagnosis(student_id):
 @app.route("/students/<int:student_id>/course/add", methods=["POST"])
 def add_course(student_id):
     course_id = request.form["course_id"]
-    conn = get_db_connection()
+    conn = get_db()
     conn.execute("INSERT INTO Student_Course (student_id, course_id) VALUES (?, ?)", (student_id, course_id))
     conn.commit()
-    conn.close()
     return redirect(url_for("view_student", student_id=student_id))
 
 
 @app.route("/students/<int:student_id>/course/<int:course_id>/remove", methods=["GET", "POST"])
 def remove_course(student_id, course_id):
-    conn = get_db_connection()
+    conn = get_db(write=True)
     conn.execute("DELETE FROM Student_Course WHERE student_id=? AND course_id=?", (student_id, course_id))
     conn.commit()
-    conn.close()
     return redirect(url_for("view_student", student_id=student_id))
 
 
 @app.route("/courses")
+@conditional_page
 def list_courses():
-    conn = get_db_connection()
+    conn = get_db()
 
     # Filters
     teacher_filter = request.args.get("teacher", "")
@@ -1820,19 +2544,18 @@ def list_courses():
     students_op = request.args.get("students_op", "")
     students_val = request.args.get("students_val", "")
 
-    # Base query: count issues and students
+    # Base query: issue and student counts come from Course_Stats, which triggers keep current
     query = """
-        SELECT 
+        SELECT
             c.course_id,
             c.course_name,
             c.period,
             c.teacher,
             c.classroom,
-            COUNT(DISTINCT cs.coursework_id) AS num_issues,
-            COUNT(DISTINCT sc.student_id) AS num_students
+            cs.num_issues,
+            cs.num_students
         FROM Course c
-        LEFT JOIN Coursework cs ON cs.course_id = c.course_id
-        LEFT JOIN Student_Course sc ON sc.course_id = c.course_id
+        JOIN Course_Stats cs ON cs.course_id = c.course_id
         WHERE 1=1
     """
     params = []
@@ -1848,13 +2571,11 @@ def list_courses():
         query += " AND c.classroom = ?"
         params.append(classroom_filter)
 
-    query += " GROUP BY c.course_id HAVING 1=1"
-
     # Filter by # of issues
     if issues_val and issues_op in (">", "<", "="):
         try:
             issues_val_int = int(issues_val)
-            query += f" AND COUNT(DISTINCT cs.coursework_id) {issues_op} ?"
+            query += f" AND cs.num_issues {issues_op} ?"
             params.append(issues_val_int)
         except ValueError:
             pass
@@ -1863,7 +2584,7 @@ def list_courses():
     if students_val and students_op in (">", "<", "="):
         try:
             students_val_int = int(students_val)
-            query += f" AND COUNT(DISTINCT sc.student_id) {students_op} ?"
+            query += f" AND cs.num_students {students_op} ?"
             params.append(students_val_int)
         except ValueError:
             pass
@@ -1872,24 +2593,20 @@ def list_courses():
 
     courses = conn.execute(query, params).fetchall()
 
-    # Get student lists per course
-    course_students = {}
-    for course in courses:
-        students = conn.execute("""
-            SELECT s.student_id, s.name
-            FROM Student_Course sc
-            JOIN Student s ON s.student_id = sc.student_id
-            WHERE sc.course_id = ?
-            ORDER BY s.name
-        """, (course["course_id"],)).fetchall()
-        course_students[course["course_id"]] = students
-
-    # Distinct options for filters
-    teachers = [row["teacher"] for row in conn.execute("SELECT DISTINCT teacher FROM Course").fetchall()]
-    periods = [row["period"] for row in conn.execute("SELECT DISTINCT period FROM Course").fetchall()]
-    classrooms = [row["classroom"] for row in conn.execute("SELECT DISTINCT classroom FROM Course").fetchall()]
+    # Student lists for every listed course in one query
+    course_students = {course["course_id"]: [] for course in courses}
+    course_students.update(group_rows(conn.execute("""
+        SELECT sc.course_id, s.student_id, s.name
+        FROM Student_Course sc
+        JOIN Student s ON s.student_id = sc.student_id
+        WHERE sc.course_id IN (SELECT value FROM json_each(?))
+        ORDER BY sc.course_id, s.name
+    """, (json.dumps(list(course_students)),)).fetchall(), "course_id"))
 
-    conn.close()
+    # Distinct options for filters (with course counts)
+    teachers = lookup(conn, "teachers")
+    periods = lookup(conn, "periods")
+    classrooms = lookup(conn, "classrooms")
 
     return render_template(
         "courses.html",
@@ -1938,458 +2655,842 @@ def reports_index():
     return render_template("reports.html", reports=reports)
 
 
+# ---------- REPORT REGISTRY ----------
+# One entry per report: what the page shows, the tables its SQL reads and the SQL itself.
+# "tables" is what the result cache is invalidated by, so it must name every table the
+# SQL touches (check-query-plans verifies this). Reports taking query-string input
+# declare a "params" function that turns request.args into the SQL's ? values, or
+# None when there is nothing to run yet, and list the arguments it reads in REPORT_ARGS.
+REPORT_ARGS = ("keyword",)
+
+
+def keyword_pattern(args):
+    keyword = args.get("keyword", "").strip()
+    return (f"%{keyword}%",) if keyword else None
+
+
+REPORTS = {
+    # ---------- 1. Counselor data ----------
+    1: {
+        "title": "1. Counselor data (directory)",
+        "description": "Lists all counselors with their type, education, and experience.",
+        "tables": ("Counselor",),
+        "sql": """
+            SELECT
+                counselor_id,
+                name,
+                paid_volunteer,
+                education,
+                experience
+            FROM Counselor
+            ORDER BY name
+        """,
+    },
+
+    # ---------- 2. Student data ----------
+    2: {
+        "title": "2. Student data (directory)",
+        "description": "Lists all students with basic demographics.",
+        "tables": ("Student",),
+        "sql": """
+            SELECT
+                student_id,
+                name,
+                dob,
+                country_of_birth,
+                gender,
+                consent,
+                zip_code
+            FROM Student
+            ORDER BY name
+        """,
+    },
+
+    # ---------- 3. Demographics: which country is most common ----------
+    3: {
+        "title": "3. Student demographics by country",
+        "description": (
+            "Counts how many students come from each country of birth, "
+            "sorted by the most common country."
+        ),
+        "tables": ("Student",),
+        "sql": """
+            SELECT
+                country_of_birth AS Country,
+                COUNT(*) AS num_students
+            FROM Student
+            GROUP BY country_of_birth
+            ORDER BY num_students DESC, country_of_birth
+        """,
+    },
+
+    # ---------- 4. Different types of issues / concerns ----------
+    4: {
+        "title": "4. Types of issues & categories",
+        "description": (
+            "Shows counts of issues by issue type and by category "
+            "in a single combined table."
+        ),
+        "tables": ("Issue_Type", "Category", "Issue_Category"),
+        "sql": """
+            SELECT
+                'Issue type' AS dimension_kind,
+                it.issue_type AS dimension,
+                COUNT(*) AS num_issues
+            FROM Issue_Type it
+            GROUP BY it.issue_type
+
+            UNION ALL
+
+            SELECT
+                'Category' AS dimension_kind,
+                c.name AS dimension,
+                COUNT(*) AS num_issues
+            FROM Category c
+            JOIN Issue_Category ic ON ic.category_id = c.category_id
+            GROUP BY c.category_id, c.name
+
+            ORDER BY dimension_kind, num_issues DESC, dimension
+        """,
+    },
+
+    # ---------- 5. Frequency of visit by each student ----------
+    5: {
+        "title": "5. Visit frequency by student",
+        "description": "Shows how many counseling visits each student has had.",
+        "tables": ("Student", "Visit"),
+        "sql": """
+            SELECT
+                s.student_id,
+                s.name,
+                COUNT(v.visit_id) AS num_visits
+            FROM Student s
+            LEFT JOIN Visit v ON v.student_id = s.student_id
+            GROUP BY s.student_id, s.name
+            ORDER BY num_visits DESC, s.name
+        """,
+    },
+
+    # ---------- 6. Number of students per counselor ----------
+    6: {
+        "title": "6. Number of students per counselor",
+        "description": "For each counselor, shows how many distinct students they have seen.",
+        "tables": ("Counselor", "Visit_Counselor", "Visit"),
+        "sql": """
+            SELECT
+                c.counselor_id,
+                c.name,
+                COUNT(DISTINCT v.student_id) AS num_students
+            FROM Counselor c
+            LEFT JOIN Visit_Counselor vc
+                ON vc.counselor_id = c.counselor_id
+            LEFT JOIN Visit v
+                ON v.visit_id = vc.visit_id
+            GROUP BY c.counselor_id, c.name
+            ORDER BY num_students DESC, c.name
+        """,
+    },
+
+    # ---------- 7. Number of students for each category of problems ----------
+    7: {
+        "title": "7. Number of students per issue category",
+        "description": (
+            "Counts how many distinct students have at least one issue "
+            "in each problem category."
+        ),
+        "tables": ("Category", "Issue_Category", "Issue", "Visit"),
+        "sql": """
+            SELECT
+                cat.category_id,
+                cat.name AS category_name,
+                COUNT(DISTINCT v.student_id) AS num_students
+            FROM Category cat
+            LEFT JOIN Issue_Category ic
+                ON ic.category_id = cat.category_id
+            LEFT JOIN Issue i
+                ON i.issue_id = ic.issue_id
+            LEFT JOIN Visit v
+                ON v.visit_id = i.visit_id
+            GROUP BY cat.category_id, cat.name
+            ORDER BY num_students DESC, cat.name
+        """,
+    },
+
+    # ---------- 8. Number of times referred to healthcare / jobs / dean, etc. ----------
+    8: {
+        "title": "8. Counts of referrals / financial / coursework help",
+        "description": (
+            "Shows how many records there are for healthcare referrals, "
+            "job/financial help, and coursework/dean/tutor support."
+        ),
+        "tables": ("Referral", "Financial", "Coursework"),
+        "sql": """
+            SELECT 'Healthcare referrals' AS type, COUNT(*) AS num_records
+            FROM Referral
+
+            UNION ALL
+
+            SELECT 'Job / financial help' AS type, COUNT(*) AS num_records
+            FROM Financial
+
+            UNION ALL
+
+            SELECT 'Coursework / dean / tutor support' AS type, COUNT(*) AS num_records
+            FROM Coursework
+        """,
+    },
+
+    # ---------- 9. Students flagged as critical ----------
+    9: {
+        "title": "9. Students flagged as critical (severity = TRUE)",
+        "description": (
+            "Lists students who have at least one issue marked as critical "
+            "(severity = 1)."
+        ),
+        "tables": ("Student", "Visit", "Issue"),
+        "sql": """
+            SELECT DISTINCT
+                s.student_id,
+                s.name,
+                s.zip_code
+            FROM Student s
+            JOIN Visit v ON v.student_id = s.student_id
+            JOIN Issue i ON i.visit_id = v.visit_id
+            WHERE i.severity = 1
+            ORDER BY s.name
+        """,
+    },
+
+    # ---------- 10. Students who did not report back after receiving advice ----------
+    10: {
+        "title": "10. Students who have not reported back after support",
+        "description": (
+            "Shows students who have outstanding items (suggestions, referrals, "
+            "financial, or coursework) with no student_reported_at date."
+        ),
+        "tables": ("Outstanding_Item", "Student"),
+        "sql": """
+            SELECT DISTINCT
+                s.student_id,
+                s.name,
+                o.source
+            FROM Outstanding_Item o
+            JOIN Student s ON s.student_id = o.student_id
+            ORDER BY s.name, o.source
+        """,
+    },
+
+    # ---------- 11. Counselors who never followed up with any student ----------
+    11: {
+        "title": "11. Counselors With Open Follow-Ups",
+        "description": "Shows counselors that still have open follow-ups, and how many.",
+        "tables": ("Counselor", "Open_Followup"),
+        "sql": """
+            SELECT
+                c.counselor_id,
+                c.name,
+                c.paid_volunteer,
+                q.open_followups
+            FROM Counselor c
+            JOIN (
+                SELECT counselor_id, COUNT(*) AS open_followups
+                FROM Open_Followup
+                GROUP BY counselor_id
+            ) q ON q.counselor_id = c.counselor_id
+            ORDER BY c.name
+        """,
+    },
+
+    # ---------- 12. Counselors on payroll vs volunteers ----------
+    12: {
+        "title": "12. Counselors on payroll vs volunteers",
+        "description": "Shows each counselor's role and also the counts by type.",
+        "tables": ("Counselor",),
+        "sql": """
+            SELECT
+                counselor_id,
+                name,
+                paid_volunteer AS role
+            FROM Counselor
+            ORDER BY role, name
+        """,
+    },
+
+    # ---------- 13. Min, max, avg salary of paid counselors ----------
+    13: {
+        "title": "13. Min / Max / Avg salary of paid counselors",
+        "description": "Summary statistics for counselor salaries.",
+        "tables": ("Counselor_Salary",),
+        "sql": """
+            SELECT
+                MIN(salary) AS min_salary,
+                MAX(salary) AS max_salary,
+                AVG(salary) AS avg_salary
+            FROM Counselor_Salary
+        """,
+    },
+
+    # ---------- 14. Students who have multiple issues ----------
+    14: {
+        "title": "14. Students with multiple issues",
+        "description": (
+            "Lists students who have 2 or more distinct issues recorded."
+        ),
+        "tables": ("Student", "Visit", "Issue"),
+        "sql": """
+            SELECT
+                s.student_id,
+                s.name,
+                COUNT(DISTINCT i.issue_id) AS num_issues
+            FROM Student s
+            JOIN Visit v ON v.student_id = s.student_id
+            JOIN Issue i ON i.visit_id = v.visit_id
+            GROUP BY s.student_id, s.name
+            HAVING COUNT(DISTINCT i.issue_id) >= 2
+            ORDER BY num_issues DESC, s.name
+        """,
+    },
+
+    # ---------- 15. Students who reported a certain issue (e.g. bullying) ----------
+    15: {
+        "title": "15. Students with a specific issue keyword",
+        "description": (
+            "Enter a keyword below to find all students who reported issues containing that word."
+        ),
+        "tables": ("Issue", "Visit", "Student"),
+        "params": keyword_pattern,
+        "sql": """
+            SELECT DISTINCT
+                s.student_id,
+                s.name,
+                i.issue_id,
+                i.issue_description
+            FROM Issue i
+            JOIN Visit v ON v.visit_id = i.visit_id
+            JOIN Student s ON s.student_id = v.student_id
+            WHERE i.issue_description LIKE ?
+            ORDER BY s.name
+        """,
+    },
+
+    # ---------- 16. Number of students with health issues per ZIP code ----------
+    16: {
+        "title": "16. Students with health issues per ZIP code",
+        "description": (
+            "Counts how many distinct students with at least one diagnosis live in each ZIP code."
+        ),
+        "tables": ("Diagnosis", "Student"),
+        "sql": """
+            SELECT
+                s.zip_code,
+                COUNT(DISTINCT s.student_id) AS num_students_with_health_issues
+            FROM Diagnosis d
+            JOIN Student s ON s.student_id = d.student_id
+            GROUP BY s.zip_code
+            ORDER BY num_students_with_health_issues DESC, s.zip_code
+        """,
+    },
+
+    # ---------- 17. Courses & number of students with academic difficulty ----------
+    17: {
+        "title": "17. Courses with academic difficulty",
+        "description": (
+            "Shows courses and how many distinct students have coursework-related issues in those courses."
+        ),
+        "tables": ("Course_Stats", "Course"),
+        "sql": """
+            SELECT
+                c.course_id,
+                c.course_name,
+                cs.num_difficulty_students AS num_students_with_difficulty
+            FROM Course_Stats cs
+            JOIN Course c ON c.course_id = cs.course_id
+            WHERE cs.num_difficulty_students > 0
+            ORDER BY num_students_with_difficulty DESC, c.course_name
+        """,
+    },
+}
+
+# Results keyed by (report id, params), each stored with the generations of the report's
+# tables at the time it ran. Oldest entries are dropped past REPORT_CACHE_SIZE.
+REPORT_CACHE_SIZE = 256
+_report_cache = {}
+report_cache_stats = {"hits": 0, "misses": 0}
+
+
+def report_params(report, args):
+    """The report's ? values from the query string: () if it takes none, None if they are missing."""
+    return report["params"](args) if "params" in report else ()
+
+
+def run_report(conn, report_id, args):
+    """(headers, rows) for a report, served from the cache while none of its tables changed."""
+    report = REPORTS[report_id]
+    params = report_params(report, args)
+    if params is None:
+        return [], []
+
+    key = (report_id, params)
+    generations = table_generations(conn)
+    stamp = tuple(generations.get(table) for table in report["tables"])
+    with _cache_lock:
+        cached = _report_cache.pop(key, None)
+        if cached and None not in stamp and cached[0] == stamp:
+            _report_cache[key] = cached  # re-insert as most recently used
+            report_cache_stats["hits"] += 1
+            return cached[1], cached[2]
+        report_cache_stats["misses"] += 1
+
+    cur = conn.execute(report["sql"], params)
+    headers = [col[0] for col in cur.description]
+    rows = tuple(cur.fetchall())
+    with _cache_lock:
+        _report_cache[key] = (stamp, headers, rows)
+        while len(_report_cache) > REPORT_CACHE_SIZE:
+            _report_cache.pop(next(iter(_report_cache)))
+    return headers, rows
+
+
 @app.route("/reports/<int:report_id>")
+@conditional_page
 def report_detail(report_id):
     """
     Runs a specific pre-written SQL report that corresponds to one of the requirements from the assignment
     and shows the result in a table.
     """
-    title = ""
-    description = ""
+    report = REPORTS.get(report_id, {})
     headers = []
     rows = []
     error = None
 
-    conn = get_db_connection()
-    try:
-        # ---------- 1. Counselor data ----------
-        if report_id == 1:
-            title = "1. Counselor data (directory)"
-            description = "Lists all counselors with their type, education, and experience."
-            sql = """
-                SELECT
-                    counselor_id,
-                    name,
-                    paid_volunteer,
-                    education,
-                    experience
-                FROM Counselor
-                ORDER BY name
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 2. Student data ----------
-        elif report_id == 2:
-            title = "2. Student data (directory)"
-            description = "Lists all students with basic demographics."
-            sql = """
-                SELECT
-                    student_id,
-                    name,
-                    dob,
-                    country_of_birth,
-                    gender,
-                    consent,
-                    zip_code
-                FROM Student
-                ORDER BY name
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 3. Demographics: which country is most common ----------
-        elif report_id == 3:
-            title = "3. Student demographics by country"
-            description = (
-                "Counts how many students come from each country of birth, "
-                "sorted by the most common country."
-            )
-            sql = """
-                SELECT
-                    country_of_birth AS Country,
-                    COUNT(*) AS num_students
-                FROM Student
-                GROUP BY country_of_birth
-                ORDER BY num_students DESC, country_of_birth
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 4. Different types of issues / concerns ----------
-        elif report_id == 4:
-            title = "4. Types of issues & categories"
-            description = (
-                "Shows counts of issues by issue type and by category "
-                "in a single combined table."
-            )
-            sql = """
-                SELECT
-                    'Issue type' AS dimension_kind,
-                    it.issue_type AS dimension,
-                    COUNT(*) AS num_issues
-                FROM Issue_Type it
-                GROUP BY it.issue_type
-
-                UNION ALL
-
-                SELECT
-                    'Category' AS dimension_kind,
-                    c.name AS dimension,
-                    COUNT(*) AS num_issues
-                FROM Category c
-                JOIN Issue_Category ic ON ic.category_id = c.category_id
-                GROUP BY c.category_id, c.name
-
-                ORDER BY dimension_kind, num_issues DESC, dimension
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 5. Frequency of visit by each student ----------
-        elif report_id == 5:
-            title = "5. Visit frequency by student"
-            description = "Shows how many counseling visits each student has had."
-            sql = """
-                SELECT
-                    s.student_id,
-                    s.name,
-                    COUNT(v.visit_id) AS num_visits
-                FROM Student s
-                LEFT JOIN Visit v ON v.student_id = s.student_id
-                GROUP BY s.student_id, s.name
-                ORDER BY num_visits DESC, s.name
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 6. Number of students per counselor ----------
-        elif report_id == 6:
-            title = "6. Number of students per counselor"
-            description = "For each counselor, shows how many distinct students they have seen."
-            sql = """
-                SELECT
-                    c.counselor_id,
-                    c.name,
-                    COUNT(DISTINCT v.student_id) AS num_students
-                FROM Counselor c
-                LEFT JOIN Visit_Counselor vc
-                    ON vc.counselor_id = c.counselor_id
-                LEFT JOIN Visit v
-                    ON v.visit_id = vc.visit_id
-                GROUP BY c.counselor_id, c.name
-                ORDER BY num_students DESC, c.name
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 7. Number of students for each category of problems ----------
-        elif report_id == 7:
-            title = "7. Number of students per issue category"
-            description = (
-                "Counts how many distinct students have at least one issue "
-                "in each problem category."
-            )
-            sql = """
-                SELECT
-                    cat.category_id,
-                    cat.name AS category_name,
-                    COUNT(DISTINCT v.student_id) AS num_students
-                FROM Category cat
-                LEFT JOIN Issue_Category ic
-                    ON ic.category_id = cat.category_id
-                LEFT JOIN Issue i
-                    ON i.issue_id = ic.issue_id
-                LEFT JOIN Visit v
-                    ON v.visit_id = i.visit_id
-                GROUP BY cat.category_id, cat.name
-                ORDER BY num_students DESC, cat.name
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 8. Number of times referred to healthcare / jobs / dean, etc. ----------
-        elif report_id == 8:
-            title = "8. Counts of referrals / financial / coursework help"
-            description = (
-                "Shows how many records there are for healthcare referrals, "
-                "job/financial help, and coursework/dean/tutor support."
-            )
-            sql = """
-                SELECT 'Healthcare referrals' AS type, COUNT(*) AS num_records
-                FROM Referral
-
-                UNION ALL
-
-                SELECT 'Job / financial help' AS type, COUNT(*) AS num_records
-                FROM Financial
-
-                UNION ALL
+    conn = get_db()
+    if not report:
+        error = f"Unknown report id: {report_id}"
+    else:
+        try:
+            headers, rows = run_report(conn, report_id, request.args)
+        except sqlite3.Error as e:
+            error = f"SQL error while running report {report_id}: {e}"
 
-                SELECT 'Coursework / dean / tutor support' AS type, COUNT(*) AS num_records
-                FROM Coursework
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 9. Students flagged as critical ----------
-        elif report_id == 9:
-            title = "9. Students flagged as critical (severity = TRUE)"
-            description = (
-                "Lists students who have at least one issue marked as critical "
-                "(severity marked as TRUE / 1 / similar)."
-            )
-            sql = """
-                SELECT DISTINCT
-                    s.student_id,
-                    s.name,
-                    s.zip_code
-                FROM Student s
-                JOIN Visit v ON v.student_id = s.student_id
-                JOIN Issue i ON i.visit_id = v.visit_id
-                WHERE i.severity IN (1, '1', 'TRUE', 'True', 'true', 't', 'T')
-                ORDER BY s.name
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 10. Students who did not report back after receiving advice ----------
-        elif report_id == 10:
-            title = "10. Students who have not reported back after support"
-            description = (
-                "Shows students who have outstanding items (suggestions, referrals, "
-                "financial, or coursework) with no student_reported_at date."
-            )
-            sql = """
-                SELECT DISTINCT
-                    s.student_id,
-                    s.name,
-                    src.source
-                FROM (
-                    -- Suggestions
-                    SELECT
-                        v.student_id,
-                        'Suggestion' AS source,
-                        sug.student_reported_at AS reported_at
-                    FROM Suggestion sug
-                    JOIN Visit v ON v.visit_id = sug.visit_id
-
-                    UNION ALL
-
-                    -- Referrals
-                    SELECT
-                        v.student_id,
-                        'Referral' AS source,
-                        r.student_reported_at AS reported_at
-                    FROM Referral r
-                    JOIN Issue i ON i.issue_id = r.issue_id
-                    JOIN Visit v ON v.visit_id = i.visit_id
-
-                    UNION ALL
-
-                    -- Financial
-                    SELECT
-                        v.student_id,
-                        'Financial' AS source,
-                        f.student_reported_at AS reported_at
-                    FROM Financial f
-                    JOIN Issue i ON i.issue_id = f.issue_id
-                    JOIN Visit v ON v.visit_id = i.visit_id
-
-                    UNION ALL
-
-                    -- Coursework
-                    SELECT
-                        v.student_id,
-                        'Coursework' AS source,
-                        cw.student_reported_at AS reported_at
-                    FROM Coursework cw
-                    JOIN Issue i ON i.issue_id = cw.issue_id
-                    JOIN Visit v ON v.visit_id = i.visit_id
-                ) src
-                JOIN Student s ON s.student_id = src.student_id
-                WHERE src.reported_at IS NULL
-                   OR src.reported_at = ''
-                ORDER BY s.name, src.source
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 11. Counselors who never followed up with any student ----------
-        elif report_id == 11:
-            title = "11. Counselors With Open Follow-Ups"
-            description = "Shows counselors that have no records in the Followup table."
-            sql = """
-                SELECT DISTINCT
-                    c.counselor_id,
-                    c.name,
-                    c.paid_volunteer
-                FROM Counselor c
-                JOIN Followup f ON f.counselor_id = c.counselor_id
-                WHERE f.complete IS NULL
-                   OR f.complete = ''
-                   OR f.complete = 0
-                ORDER BY c.name;
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 12. Counselors on payroll vs volunteers ----------
-        elif report_id == 12:
-            title = "12. Counselors on payroll vs volunteers"
-            description = "Shows each counselor's role and also the counts by type."
-
-            sql_list = """
-                SELECT
-                    counselor_id,
-                    name,
-                    paid_volunteer AS role
-                FROM Counselor
-                ORDER BY role, name
-            """
-            cur = conn.execute(sql_list)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-            sql_counts = """
-                SELECT
-                    paid_volunteer AS role,
-                    COUNT(*) AS num_counselors
-                FROM Counselor
-                GROUP BY paid_volunteer
-                ORDER BY role
-            """
-            cur2 = conn.execute(sql_counts)
-            rows2 = cur2.fetchall()
-            headers2 = [col[0] for col in cur2.description]
-
-        # ---------- 13. Min, max, avg salary of paid counselors ----------
-        elif report_id == 13:
-            title = "13. Min / Max / Avg salary of paid counselors"
-            description = "Summary statistics for counselor salaries."
-            sql = """
-                SELECT
-                    MIN(salary) AS min_salary,
-                    MAX(salary) AS max_salary,
-                    AVG(salary) AS avg_salary
-                FROM Counselor_Salary
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 14. Students who have multiple issues ----------
-        elif report_id == 14:
-            title = "14. Students with multiple issues"
-            description = (
-                "Lists students who have 2 or more distinct issues recorded."
-            )
-            sql = """
-                SELECT
-                    s.student_id,
-                    s.name,
-                    COUNT(DISTINCT i.issue_id) AS num_issues
-                FROM Student s
-                JOIN Visit v ON v.student_id = s.student_id
-                JOIN Issue i ON i.visit_id = v.visit_id
-                GROUP BY s.student_id, s.name
-                HAVING COUNT(DISTINCT i.issue_id) >= 2
-                ORDER BY num_issues DESC, s.name
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 15. Students who reported a certain issue (e.g. bullying) ----------
-        elif report_id == 15:
-            title = "15. Students with a specific issue keyword"
-            description = (
-                "Enter a keyword below to find all students who reported issues containing that word."
-            )
+    return render_template(
+        "report_detail.html",
+        report_id=report_id,
+        title=report.get("title", ""),
+        description=report.get("description", ""),
+        headers=headers,
+        rows=rows,
+        error=error,
+        export_args=page_args(REPORT_ARGS),
+    )
 
-            keyword = request.args.get("keyword", "").strip()
-            if keyword:
-                like_pattern = f"%{keyword}%"
-                sql = """
-                    SELECT DISTINCT
-                        s.student_id,
-                        s.name,
-                        i.issue_id,
-                        i.issue_description
-                    FROM Issue i
-                    JOIN Visit v ON v.visit_id = i.visit_id
-                    JOIN Student s ON s.student_id = v.student_id
-                    WHERE i.issue_description LIKE ?
-                    ORDER BY s.name
-                """
-                cur = conn.execute(sql, (like_pattern,))
-                rows = cur.fetchall()
-                headers = [col[0] for col in cur.description]
-            else:
-                rows = []
-                headers = []
 
+# ---------- EXPORTS ----------
+# Exports are written straight from the cursor EXPORT_BATCH_SIZE rows at a time, so a
+# download holds one batch in memory however large the result is. They skip the report
+# cache, which would hold the whole result.
+EXPORT_BATCH_SIZE = 500
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def stream_csv(cur):
+    """Yield a cursor's result as CSV text: the column names, then one chunk per batch of rows."""
+    buffer = io.StringIO()
+    out = csv.writer(buffer)
+    out.writerow([col[0] for col in cur.description])
+    for rows in iter(lambda: cur.fetchmany(EXPORT_BATCH_SIZE), []):
+        out.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_ndjson(cur):
+    """Yield a cursor's result as newline-delimited JSON, one object per row keyed by column name."""
+    headers = [col[0] for col in cur.description]
+    for rows in iter(lambda: cur.fetchmany(EXPORT_BATCH_SIZE), []):
+        yield "".join(json.dumps(dict(zip(headers, row)), default=str) + "\n" for row in rows)
+
+
+def download(chunks, filename, mimetype):
+    """A streamed attachment response; the request (and its connection) stays open until it is sent."""
+    return app.response_class(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
-        # ---------- 16. Number of students with health issues per ZIP code ----------
-        elif report_id == 16:
-            title = "16. Students with health issues per ZIP code"
-            description = (
-                "Counts how many distinct students with at least one diagnosis live in each ZIP code."
-            )
-            sql = """
-                SELECT
-                    s.zip_code,
-                    COUNT(DISTINCT s.student_id) AS num_students_with_health_issues
-                FROM Diagnosis d
-                JOIN Student s ON s.student_id = d.student_id
-                GROUP BY s.zip_code
-                ORDER BY num_students_with_health_issues DESC, s.zip_code
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
-
-        # ---------- 17. Courses & number of students with academic difficulty ----------
-        elif report_id == 17:
-            title = "17. Courses with academic difficulty"
-            description = (
-                "Shows courses and how many distinct students have coursework-related issues in those courses."
-            )
-            sql = """
-                SELECT
-                    c.course_id,
-                    c.course_name,
-                    COUNT(DISTINCT s.student_id) AS num_students_with_difficulty
-                FROM Coursework cw
-                JOIN Course c ON c.course_id = cw.course_id
-                JOIN Issue i ON i.issue_id = cw.issue_id
-                JOIN Visit v ON v.visit_id = i.visit_id
-                JOIN Student s ON s.student_id = v.student_id
-                GROUP BY c.course_id, c.course_name
-                ORDER BY num_students_with_difficulty DESC, c.course_name
-            """
-            cur = conn.execute(sql)
-            rows = cur.fetchall()
-            headers = [col[0] for col in cur.description]
 
-        else:
-            error = f"Unknown report id: {report_id}"
+@app.route("/reports/<int:report_id>/export")
+@conditional_page
+def report_export(report_id):
+    """
+    Streams a report as CSV (?format=csv, the default) or NDJSON (?format=ndjson). Takes the same
+    query string as the report page, so an export holds exactly the rows the page shows.
+    """
+    report = REPORTS.get(report_id)
+    if not report:
+        return f"Unknown report id: {report_id}", 404
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return f"Unknown export format: {fmt} (use csv or ndjson)", 400
+    params = report_params(report, request.args)
+    if params is None:
+        return f"Report {report_id} needs its search input before it can be exported", 400
 
+    try:
+        cur = get_db().execute(report["sql"], params)
     except sqlite3.Error as e:
-        error = f"SQL error while running report {report_id}: {e}"
+        return f"SQL error while running report {report_id}: {e}", 500
+
+    chunks = stream_csv(cur) if fmt == "csv" else stream_ndjson(cur)
+    # "15. Students with a specific issue keyword" -> report-15-students-with-a-specific-issue-keyword.csv
+    slug = re.sub(r"[^a-z0-9]+", "-", report["title"].lower()).strip("-")
+    return download(chunks, f"report-{slug}.{fmt}", EXPORT_FORMATS[fmt])
+
+
+# ---------- QUERY PLAN CHECKS ----------
+# With app.config["CAPTURE_SQL"] set before the pools open their connections, every
+# statement a request runs is recorded here as {sql: {endpoints that ran it}}.
+# The SQL is the expanded text (parameters inlined), so it can be EXPLAINed as-is.
+captured_sql = {}
+
+# Endpoints whose pages legitimately read a whole table (directories, dropdowns and
+# whole-table reports). A full scan of any other large table is reported.
+PLAN_SCAN_ALLOWED = {
+    "list_students": {"Student", "Student_Stats"},
+    "list_counselors": {"Counselor", "Counselor_Salary"},
+    "list_visits": {"Student", "Visit_Summary"},
+    "new_visit": {"Student", "Counselor", "Category", "Course"},
+    "edit_visit": {"Student", "Counselor"},
+    "list_referrals": {"Referral", "Coursework", "Financial"},
+    "list_courses": {"Course", "Course_Stats"},
+    "report_detail": {
+        "Counselor", "Counselor_Salary", "Student", "Visit", "Visit_Counselor", "Issue",
+        "Issue_Type", "Issue_Category", "Category", "Suggestion", "Referral", "Financial",
+        "Coursework", "Open_Followup", "Outstanding_Item", "Diagnosis",
+    },
+}
+PLAN_SCAN_ALLOWED["report_export"] = PLAN_SCAN_ALLOWED["report_detail"]
+
+_TABLE_REF_RE = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_]\w*)(?:\s+(?:AS\s+)?([A-Za-z_]\w*))?", re.IGNORECASE)
+_SCAN_RE = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+
+
+def capture_sql(statement):
+    if statement.lstrip().upper().startswith(("SELECT", "WITH", "UPDATE", "DELETE")):
+        endpoint = request.endpoint if has_request_context() else None
+        captured_sql.setdefault(statement, set()).add(endpoint)
+
+
+def sample_urls(conn, all_filters=False):
+    """GET URLs for every page, using ids that exist in the database and the common filters.
+    With all_filters, every combination of the list pages' filters is added as well."""
+    def first(sql):
+        row = conn.execute(sql).fetchone()
+        return row[0] if row and row[0] is not None else 0
+
+    student_id = first("SELECT MIN(student_id) FROM Student")
+    counselor_id = first("SELECT MIN(counselor_id) FROM Counselor")
+    visit_id = first("SELECT MIN(visit_id) FROM Visit")
+    issue_id = first("SELECT MIN(issue_id) FROM Issue")
+    student_name = first("SELECT MIN(name) FROM Student") or ""
+
+    urls = [
+        "/",
+        "/students",
+        "/students?search=a&critical_filter=Yes",
+        "/students?country=x&gender=F&zip=00000",
+        "/students?visits_op=>&visits_num=1&issues_op=<&issues_num=3&critical_filter=No",
+        f"/students?per_page=25&after={encode_cursor([student_name, student_id])}",
+        f"/students?critical_filter=Yes&before={encode_cursor([student_name, student_id])}",
+        f"/students/{student_id}",
+        f"/students/{student_id}/edit",
+        "/counselors",
+        "/counselors?type=paid&education=x&exp_value=1&salary_value=1&sort=salary&order=desc",
+        f"/counselor/{counselor_id}",
+        "/visits",
+        f"/visits?students={student_id}&mode=virtual&issue_op=>&issue_val=0&critical=1&report_needed=1",
+        "/visits?critical=0&report_needed=0",
+        "/visits?from=2024-01-01&to=2025-12-31",
+        f"/visits?mode=virtual&after={encode_cursor(['2025-01-01', visit_id])}",
+        f"/visits?report_needed=1&before={encode_cursor(['2025-01-01', visit_id])}",
+        "/visits/new",
+        f"/visits/{visit_id}",
+        f"/visits/{visit_id}/edit",
+        f"/issues/{issue_id}/edit",
+        "/sql",
+        "/referrals",
+        f"/referrals?student={student_name}",
+        "/referrals?outstanding=1",
+        f"/referrals?outstanding=1&ref_after={encode_cursor(['2025-09-01', 1])}&cw_before={encode_cursor(['2025-09-01', 1])}",
+        f"/referrals?student={student_name}&fin_after={encode_cursor(['2025-09-01', 1])}",
+        "/courses",
+        "/courses?teacher=x&period=1&classroom=x&issues_op=>&issues_val=0&students_op=>&students_val=0",
+        "/reports",
+        "/reports/15?keyword=stress",
+    ]
+    urls += [f"/reports/{report_id}" for report_id in range(1, 18)]
+    urls += [f"/reports/{report_id}/export" for report_id in range(1, 18)]
+    urls += ["/reports/15/export?keyword=stress&format=ndjson", "/reports/9/export?format=ndjson"]
+    if all_filters:
+        urls += filter_combination_urls(student_id)
+    return urls
+
+
+def filter_combination_urls(student_id):
+    """One URL per combination of the list pages' filters, so every WHERE/HAVING shape their
+    query builders can produce gets run. Each group lists the alternatives for one filter."""
+    grids = {
+        "/students": [
+            [{}, {"search": "a"}],
+            [{}, {"country": "x"}],
+            [{}, {"gender": "F", "zip": "00000"}],
+            [{}, {"visits_op": ">", "visits_num": 1}],
+            [{}, {"issues_op": "<", "issues_num": 3}],
+            [{}, {"critical_filter": "Yes"}, {"critical_filter": "No"}],
+        ],
+        "/counselors": [
+            [{}, {"type": "paid"}],
+            [{}, {"education": "x"}],
+            [{}, {"exp_operator": ">=", "exp_value": 1}],
+            [{}, {"salary_operator": "<=", "salary_value": 1}],
+            [{}, {"sort": "salary", "order": "desc"}],
+        ],
+        "/visits": [
+            [{}, {"students": [student_id]}, {"students": [student_id, student_id + 1]}],
+            [{}, {"mode": "virtual"}],
+            [{}, {"issue_op": ">", "issue_val": 0}],
+            [{}, {"critical": "0"}, {"critical": "1"}],
+            [{}, {"report_needed": "0"}, {"report_needed": "1"}],
+            [{}, {"from": "2024-01-01"}, {"from": "2024-01-01", "to": "2025-12-31"}],
+        ],
+        "/referrals": [
+            [{}, {"student": "x"}],
+            [{}, {"outstanding": "1"}],
+        ],
+        "/courses": [
+            [{}, {"teacher": "x", "period": 1, "classroom": "x"}],
+            [{}, {"issues_op": ">", "issues_val": 0}],
+            [{}, {"students_op": "<", "students_val": 5}],
+        ],
+    }
+    urls = []
+    for path, groups in grids.items():
+        for combination in itertools.product(*groups):
+            params = {}
+            for option in combination:
+                params.update(option)
+            urls.append(f"{path}?{urlencode(params, doseq=True)}" if params else path)
+    return urls
+
+
+def capture_route_sql(all_filters=False):
+    """Request every sample URL through the test client and return the captured statements."""
+    with app.app_context():
+        ensure_schema()
+    app.config["CAPTURE_SQL"] = True
+    captured_sql.clear()
+
+    conn = readers.acquire()
+    try:
+        urls = sample_urls(conn, all_filters)
+    finally:
+        readers.release(conn)
+
+    client = app.test_client()
+    for url in urls:
+        response = client.get(url)
+        response.close()  # streamed exports keep their request (and connection) open until closed
+        if response.status_code >= 500:
+            click.echo(f"warning: GET {url} returned {response.status_code}", err=True)
+    return dict(captured_sql)
+
+
+def table_aliases(statement):
+    """Map every table name and alias the statement uses to the table it refers to."""
+    aliases = {}
+    for table, alias in _TABLE_REF_RE.findall(statement):
+        aliases[table] = table
+        if alias and alias.upper() not in ("WHERE", "ON", "JOIN", "LEFT", "INNER", "GROUP", "ORDER", "LIMIT", "USING"):
+            aliases[alias] = table
+    return aliases
+
+
+def table_row_counts(conn):
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+
+
+def full_scans(conn, statement):
+    """Yield (table, plan line) for every full table or full index scan in the statement's plan."""
+    aliases = table_aliases(statement)
+    for row in conn.execute("EXPLAIN QUERY PLAN " + statement).fetchall():
+        detail = row[3]
+        match = _SCAN_RE.match(detail)
+        if not match or match.group(1) not in aliases:
+            continue
+        table, index = aliases[match.group(1)], match.group(2)
+        if index and any(i["name"] == index and i["partial"] for i in conn.execute(f"PRAGMA index_list({table})")):
+            continue  # a partial index only holds the rows being looked for
+        yield table, detail
+
+
+@app.cli.command("check-query-plans")
+@click.option("--min-rows", default=1000, show_default=True,
+              help="Scans of tables with fewer rows than this are ignored.")
+def check_query_plans_command(min_rows):
+    """Crawl every page, EXPLAIN each query it ran and fail on unexpected full scans of large tables."""
+    statements = capture_route_sql()
+
+    conn = readers.acquire()
+    try:
+        row_counts = table_row_counts(conn)
+        problems = []
+        # Cache refreshes (the generation counters, dropdown lookups) read their whole table
+        # by design, but only after it changes rather than on every request
+        cache_refreshes = {GENERATIONS_SQL} | {sql for _, sql in LOOKUPS.values()}
+        for statement, endpoints in sorted(statements.items()):
+            if statement in cache_refreshes:
+                continue
+            for table, detail in full_scans(conn, statement):
+                # Table-valued functions such as json_each aren't tables and have no row count
+                if table not in row_counts or row_counts[table] < min_rows:
+                    continue
+                if all(table in PLAN_SCAN_ALLOWED.get(endpoint, ()) for endpoint in endpoints):
+                    continue
+                problems.append((sorted(endpoints, key=str), table, detail, statement))
     finally:
-        conn.close()
+        readers.release(conn)
+
+    # Cached reports and page ETags only change with the tables they declare, so those must
+    # cover every table their SQL reads
+    undeclared = set()
+    for report_id, report in REPORTS.items():
+        read = {table for table in table_aliases(report["sql"]).values() if table in row_counts}
+        undeclared |= {(f"report {report_id}", table) for table in read - set(report["tables"])}
+    for statement, endpoints in statements.items():
+        read = {table for table in table_aliases(statement).values() if table in row_counts}
+        read.discard("Table_Generation")
+        for endpoint in endpoints:
+            tables = PAGE_TABLES.get(endpoint)
+            if tables is not None and not callable(tables):
+                undeclared |= {(endpoint, table) for table in read - set(tables)}
+    undeclared = sorted(undeclared)
+
+    click.echo(f"Checked {len(statements)} distinct statements.")
+    for endpoints, table, detail, statement in problems:
+        click.echo(f"\n{', '.join(map(str, endpoints))}: {detail} ({row_counts[table]} rows)")
+        click.echo("    " + " ".join(statement.split()))
+    for source, table in undeclared:
+        click.echo(f"\n{source} reads {table} but does not declare it (REPORTS / PAGE_TABLES)")
+    if problems or undeclared:
+        raise SystemExit(f"{len(problems)} unexpected full scan(s), {len(undeclared)} undeclared table(s) found.")
+    click.echo("No unexpected full scans.")
+
+
+# ---------- INDEX ADVISOR ----------
+_COLUMN_REF_RE = re.compile(r"\b([A-Za-z_]\w*)\.([A-Za-z_]\w*)\b")
+_WORD_RE = re.compile(r"\b[A-Za-z_]\w*\b")
+
+
+def predicate_columns(conn, statement, table):
+    """Columns of `table` the statement mentions, in order of first use: alias.column references,
+    plus bare column names after WHERE when the statement reads only that table."""
+    columns = [row["name"] for row in conn.execute(f"PRAGMA table_info({table})")]
+    aliases = table_aliases(statement)
+    found = [column for alias, column in _COLUMN_REF_RE.findall(statement)
+             if aliases.get(alias) == table and column in columns]
+    if set(aliases.values()) == {table} and " WHERE " in statement.upper():
+        where = statement[statement.upper().index(" WHERE "):]
+        found += [word for word in _WORD_RE.findall(where) if word in columns]
+    return list(dict.fromkeys(found))
+
+
+def count_scans(conn, statement, table):
+    return sum(1 for scanned, _ in full_scans(conn, statement) if scanned == table)
+
+
+def effective_index(conn, statement, table, scans):
+    """The narrowest index on `table` that removes at least one of its `scans` from the statement's
+    plan, as (columns, scans removed), or None. Candidates are tried on a scratch copy."""
+    columns = predicate_columns(conn, statement, table)
+    candidates = [(column,) for column in columns] + list(itertools.permutations(columns, 2))
+    for candidate in candidates:
+        conn.execute(f"CREATE INDEX advisor_candidate ON {table}({', '.join(candidate)})")
+        try:
+            removed = scans - count_scans(conn, statement, table)
+        finally:
+            conn.execute("DROP INDEX advisor_candidate")
+        if removed > 0:
+            return candidate, removed
+    return None
+
+
+@app.cli.command("index-advisor")
+@click.option("--min-rows", default=100, show_default=True,
+              help="Scans of tables with fewer rows than this are ignored.")
+def index_advisor_command(min_rows):
+    """Crawl every page with every filter combination and rank the indexes that would remove the
+    most full scans from the captured queries' plans."""
+    statements = capture_route_sql(all_filters=True)
+
+    # Candidate indexes are created and dropped on an in-memory copy, never on the real database
+    scratch = sqlite3.connect(":memory:")
+    scratch.row_factory = sqlite3.Row
+    conn = readers.acquire()
+    try:
+        conn.backup(scratch)
+    finally:
+        readers.release(conn)
+
+    row_counts = table_row_counts(scratch)
+    advice = {}
+    unindexable = 0
+    for statement, endpoints in statements.items():
+        scanned = [table for table, _ in full_scans(scratch, statement)]
+        for table in dict.fromkeys(scanned):
+            if row_counts.get(table, 0) < min_rows:
+                continue
+            found = effective_index(scratch, statement, table, scanned.count(table))
+            if found is None:
+                unindexable += 1
+                continue
+            columns, removed = found
+            # A lookup still reads about rows / distinct values of the leading column
+            distinct = scratch.execute(f"SELECT COUNT(DISTINCT {columns[0]}) FROM {table}").fetchone()[0]
+            avoided = row_counts[table] - row_counts[table] // max(distinct, 1)
+            entry = advice.setdefault((table, columns), {"scans": 0, "rows": 0, "endpoints": set()})
+            entry["scans"] += removed
+            entry["rows"] += removed * avoided
+            entry["endpoints"].update(endpoints)
+    scratch.close()
+
+    # An index also serves lookups on any prefix of its columns, so fold those suggestions in
+    for key in sorted(advice, key=lambda key: len(key[1])):
+        table, columns = key
+        wider = next((other for other in advice if other != key and other[0] == table
+                      and other[1][:len(columns)] == columns), None)
+        if wider:
+            entry = advice.pop(key)
+            advice[wider]["scans"] += entry["scans"]
+            advice[wider]["rows"] += entry["rows"]
+            advice[wider]["endpoints"] |= entry["endpoints"]
+
+    click.echo(f"Checked {len(statements)} distinct statements.")
+    if not advice:
+        click.echo("No missing indexes found.")
+    ranked = sorted(advice.items(), key=lambda item: (item[1]["scans"], item[1]["rows"]), reverse=True)
+    for rank, ((table, columns), entry) in enumerate(ranked, 1):
+        name = f"idx_{table.lower()}_{'_'.join(columns)}"
+        click.echo(f"\n{rank}. CREATE INDEX {name} ON {table}({', '.join(columns)});")
+        click.echo(f"   removes {entry['scans']} scan(s), ~{entry['rows']} fewer rows read per crawl; "
+                   f"{', '.join(sorted(map(str, entry['endpoints'])))}")
+    if unindexable:
+        click.echo(f"\n{unindexable} scan(s) of large tables had no single index that removes them.")
 
-    return render_template(
-        "report_detail.html",
-        report_id=report_id,
-        title=title,
-        description=description,
-        headers=headers,
-        rows=rows,
-        error=error,
-    )
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,32 @@
+-- -----------------------------
+-- ID-SEQUENCE
+-- Next free primary key per table. Ids are reserved by bumping next_id inside
+-- the write transaction that inserts the rows (see allocate_ids in app.py).
+-- -----------------------------
+CREATE TABLE Id_Sequence (
+    table_name VARCHAR(50) PRIMARY KEY,
+    next_id INT NOT NULL
+);
+
+INSERT INTO Id_Sequence (table_name, next_id)
+SELECT 'Student', COALESCE(MAX(student_id), 0) + 1 FROM Student
+UNION ALL
+SELECT 'Counselor', COALESCE(MAX(counselor_id), 0) + 1 FROM Counselor
+UNION ALL
+SELECT 'Visit', COALESCE(MAX(visit_id), 0) + 1 FROM Visit
+UNION ALL
+SELECT 'Issue', COALESCE(MAX(issue_id), 0) + 1 FROM Issue
+UNION ALL
+SELECT 'Followup', COALESCE(MAX(followup_id), 0) + 1 FROM Followup
+UNION ALL
+SELECT 'Suggestion', COALESCE(MAX(suggestion_id), 0) + 1 FROM Suggestion
+UNION ALL
+SELECT 'Referral', COALESCE(MAX(referral_id), 0) + 1 FROM Referral
+UNION ALL
+SELECT 'Financial', COALESCE(MAX(financial_id), 0) + 1 FROM Financial
+UNION ALL
+SELECT 'Coursework', COALESCE(MAX(coursework_id), 0) + 1 FROM Coursework
+UNION ALL
+SELECT 'Diagnosis', COALESCE(MAX(diagnosis_id), 0) + 1 FROM Diagnosis
+UNION ALL
+SELECT 'Symptom', COALESCE(MAX(symptom_id), 0) + 1 FROM Symptom;
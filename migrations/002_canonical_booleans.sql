@@ -0,0 +1,61 @@
+-- -----------------------------
+-- Canonical booleans for Issue.severity and Followup.complete.
+-- The CSV import stored 'TRUE'/'FALSE'/'' strings; every value is normalized
+-- to a strict 0/1 integer, enforced by CHECK constraints. SQLite cannot add a
+-- CHECK to an existing column, so both tables are rebuilt.
+-- -----------------------------
+
+-- -----------------------------
+-- ISSUE
+-- -----------------------------
+CREATE TABLE Issue_new (
+    issue_id INT PRIMARY KEY,
+    visit_id INT NOT NULL,
+    issue_description TEXT NOT NULL,
+    severity INTEGER NOT NULL DEFAULT 0 CHECK (severity IN (0, 1)),
+    FOREIGN KEY (visit_id) REFERENCES Visit(visit_id)
+);
+
+INSERT INTO Issue_new (issue_id, visit_id, issue_description, severity)
+SELECT
+    issue_id,
+    visit_id,
+    issue_description,
+    CASE WHEN lower(severity) IN ('1', 't', 'true') THEN 1 ELSE 0 END
+FROM Issue;
+
+DROP TABLE Issue;
+ALTER TABLE Issue_new RENAME TO Issue;
+
+-- -----------------------------
+-- FOLLOWUP
+-- -----------------------------
+CREATE TABLE Followup_new (
+    followup_id INT PRIMARY KEY,
+    visit_id INT NOT NULL,
+    counselor_id INT NOT NULL,
+    date DATE,
+    notes TEXT,
+    complete INTEGER NOT NULL DEFAULT 0 CHECK (complete IN (0, 1)),
+    FOREIGN KEY (visit_id) REFERENCES Visit(visit_id),
+    FOREIGN KEY (counselor_id) REFERENCES Counselor(counselor_id)
+);
+
+INSERT INTO Followup_new (followup_id, visit_id, counselor_id, date, notes, complete)
+SELECT
+    followup_id,
+    visit_id,
+    counselor_id,
+    date,
+    notes,
+    CASE WHEN lower(complete) IN ('1', 't', 'true') THEN 1 ELSE 0 END
+FROM Followup;
+
+DROP TABLE Followup;
+ALTER TABLE Followup_new RENAME TO Followup;
+
+-- -----------------------------
+-- Partial indexes: only the rows the app actually looks for
+-- -----------------------------
+CREATE INDEX idx_issue_critical ON Issue (visit_id) WHERE severity = 1;
+CREATE INDEX idx_followup_open ON Followup (counselor_id, followup_id) WHERE complete = 0;
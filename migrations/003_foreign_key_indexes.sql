@@ -0,0 +1,41 @@
+-- -----------------------------
+-- Secondary indexes for every join and filter path used by app.py.
+-- Composite primary keys already cover lookups on their leading column
+-- (Visit_Counselor.visit_id, Issue_Category.issue_id, Issue_Type.issue_id,
+-- Student_Course.student_id, Symptom.diagnosis_id via symptom_unique).
+-- -----------------------------
+
+-- STUDENT: directory ordering / name search
+CREATE INDEX idx_student_name ON Student (name, student_id);
+
+-- VISIT: a student's visits, newest first (view_student, reports)
+CREATE INDEX idx_visit_student_date ON Visit (student_id, date DESC);
+
+-- VISIT-COUNSELOR: a counselor's visits (counselor_view, report 6)
+CREATE INDEX idx_visit_counselor_counselor ON Visit_Counselor (counselor_id, visit_id);
+
+-- ISSUE: issues of a visit
+CREATE INDEX idx_issue_visit ON Issue (visit_id);
+
+-- ISSUE-CATEGORY: issues in a category (report 7)
+CREATE INDEX idx_issue_category_category ON Issue_Category (category_id, issue_id);
+
+-- FOLLOWUP: follow-ups of a visit, and a counselor's follow-ups by status and date
+CREATE INDEX idx_followup_visit ON Followup (visit_id);
+CREATE INDEX idx_followup_counselor ON Followup (counselor_id, complete, date DESC);
+
+-- SUGGESTION
+CREATE INDEX idx_suggestion_visit ON Suggestion (visit_id);
+CREATE INDEX idx_suggestion_counselor ON Suggestion (counselor_id);
+
+-- REFERRAL / FINANCIAL / COURSEWORK: rows of an issue
+CREATE INDEX idx_referral_issue ON Referral (issue_id);
+CREATE INDEX idx_financial_issue ON Financial (issue_id);
+CREATE INDEX idx_coursework_issue ON Coursework (issue_id);
+CREATE INDEX idx_coursework_course ON Coursework (course_id);
+
+-- STUDENT-COURSE: roster of a course
+CREATE INDEX idx_student_course_course ON Student_Course (course_id, student_id);
+
+-- DIAGNOSIS: a student's diagnoses (view_student, report 16)
+CREATE INDEX idx_diagnosis_student ON Diagnosis (student_id);
@@ -0,0 +1,124 @@
+-- -----------------------------
+-- TABLE-GENERATION
+-- A change counter per table, bumped by triggers on every insert, update and
+-- delete. In-process caches remember the generation they were filled at and
+-- reload only the tables whose counter has moved (see table_generations in app.py).
+-- -----------------------------
+CREATE TABLE Table_Generation (
+    table_name VARCHAR(50) PRIMARY KEY,
+    generation INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO Table_Generation (table_name) VALUES
+    ('Student'),
+    ('Counselor'),
+    ('Course'),
+    ('Category'),
+    ('Provider'),
+    ('Diagnosis_List'),
+    ('Symptom_List');
+
+CREATE TRIGGER trg_student_generation_insert AFTER INSERT ON Student
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Student';
+END;
+
+CREATE TRIGGER trg_student_generation_update AFTER UPDATE ON Student
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Student';
+END;
+
+CREATE TRIGGER trg_student_generation_delete AFTER DELETE ON Student
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Student';
+END;
+
+CREATE TRIGGER trg_counselor_generation_insert AFTER INSERT ON Counselor
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Counselor';
+END;
+
+CREATE TRIGGER trg_counselor_generation_update AFTER UPDATE ON Counselor
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Counselor';
+END;
+
+CREATE TRIGGER trg_counselor_generation_delete AFTER DELETE ON Counselor
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Counselor';
+END;
+
+CREATE TRIGGER trg_course_generation_insert AFTER INSERT ON Course
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Course';
+END;
+
+CREATE TRIGGER trg_course_generation_update AFTER UPDATE ON Course
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Course';
+END;
+
+CREATE TRIGGER trg_course_generation_delete AFTER DELETE ON Course
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Course';
+END;
+
+CREATE TRIGGER trg_category_generation_insert AFTER INSERT ON Category
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Category';
+END;
+
+CREATE TRIGGER trg_category_generation_update AFTER UPDATE ON Category
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Category';
+END;
+
+CREATE TRIGGER trg_category_generation_delete AFTER DELETE ON Category
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Category';
+END;
+
+CREATE TRIGGER trg_provider_generation_insert AFTER INSERT ON Provider
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Provider';
+END;
+
+CREATE TRIGGER trg_provider_generation_update AFTER UPDATE ON Provider
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Provider';
+END;
+
+CREATE TRIGGER trg_provider_generation_delete AFTER DELETE ON Provider
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Provider';
+END;
+
+CREATE TRIGGER trg_diagnosis_list_generation_insert AFTER INSERT ON Diagnosis_List
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Diagnosis_List';
+END;
+
+CREATE TRIGGER trg_diagnosis_list_generation_update AFTER UPDATE ON Diagnosis_List
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Diagnosis_List';
+END;
+
+CREATE TRIGGER trg_diagnosis_list_generation_delete AFTER DELETE ON Diagnosis_List
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Diagnosis_List';
+END;
+
+CREATE TRIGGER trg_symptom_list_generation_insert AFTER INSERT ON Symptom_List
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Symptom_List';
+END;
+
+CREATE TRIGGER trg_symptom_list_generation_update AFTER UPDATE ON Symptom_List
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Symptom_List';
+END;
+
+CREATE TRIGGER trg_symptom_list_generation_delete AFTER DELETE ON Symptom_List
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Symptom_List';
+END;
@@ -0,0 +1,230 @@
+-- -----------------------------
+-- TABLE-GENERATION (all tables)
+-- Extends the generation counters from 004 to every remaining table, so cached
+-- report results can be checked against the tables their SQL reads.
+-- -----------------------------
+INSERT INTO Table_Generation (table_name) VALUES
+    ('Student_Course'),
+    ('Counselor_Salary'),
+    ('Visit'),
+    ('Visit_Counselor'),
+    ('Issue'),
+    ('Issue_Category'),
+    ('Issue_Type'),
+    ('Diagnosis'),
+    ('Symptom'),
+    ('Followup'),
+    ('Suggestion'),
+    ('Referral'),
+    ('Financial'),
+    ('Coursework');
+
+CREATE TRIGGER trg_student_course_generation_insert AFTER INSERT ON Student_Course
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Student_Course';
+END;
+
+CREATE TRIGGER trg_student_course_generation_update AFTER UPDATE ON Student_Course
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Student_Course';
+END;
+
+CREATE TRIGGER trg_student_course_generation_delete AFTER DELETE ON Student_Course
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Student_Course';
+END;
+
+CREATE TRIGGER trg_counselor_salary_generation_insert AFTER INSERT ON Counselor_Salary
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Counselor_Salary';
+END;
+
+CREATE TRIGGER trg_counselor_salary_generation_update AFTER UPDATE ON Counselor_Salary
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Counselor_Salary';
+END;
+
+CREATE TRIGGER trg_counselor_salary_generation_delete AFTER DELETE ON Counselor_Salary
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Counselor_Salary';
+END;
+
+CREATE TRIGGER trg_visit_generation_insert AFTER INSERT ON Visit
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Visit';
+END;
+
+CREATE TRIGGER trg_visit_generation_update AFTER UPDATE ON Visit
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Visit';
+END;
+
+CREATE TRIGGER trg_visit_generation_delete AFTER DELETE ON Visit
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Visit';
+END;
+
+CREATE TRIGGER trg_visit_counselor_generation_insert AFTER INSERT ON Visit_Counselor
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Visit_Counselor';
+END;
+
+CREATE TRIGGER trg_visit_counselor_generation_update AFTER UPDATE ON Visit_Counselor
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Visit_Counselor';
+END;
+
+CREATE TRIGGER trg_visit_counselor_generation_delete AFTER DELETE ON Visit_Counselor
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Visit_Counselor';
+END;
+
+CREATE TRIGGER trg_issue_generation_insert AFTER INSERT ON Issue
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Issue';
+END;
+
+CREATE TRIGGER trg_issue_generation_update AFTER UPDATE ON Issue
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Issue';
+END;
+
+CREATE TRIGGER trg_issue_generation_delete AFTER DELETE ON Issue
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Issue';
+END;
+
+CREATE TRIGGER trg_issue_category_generation_insert AFTER INSERT ON Issue_Category
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Issue_Category';
+END;
+
+CREATE TRIGGER trg_issue_category_generation_update AFTER UPDATE ON Issue_Category
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Issue_Category';
+END;
+
+CREATE TRIGGER trg_issue_category_generation_delete AFTER DELETE ON Issue_Category
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Issue_Category';
+END;
+
+CREATE TRIGGER trg_issue_type_generation_insert AFTER INSERT ON Issue_Type
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Issue_Type';
+END;
+
+CREATE TRIGGER trg_issue_type_generation_update AFTER UPDATE ON Issue_Type
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Issue_Type';
+END;
+
+CREATE TRIGGER trg_issue_type_generation_delete AFTER DELETE ON Issue_Type
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Issue_Type';
+END;
+
+CREATE TRIGGER trg_diagnosis_generation_insert AFTER INSERT ON Diagnosis
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Diagnosis';
+END;
+
+CREATE TRIGGER trg_diagnosis_generation_update AFTER UPDATE ON Diagnosis
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Diagnosis';
+END;
+
+CREATE TRIGGER trg_diagnosis_generation_delete AFTER DELETE ON Diagnosis
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Diagnosis';
+END;
+
+CREATE TRIGGER trg_symptom_generation_insert AFTER INSERT ON Symptom
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Symptom';
+END;
+
+CREATE TRIGGER trg_symptom_generation_update AFTER UPDATE ON Symptom
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Symptom';
+END;
+
+CREATE TRIGGER trg_symptom_generation_delete AFTER DELETE ON Symptom
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Symptom';
+END;
+
+CREATE TRIGGER trg_followup_generation_insert AFTER INSERT ON Followup
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Followup';
+END;
+
+CREATE TRIGGER trg_followup_generation_update AFTER UPDATE ON Followup
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Followup';
+END;
+
+CREATE TRIGGER trg_followup_generation_delete AFTER DELETE ON Followup
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Followup';
+END;
+
+CREATE TRIGGER trg_suggestion_generation_insert AFTER INSERT ON Suggestion
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Suggestion';
+END;
+
+CREATE TRIGGER trg_suggestion_generation_update AFTER UPDATE ON Suggestion
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Suggestion';
+END;
+
+CREATE TRIGGER trg_suggestion_generation_delete AFTER DELETE ON Suggestion
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Suggestion';
+END;
+
+CREATE TRIGGER trg_referral_generation_insert AFTER INSERT ON Referral
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Referral';
+END;
+
+CREATE TRIGGER trg_referral_generation_update AFTER UPDATE ON Referral
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Referral';
+END;
+
+CREATE TRIGGER trg_referral_generation_delete AFTER DELETE ON Referral
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Referral';
+END;
+
+CREATE TRIGGER trg_financial_generation_insert AFTER INSERT ON Financial
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Financial';
+END;
+
+CREATE TRIGGER trg_financial_generation_update AFTER UPDATE ON Financial
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Financial';
+END;
+
+CREATE TRIGGER trg_financial_generation_delete AFTER DELETE ON Financial
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Financial';
+END;
+
+CREATE TRIGGER trg_coursework_generation_insert AFTER INSERT ON Coursework
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Coursework';
+END;
+
+CREATE TRIGGER trg_coursework_generation_update AFTER UPDATE ON Coursework
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Coursework';
+END;
+
+CREATE TRIGGER trg_coursework_generation_delete AFTER DELETE ON Coursework
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Coursework';
+END;
@@ -0,0 +1,128 @@
+-- -----------------------------
+-- STUDENT-STATS
+-- Per-student visit, issue and critical-issue counts for the students list, kept
+-- current by the triggers below. The counts match what joining
+-- Student -> Visit -> Issue gives: an issue is counted for the student of the
+-- visit it points at, and only while that visit exists.
+-- DERIVED_TABLES in app.py holds the same computation; `flask check-derived`
+-- compares the two and `flask check-derived --rebuild` repairs any drift.
+-- -----------------------------
+CREATE TABLE Student_Stats (
+    student_id INT PRIMARY KEY,
+    num_visits INT NOT NULL DEFAULT 0,
+    num_issues INT NOT NULL DEFAULT 0,
+    num_critical INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (student_id) REFERENCES Student(student_id)
+);
+
+INSERT INTO Student_Stats (student_id, num_visits, num_issues, num_critical)
+SELECT
+    s.student_id,
+    (SELECT COUNT(*) FROM Visit v WHERE v.student_id = s.student_id),
+    (SELECT COUNT(*) FROM Visit v JOIN Issue i ON i.visit_id = v.visit_id WHERE v.student_id = s.student_id),
+    (SELECT COALESCE(SUM(i.severity), 0) FROM Visit v JOIN Issue i ON i.visit_id = v.visit_id WHERE v.student_id = s.student_id)
+FROM Student s;
+
+CREATE INDEX idx_student_stats_visits ON Student_Stats(num_visits);
+CREATE INDEX idx_student_stats_issues ON Student_Stats(num_issues);
+
+-- Students: a new student starts from whatever visits already point at them
+CREATE TRIGGER trg_student_stats_student_insert AFTER INSERT ON Student
+BEGIN
+    INSERT INTO Student_Stats (student_id, num_visits, num_issues, num_critical)
+    SELECT
+        NEW.student_id,
+        (SELECT COUNT(*) FROM Visit v WHERE v.student_id = NEW.student_id),
+        (SELECT COUNT(*) FROM Visit v JOIN Issue i ON i.visit_id = v.visit_id WHERE v.student_id = NEW.student_id),
+        (SELECT COALESCE(SUM(i.severity), 0) FROM Visit v JOIN Issue i ON i.visit_id = v.visit_id WHERE v.student_id = NEW.student_id);
+END;
+
+CREATE TRIGGER trg_student_stats_student_update AFTER UPDATE OF student_id ON Student
+BEGIN
+    UPDATE Student_Stats SET student_id = NEW.student_id WHERE student_id = OLD.student_id;
+END;
+
+CREATE TRIGGER trg_student_stats_student_delete AFTER DELETE ON Student
+BEGIN
+    DELETE FROM Student_Stats WHERE student_id = OLD.student_id;
+END;
+
+-- Visits: a visit brings its issues with it
+CREATE TRIGGER trg_student_stats_visit_insert AFTER INSERT ON Visit
+BEGIN
+    UPDATE Student_Stats SET
+        num_visits = num_visits + 1,
+        num_issues = num_issues + (SELECT COUNT(*) FROM Issue WHERE visit_id = NEW.visit_id),
+        num_critical = num_critical + (SELECT COALESCE(SUM(severity), 0) FROM Issue WHERE visit_id = NEW.visit_id)
+    WHERE student_id = NEW.student_id;
+END;
+
+CREATE TRIGGER trg_student_stats_visit_update AFTER UPDATE OF visit_id, student_id ON Visit
+BEGIN
+    UPDATE Student_Stats SET
+        num_visits = num_visits - 1,
+        num_issues = num_issues - (SELECT COUNT(*) FROM Issue WHERE visit_id = OLD.visit_id),
+        num_critical = num_critical - (SELECT COALESCE(SUM(severity), 0) FROM Issue WHERE visit_id = OLD.visit_id)
+    WHERE student_id = OLD.student_id;
+    UPDATE Student_Stats SET
+        num_visits = num_visits + 1,
+        num_issues = num_issues + (SELECT COUNT(*) FROM Issue WHERE visit_id = NEW.visit_id),
+        num_critical = num_critical + (SELECT COALESCE(SUM(severity), 0) FROM Issue WHERE visit_id = NEW.visit_id)
+    WHERE student_id = NEW.student_id;
+END;
+
+CREATE TRIGGER trg_student_stats_visit_delete AFTER DELETE ON Visit
+BEGIN
+    UPDATE Student_Stats SET
+        num_visits = num_visits - 1,
+        num_issues = num_issues - (SELECT COUNT(*) FROM Issue WHERE visit_id = OLD.visit_id),
+        num_critical = num_critical - (SELECT COALESCE(SUM(severity), 0) FROM Issue WHERE visit_id = OLD.visit_id)
+    WHERE student_id = OLD.student_id;
+END;
+
+-- Issues: counted against the student of their visit, if the visit exists
+CREATE TRIGGER trg_student_stats_issue_insert AFTER INSERT ON Issue
+BEGIN
+    UPDATE Student_Stats SET
+        num_issues = num_issues + 1,
+        num_critical = num_critical + NEW.severity
+    WHERE student_id = (SELECT student_id FROM Visit WHERE visit_id = NEW.visit_id);
+END;
+
+CREATE TRIGGER trg_student_stats_issue_update AFTER UPDATE OF visit_id, severity ON Issue
+BEGIN
+    UPDATE Student_Stats SET
+        num_issues = num_issues - 1,
+        num_critical = num_critical - OLD.severity
+    WHERE student_id = (SELECT student_id FROM Visit WHERE visit_id = OLD.visit_id);
+    UPDATE Student_Stats SET
+        num_issues = num_issues + 1,
+        num_critical = num_critical + NEW.severity
+    WHERE student_id = (SELECT student_id FROM Visit WHERE visit_id = NEW.visit_id);
+END;
+
+CREATE TRIGGER trg_student_stats_issue_delete AFTER DELETE ON Issue
+BEGIN
+    UPDATE Student_Stats SET
+        num_issues = num_issues - 1,
+        num_critical = num_critical - OLD.severity
+    WHERE student_id = (SELECT student_id FROM Visit WHERE visit_id = OLD.visit_id);
+END;
+
+-- Generation counter, like every other table (see 004)
+INSERT INTO Table_Generation (table_name) VALUES ('Student_Stats');
+
+CREATE TRIGGER trg_student_stats_generation_insert AFTER INSERT ON Student_Stats
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Student_Stats';
+END;
+
+CREATE TRIGGER trg_student_stats_generation_update AFTER UPDATE ON Student_Stats
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Student_Stats';
+END;
+
+CREATE TRIGGER trg_student_stats_generation_delete AFTER DELETE ON Student_Stats
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Student_Stats';
+END;
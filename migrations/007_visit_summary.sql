@@ -0,0 +1,141 @@
+-- -----------------------------
+-- VISIT-SUMMARY
+-- One row per visit with what the visits list shows and filters on: its issue
+-- count, how many of those issues are critical and how many of its suggestions
+-- the student has not reported back on. Kept current by the triggers below;
+-- DERIVED_TABLES in app.py holds the same computation for `flask check-derived`.
+-- -----------------------------
+CREATE TABLE Visit_Summary (
+    visit_id INT PRIMARY KEY,
+    student_id INT NOT NULL,
+    date DATE NOT NULL,
+    mode VARCHAR(20) NOT NULL,
+    issue_count INT NOT NULL DEFAULT 0,
+    num_critical INT NOT NULL DEFAULT 0,
+    open_suggestions INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (visit_id) REFERENCES Visit(visit_id)
+);
+
+INSERT INTO Visit_Summary (visit_id, student_id, date, mode, issue_count, num_critical, open_suggestions)
+SELECT
+    v.visit_id,
+    v.student_id,
+    v.date,
+    v.mode,
+    (SELECT COUNT(*) FROM Issue i WHERE i.visit_id = v.visit_id),
+    (SELECT COALESCE(SUM(i.severity), 0) FROM Issue i WHERE i.visit_id = v.visit_id),
+    (SELECT COUNT(*) FROM Suggestion sg
+     WHERE sg.visit_id = v.visit_id AND (sg.student_report IS NULL OR sg.student_report = ''))
+FROM Visit v;
+
+CREATE INDEX idx_visit_summary_mode_date ON Visit_Summary(mode, date);
+CREATE INDEX idx_visit_summary_student ON Visit_Summary(student_id);
+CREATE INDEX idx_visit_summary_critical ON Visit_Summary(num_critical);
+CREATE INDEX idx_visit_summary_open ON Visit_Summary(open_suggestions);
+
+-- Visits: (re)computed from the issues and suggestions that point at them
+CREATE TRIGGER trg_visit_summary_visit_insert AFTER INSERT ON Visit
+BEGIN
+    INSERT INTO Visit_Summary (visit_id, student_id, date, mode, issue_count, num_critical, open_suggestions)
+    SELECT
+        NEW.visit_id,
+        NEW.student_id,
+        NEW.date,
+        NEW.mode,
+        (SELECT COUNT(*) FROM Issue i WHERE i.visit_id = NEW.visit_id),
+        (SELECT COALESCE(SUM(i.severity), 0) FROM Issue i WHERE i.visit_id = NEW.visit_id),
+        (SELECT COUNT(*) FROM Suggestion sg
+         WHERE sg.visit_id = NEW.visit_id AND (sg.student_report IS NULL OR sg.student_report = ''));
+END;
+
+CREATE TRIGGER trg_visit_summary_visit_update AFTER UPDATE ON Visit
+BEGIN
+    DELETE FROM Visit_Summary WHERE visit_id = OLD.visit_id;
+    INSERT INTO Visit_Summary (visit_id, student_id, date, mode, issue_count, num_critical, open_suggestions)
+    SELECT
+        NEW.visit_id,
+        NEW.student_id,
+        NEW.date,
+        NEW.mode,
+        (SELECT COUNT(*) FROM Issue i WHERE i.visit_id = NEW.visit_id),
+        (SELECT COALESCE(SUM(i.severity), 0) FROM Issue i WHERE i.visit_id = NEW.visit_id),
+        (SELECT COUNT(*) FROM Suggestion sg
+         WHERE sg.visit_id = NEW.visit_id AND (sg.student_report IS NULL OR sg.student_report = ''));
+END;
+
+CREATE TRIGGER trg_visit_summary_visit_delete AFTER DELETE ON Visit
+BEGIN
+    DELETE FROM Visit_Summary WHERE visit_id = OLD.visit_id;
+END;
+
+-- Issues
+CREATE TRIGGER trg_visit_summary_issue_insert AFTER INSERT ON Issue
+BEGIN
+    UPDATE Visit_Summary SET
+        issue_count = issue_count + 1,
+        num_critical = num_critical + NEW.severity
+    WHERE visit_id = NEW.visit_id;
+END;
+
+CREATE TRIGGER trg_visit_summary_issue_update AFTER UPDATE OF visit_id, severity ON Issue
+BEGIN
+    UPDATE Visit_Summary SET
+        issue_count = issue_count - 1,
+        num_critical = num_critical - OLD.severity
+    WHERE visit_id = OLD.visit_id;
+    UPDATE Visit_Summary SET
+        issue_count = issue_count + 1,
+        num_critical = num_critical + NEW.severity
+    WHERE visit_id = NEW.visit_id;
+END;
+
+CREATE TRIGGER trg_visit_summary_issue_delete AFTER DELETE ON Issue
+BEGIN
+    UPDATE Visit_Summary SET
+        issue_count = issue_count - 1,
+        num_critical = num_critical - OLD.severity
+    WHERE visit_id = OLD.visit_id;
+END;
+
+-- Suggestions: open until the student reports back
+CREATE TRIGGER trg_visit_summary_suggestion_insert AFTER INSERT ON Suggestion
+BEGIN
+    UPDATE Visit_Summary SET
+        open_suggestions = open_suggestions + (NEW.student_report IS NULL OR NEW.student_report = '')
+    WHERE visit_id = NEW.visit_id;
+END;
+
+CREATE TRIGGER trg_visit_summary_suggestion_update AFTER UPDATE OF visit_id, student_report ON Suggestion
+BEGIN
+    UPDATE Visit_Summary SET
+        open_suggestions = open_suggestions - (OLD.student_report IS NULL OR OLD.student_report = '')
+    WHERE visit_id = OLD.visit_id;
+    UPDATE Visit_Summary SET
+        open_suggestions = open_suggestions + (NEW.student_report IS NULL OR NEW.student_report = '')
+    WHERE visit_id = NEW.visit_id;
+END;
+
+CREATE TRIGGER trg_visit_summary_suggestion_delete AFTER DELETE ON Suggestion
+BEGIN
+    UPDATE Visit_Summary SET
+        open_suggestions = open_suggestions - (OLD.student_report IS NULL OR OLD.student_report = '')
+    WHERE visit_id = OLD.visit_id;
+END;
+
+-- Generation counter, like every other table (see 004)
+INSERT INTO Table_Generation (table_name) VALUES ('Visit_Summary');
+
+CREATE TRIGGER trg_visit_summary_generation_insert AFTER INSERT ON Visit_Summary
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Visit_Summary';
+END;
+
+CREATE TRIGGER trg_visit_summary_generation_update AFTER UPDATE ON Visit_Summary
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Visit_Summary';
+END;
+
+CREATE TRIGGER trg_visit_summary_generation_delete AFTER DELETE ON Visit_Summary
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Visit_Summary';
+END;
@@ -0,0 +1,346 @@
+-- -----------------------------
+-- COURSE-STATS
+-- Per-course counters for the courses list and report 17: enrolled students,
+-- coursework issues, and distinct students with coursework difficulty.
+--
+-- The distinct count can't be kept with a plain counter, so Course_Difficulty
+-- holds, for every (student, course) pair reachable through
+-- Coursework -> Issue -> Visit -> Student, how many coursework rows link them.
+-- The triggers on each of those tables add or subtract the paths the changed row
+-- took part in, and a pair is dropped when its count reaches zero. Course_Stats'
+-- num_difficulty_students then follows Course_Difficulty's inserts and deletes.
+-- DERIVED_TABLES in app.py holds the same computations for `flask check-derived`.
+-- -----------------------------
+CREATE TABLE Course_Difficulty (
+    student_id INT NOT NULL,
+    course_id INT NOT NULL,
+    refs INT NOT NULL,
+    PRIMARY KEY (student_id, course_id)
+) WITHOUT ROWID;
+
+INSERT INTO Course_Difficulty (student_id, course_id, refs)
+SELECT v.student_id, cw.course_id, COUNT(*)
+FROM Coursework cw
+JOIN Issue i ON i.issue_id = cw.issue_id
+JOIN Visit v ON v.visit_id = i.visit_id
+JOIN Student s ON s.student_id = v.student_id
+GROUP BY v.student_id, cw.course_id;
+
+-- Almost always empty; lets the triggers find pairs that dropped to zero
+CREATE INDEX idx_course_difficulty_unused ON Course_Difficulty(refs) WHERE refs <= 0;
+
+CREATE TABLE Course_Stats (
+    course_id INT PRIMARY KEY,
+    num_students INT NOT NULL DEFAULT 0,
+    num_issues INT NOT NULL DEFAULT 0,
+    num_difficulty_students INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (course_id) REFERENCES Course(course_id)
+);
+
+INSERT INTO Course_Stats (course_id, num_students, num_issues, num_difficulty_students)
+SELECT
+    c.course_id,
+    (SELECT COUNT(*) FROM Student_Course sc WHERE sc.course_id = c.course_id),
+    (SELECT COUNT(*) FROM Coursework cw WHERE cw.course_id = c.course_id),
+    (SELECT COUNT(*) FROM Course_Difficulty cd WHERE cd.course_id = c.course_id)
+FROM Course c;
+
+CREATE INDEX idx_course_stats_students ON Course_Stats(num_students);
+CREATE INDEX idx_course_stats_issues ON Course_Stats(num_issues);
+CREATE INDEX idx_course_stats_difficulty ON Course_Stats(num_difficulty_students);
+CREATE INDEX idx_course_difficulty_course ON Course_Difficulty(course_id);
+
+-- Courses: a new course starts from whatever already points at it
+CREATE TRIGGER trg_course_stats_course_insert AFTER INSERT ON Course
+BEGIN
+    INSERT INTO Course_Stats (course_id, num_students, num_issues, num_difficulty_students)
+    SELECT
+        NEW.course_id,
+        (SELECT COUNT(*) FROM Student_Course sc WHERE sc.course_id = NEW.course_id),
+        (SELECT COUNT(*) FROM Coursework cw WHERE cw.course_id = NEW.course_id),
+        (SELECT COUNT(*) FROM Course_Difficulty cd WHERE cd.course_id = NEW.course_id);
+END;
+
+CREATE TRIGGER trg_course_stats_course_update AFTER UPDATE OF course_id ON Course
+BEGIN
+    DELETE FROM Course_Stats WHERE course_id = OLD.course_id;
+    INSERT INTO Course_Stats (course_id, num_students, num_issues, num_difficulty_students)
+    SELECT
+        NEW.course_id,
+        (SELECT COUNT(*) FROM Student_Course sc WHERE sc.course_id = NEW.course_id),
+        (SELECT COUNT(*) FROM Coursework cw WHERE cw.course_id = NEW.course_id),
+        (SELECT COUNT(*) FROM Course_Difficulty cd WHERE cd.course_id = NEW.course_id);
+END;
+
+CREATE TRIGGER trg_course_stats_course_delete AFTER DELETE ON Course
+BEGIN
+    DELETE FROM Course_Stats WHERE course_id = OLD.course_id;
+END;
+
+-- Enrolments
+CREATE TRIGGER trg_course_stats_student_course_insert AFTER INSERT ON Student_Course
+BEGIN
+    UPDATE Course_Stats SET num_students = num_students + 1 WHERE course_id = NEW.course_id;
+END;
+
+CREATE TRIGGER trg_course_stats_student_course_update AFTER UPDATE OF course_id ON Student_Course
+BEGIN
+    UPDATE Course_Stats SET num_students = num_students - 1 WHERE course_id = OLD.course_id;
+    UPDATE Course_Stats SET num_students = num_students + 1 WHERE course_id = NEW.course_id;
+END;
+
+CREATE TRIGGER trg_course_stats_student_course_delete AFTER DELETE ON Student_Course
+BEGIN
+    UPDATE Course_Stats SET num_students = num_students - 1 WHERE course_id = OLD.course_id;
+END;
+
+-- Coursework issue counts
+CREATE TRIGGER trg_course_stats_coursework_insert AFTER INSERT ON Coursework
+BEGIN
+    UPDATE Course_Stats SET num_issues = num_issues + 1 WHERE course_id = NEW.course_id;
+END;
+
+CREATE TRIGGER trg_course_stats_coursework_update AFTER UPDATE OF course_id ON Coursework
+BEGIN
+    UPDATE Course_Stats SET num_issues = num_issues - 1 WHERE course_id = OLD.course_id;
+    UPDATE Course_Stats SET num_issues = num_issues + 1 WHERE course_id = NEW.course_id;
+END;
+
+CREATE TRIGGER trg_course_stats_coursework_delete AFTER DELETE ON Coursework
+BEGIN
+    UPDATE Course_Stats SET num_issues = num_issues - 1 WHERE course_id = OLD.course_id;
+END;
+
+-- Distinct students with difficulty follow the pairs in Course_Difficulty
+CREATE TRIGGER trg_course_stats_difficulty_insert AFTER INSERT ON Course_Difficulty
+BEGIN
+    UPDATE Course_Stats SET num_difficulty_students = num_difficulty_students + 1
+    WHERE course_id = NEW.course_id;
+END;
+
+CREATE TRIGGER trg_course_stats_difficulty_delete AFTER DELETE ON Course_Difficulty
+BEGIN
+    UPDATE Course_Stats SET num_difficulty_students = num_difficulty_students - 1
+    WHERE course_id = OLD.course_id;
+END;
+
+-- Coursework: the (student, course) pair it links, via its issue and visit
+CREATE TRIGGER trg_course_difficulty_coursework_insert AFTER INSERT ON Coursework
+BEGIN
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT v.student_id, NEW.course_id, COUNT(*)
+        FROM Issue i
+        JOIN Visit v ON v.visit_id = i.visit_id
+        JOIN Student s ON s.student_id = v.student_id
+        WHERE i.issue_id = NEW.issue_id
+        GROUP BY v.student_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+END;
+
+CREATE TRIGGER trg_course_difficulty_coursework_update AFTER UPDATE OF course_id, issue_id ON Coursework
+BEGIN
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT v.student_id, OLD.course_id, -COUNT(*)
+        FROM Issue i
+        JOIN Visit v ON v.visit_id = i.visit_id
+        JOIN Student s ON s.student_id = v.student_id
+        WHERE i.issue_id = OLD.issue_id
+        GROUP BY v.student_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT v.student_id, NEW.course_id, COUNT(*)
+        FROM Issue i
+        JOIN Visit v ON v.visit_id = i.visit_id
+        JOIN Student s ON s.student_id = v.student_id
+        WHERE i.issue_id = NEW.issue_id
+        GROUP BY v.student_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+    DELETE FROM Course_Difficulty WHERE refs <= 0;
+END;
+
+CREATE TRIGGER trg_course_difficulty_coursework_delete AFTER DELETE ON Coursework
+BEGIN
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT v.student_id, OLD.course_id, -COUNT(*)
+        FROM Issue i
+        JOIN Visit v ON v.visit_id = i.visit_id
+        JOIN Student s ON s.student_id = v.student_id
+        WHERE i.issue_id = OLD.issue_id
+        GROUP BY v.student_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+    DELETE FROM Course_Difficulty WHERE refs <= 0;
+END;
+
+-- Issues: every coursework row filed under the issue
+CREATE TRIGGER trg_course_difficulty_issue_insert AFTER INSERT ON Issue
+BEGIN
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT v.student_id, cw.course_id, COUNT(*)
+        FROM Coursework cw
+        JOIN Visit v ON v.visit_id = NEW.visit_id
+        JOIN Student s ON s.student_id = v.student_id
+        WHERE cw.issue_id = NEW.issue_id
+        GROUP BY v.student_id, cw.course_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+END;
+
+CREATE TRIGGER trg_course_difficulty_issue_update AFTER UPDATE OF issue_id, visit_id ON Issue
+BEGIN
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT v.student_id, cw.course_id, -COUNT(*)
+        FROM Coursework cw
+        JOIN Visit v ON v.visit_id = OLD.visit_id
+        JOIN Student s ON s.student_id = v.student_id
+        WHERE cw.issue_id = OLD.issue_id
+        GROUP BY v.student_id, cw.course_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT v.student_id, cw.course_id, COUNT(*)
+        FROM Coursework cw
+        JOIN Visit v ON v.visit_id = NEW.visit_id
+        JOIN Student s ON s.student_id = v.student_id
+        WHERE cw.issue_id = NEW.issue_id
+        GROUP BY v.student_id, cw.course_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+    DELETE FROM Course_Difficulty WHERE refs <= 0;
+END;
+
+CREATE TRIGGER trg_course_difficulty_issue_delete AFTER DELETE ON Issue
+BEGIN
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT v.student_id, cw.course_id, -COUNT(*)
+        FROM Coursework cw
+        JOIN Visit v ON v.visit_id = OLD.visit_id
+        JOIN Student s ON s.student_id = v.student_id
+        WHERE cw.issue_id = OLD.issue_id
+        GROUP BY v.student_id, cw.course_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+    DELETE FROM Course_Difficulty WHERE refs <= 0;
+END;
+
+-- Visits: every coursework row filed under the visit's issues
+CREATE TRIGGER trg_course_difficulty_visit_insert AFTER INSERT ON Visit
+BEGIN
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT s.student_id, cw.course_id, COUNT(*)
+        FROM Coursework cw
+        JOIN Issue i ON i.issue_id = cw.issue_id
+        JOIN Student s ON s.student_id = NEW.student_id
+        WHERE i.visit_id = NEW.visit_id
+        GROUP BY s.student_id, cw.course_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+END;
+
+CREATE TRIGGER trg_course_difficulty_visit_update AFTER UPDATE OF visit_id, student_id ON Visit
+BEGIN
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT s.student_id, cw.course_id, -COUNT(*)
+        FROM Coursework cw
+        JOIN Issue i ON i.issue_id = cw.issue_id
+        JOIN Student s ON s.student_id = OLD.student_id
+        WHERE i.visit_id = OLD.visit_id
+        GROUP BY s.student_id, cw.course_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT s.student_id, cw.course_id, COUNT(*)
+        FROM Coursework cw
+        JOIN Issue i ON i.issue_id = cw.issue_id
+        JOIN Student s ON s.student_id = NEW.student_id
+        WHERE i.visit_id = NEW.visit_id
+        GROUP BY s.student_id, cw.course_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+    DELETE FROM Course_Difficulty WHERE refs <= 0;
+END;
+
+CREATE TRIGGER trg_course_difficulty_visit_delete AFTER DELETE ON Visit
+BEGIN
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT s.student_id, cw.course_id, -COUNT(*)
+        FROM Coursework cw
+        JOIN Issue i ON i.issue_id = cw.issue_id
+        JOIN Student s ON s.student_id = OLD.student_id
+        WHERE i.visit_id = OLD.visit_id
+        GROUP BY s.student_id, cw.course_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+    DELETE FROM Course_Difficulty WHERE refs <= 0;
+END;
+
+-- Students: pairs only count while the student exists
+CREATE TRIGGER trg_course_difficulty_student_insert AFTER INSERT ON Student
+BEGIN
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT NEW.student_id, cw.course_id, COUNT(*)
+        FROM Coursework cw
+        JOIN Issue i ON i.issue_id = cw.issue_id
+        JOIN Visit v ON v.visit_id = i.visit_id
+        WHERE v.student_id = NEW.student_id
+        GROUP BY cw.course_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+END;
+
+CREATE TRIGGER trg_course_difficulty_student_update AFTER UPDATE OF student_id ON Student
+BEGIN
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT OLD.student_id, cw.course_id, -COUNT(*)
+        FROM Coursework cw
+        JOIN Issue i ON i.issue_id = cw.issue_id
+        JOIN Visit v ON v.visit_id = i.visit_id
+        WHERE v.student_id = OLD.student_id
+        GROUP BY cw.course_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT NEW.student_id, cw.course_id, COUNT(*)
+        FROM Coursework cw
+        JOIN Issue i ON i.issue_id = cw.issue_id
+        JOIN Visit v ON v.visit_id = i.visit_id
+        WHERE v.student_id = NEW.student_id
+        GROUP BY cw.course_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+    DELETE FROM Course_Difficulty WHERE refs <= 0;
+END;
+
+CREATE TRIGGER trg_course_difficulty_student_delete AFTER DELETE ON Student
+BEGIN
+    INSERT INTO Course_Difficulty (student_id, course_id, refs)
+        SELECT OLD.student_id, cw.course_id, -COUNT(*)
+        FROM Coursework cw
+        JOIN Issue i ON i.issue_id = cw.issue_id
+        JOIN Visit v ON v.visit_id = i.visit_id
+        WHERE v.student_id = OLD.student_id
+        GROUP BY cw.course_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET refs = refs + excluded.refs;
+    DELETE FROM Course_Difficulty WHERE refs <= 0;
+END;
+
+-- Generation counters, like every other table (see 004)
+INSERT INTO Table_Generation (table_name) VALUES ('Course_Stats'), ('Course_Difficulty');
+
+CREATE TRIGGER trg_course_stats_generation_insert AFTER INSERT ON Course_Stats
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Course_Stats';
+END;
+
+CREATE TRIGGER trg_course_stats_generation_update AFTER UPDATE ON Course_Stats
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Course_Stats';
+END;
+
+CREATE TRIGGER trg_course_stats_generation_delete AFTER DELETE ON Course_Stats
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Course_Stats';
+END;
+
+CREATE TRIGGER trg_course_difficulty_generation_insert AFTER INSERT ON Course_Difficulty
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Course_Difficulty';
+END;
+
+CREATE TRIGGER trg_course_difficulty_generation_update AFTER UPDATE ON Course_Difficulty
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Course_Difficulty';
+END;
+
+CREATE TRIGGER trg_course_difficulty_generation_delete AFTER DELETE ON Course_Difficulty
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Course_Difficulty';
+END;
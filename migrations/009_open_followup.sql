@@ -0,0 +1,128 @@
+-- -----------------------------
+-- OPEN-FOLLOWUP
+-- The queue of follow-ups still to be done: one row per Followup with
+-- complete = 0, carrying the visit's date and student so a counselor's queue is
+-- read without touching Followup, Visit or Student. Completed follow-ups leave
+-- the queue, so its size tracks the open work rather than the whole history
+-- update_followup keeps appending to.
+--
+-- Keyed by (counselor_id, followup_id): follow-up ids are handed out in
+-- creation order, so a counselor's queue is one contiguous range, oldest first,
+-- and "next N for counselor X" or a per-counselor count reads only that range.
+-- student_id/visit_date are NULL while the visit doesn't exist and student_name
+-- while the student doesn't. DERIVED_TABLES in app.py holds the same
+-- computation for `flask check-derived`.
+-- -----------------------------
+CREATE TABLE Open_Followup (
+    counselor_id INT NOT NULL,
+    followup_id INT NOT NULL,
+    visit_id INT NOT NULL,
+    student_id INT,
+    student_name VARCHAR(100),
+    visit_date DATE,
+    PRIMARY KEY (counselor_id, followup_id)
+) WITHOUT ROWID;
+
+INSERT INTO Open_Followup (counselor_id, followup_id, visit_id, student_id, student_name, visit_date)
+SELECT f.counselor_id, f.followup_id, f.visit_id, v.student_id, s.name, v.date
+FROM Followup f
+LEFT JOIN Visit v ON v.visit_id = f.visit_id
+LEFT JOIN Student s ON s.student_id = v.student_id
+WHERE f.complete = 0;
+
+CREATE INDEX idx_open_followup_visit ON Open_Followup(visit_id);
+CREATE INDEX idx_open_followup_student ON Open_Followup(student_id);
+
+-- The queue replaces the partial index counselor_view used to read
+DROP INDEX IF EXISTS idx_followup_open;
+
+-- Follow-ups: in the queue exactly while complete = 0
+CREATE TRIGGER trg_open_followup_followup_insert AFTER INSERT ON Followup
+WHEN NEW.complete = 0
+BEGIN
+    INSERT INTO Open_Followup (counselor_id, followup_id, visit_id, student_id, student_name, visit_date)
+    SELECT NEW.counselor_id, NEW.followup_id, NEW.visit_id, v.student_id, s.name, v.date
+    FROM (SELECT 1)
+    LEFT JOIN Visit v ON v.visit_id = NEW.visit_id
+    LEFT JOIN Student s ON s.student_id = v.student_id;
+END;
+
+CREATE TRIGGER trg_open_followup_followup_update
+AFTER UPDATE OF followup_id, visit_id, counselor_id, complete ON Followup
+BEGIN
+    DELETE FROM Open_Followup WHERE counselor_id = OLD.counselor_id AND followup_id = OLD.followup_id;
+    INSERT INTO Open_Followup (counselor_id, followup_id, visit_id, student_id, student_name, visit_date)
+    SELECT NEW.counselor_id, NEW.followup_id, NEW.visit_id, v.student_id, s.name, v.date
+    FROM (SELECT 1)
+    LEFT JOIN Visit v ON v.visit_id = NEW.visit_id
+    LEFT JOIN Student s ON s.student_id = v.student_id
+    WHERE NEW.complete = 0;
+END;
+
+CREATE TRIGGER trg_open_followup_followup_delete AFTER DELETE ON Followup
+WHEN OLD.complete = 0
+BEGIN
+    DELETE FROM Open_Followup WHERE counselor_id = OLD.counselor_id AND followup_id = OLD.followup_id;
+END;
+
+-- Visits: the date and student copied onto their open follow-ups
+CREATE TRIGGER trg_open_followup_visit_insert AFTER INSERT ON Visit
+BEGIN
+    UPDATE Open_Followup SET
+        student_id = NEW.student_id,
+        student_name = (SELECT name FROM Student WHERE student_id = NEW.student_id),
+        visit_date = NEW.date
+    WHERE visit_id = NEW.visit_id;
+END;
+
+CREATE TRIGGER trg_open_followup_visit_update AFTER UPDATE OF visit_id, student_id, date ON Visit
+BEGIN
+    UPDATE Open_Followup SET student_id = NULL, student_name = NULL, visit_date = NULL
+    WHERE visit_id = OLD.visit_id;
+    UPDATE Open_Followup SET
+        student_id = NEW.student_id,
+        student_name = (SELECT name FROM Student WHERE student_id = NEW.student_id),
+        visit_date = NEW.date
+    WHERE visit_id = NEW.visit_id;
+END;
+
+CREATE TRIGGER trg_open_followup_visit_delete AFTER DELETE ON Visit
+BEGIN
+    UPDATE Open_Followup SET student_id = NULL, student_name = NULL, visit_date = NULL
+    WHERE visit_id = OLD.visit_id;
+END;
+
+-- Students: the name copied onto the open follow-ups of their visits
+CREATE TRIGGER trg_open_followup_student_insert AFTER INSERT ON Student
+BEGIN
+    UPDATE Open_Followup SET student_name = NEW.name WHERE student_id = NEW.student_id;
+END;
+
+CREATE TRIGGER trg_open_followup_student_update AFTER UPDATE OF student_id, name ON Student
+BEGIN
+    UPDATE Open_Followup SET student_name = NULL WHERE student_id = OLD.student_id;
+    UPDATE Open_Followup SET student_name = NEW.name WHERE student_id = NEW.student_id;
+END;
+
+CREATE TRIGGER trg_open_followup_student_delete AFTER DELETE ON Student
+BEGIN
+    UPDATE Open_Followup SET student_name = NULL WHERE student_id = OLD.student_id;
+END;
+
+-- Generation counter, like every other table (see 004)
+INSERT INTO Table_Generation (table_name) VALUES ('Open_Followup');
+
+CREATE TRIGGER trg_open_followup_generation_insert AFTER INSERT ON Open_Followup
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Open_Followup';
+END;
+
+CREATE TRIGGER trg_open_followup_generation_update AFTER UPDATE ON Open_Followup
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Open_Followup';
+END;
+
+CREATE TRIGGER trg_open_followup_generation_delete AFTER DELETE ON Open_Followup
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Open_Followup';
+END;
@@ -0,0 +1,303 @@
+-- -----------------------------
+-- OUTSTANDING-ITEM
+-- One ledger of everything a student still has to report back on: every
+-- Suggestion, Referral, Financial and Coursework row whose student_reported_at
+-- is NULL or empty, with the issue, visit and student it belongs to. Report 10,
+-- the visits list's "report needed" flag and the per-student overdue count all
+-- read it instead of unioning the four tables.
+--
+-- created_at is the item's own created_at, or the visit date for suggestions,
+-- which have none. Dates are stored as typed (usually M/D/YYYY), so opened_on
+-- gives the same date as YYYY-MM-DD for ordering by age.
+-- issue_id is NULL for suggestions (they hang off the visit), visit_id while the
+-- issue doesn't exist and student_id while the visit doesn't.
+-- DERIVED_TABLES in app.py holds the same computation for `flask check-derived`.
+-- -----------------------------
+CREATE TABLE Outstanding_Item (
+    source VARCHAR(20) NOT NULL,
+    item_id INT NOT NULL,
+    issue_id INT,
+    visit_id INT,
+    student_id INT,
+    created_at DATE,
+    opened_on DATE GENERATED ALWAYS AS (
+        CASE WHEN created_at LIKE '%/%/%' THEN printf('%04d-%02d-%02d',
+            CAST(substr(substr(created_at, instr(created_at, '/') + 1),
+                        instr(substr(created_at, instr(created_at, '/') + 1), '/') + 1) AS INT),
+            CAST(substr(created_at, 1, instr(created_at, '/') - 1) AS INT),
+            CAST(substr(substr(created_at, instr(created_at, '/') + 1), 1,
+                        instr(substr(created_at, instr(created_at, '/') + 1), '/') - 1) AS INT))
+        ELSE created_at END
+    ) VIRTUAL,
+    PRIMARY KEY (source, item_id)
+) WITHOUT ROWID;
+
+INSERT INTO Outstanding_Item (source, item_id, issue_id, visit_id, student_id, created_at)
+SELECT 'Suggestion', sg.suggestion_id, NULL, sg.visit_id, v.student_id, v.date
+FROM Suggestion sg
+LEFT JOIN Visit v ON v.visit_id = sg.visit_id
+WHERE sg.student_reported_at IS NULL OR sg.student_reported_at = ''
+UNION ALL
+SELECT 'Referral', r.referral_id, r.issue_id, i.visit_id, v.student_id, r.created_at
+FROM Referral r
+LEFT JOIN Issue i ON i.issue_id = r.issue_id
+LEFT JOIN Visit v ON v.visit_id = i.visit_id
+WHERE r.student_reported_at IS NULL OR r.student_reported_at = ''
+UNION ALL
+SELECT 'Financial', f.financial_id, f.issue_id, i.visit_id, v.student_id, f.created_at
+FROM Financial f
+LEFT JOIN Issue i ON i.issue_id = f.issue_id
+LEFT JOIN Visit v ON v.visit_id = i.visit_id
+WHERE f.student_reported_at IS NULL OR f.student_reported_at = ''
+UNION ALL
+SELECT 'Coursework', cw.coursework_id, cw.issue_id, i.visit_id, v.student_id, cw.created_at
+FROM Coursework cw
+LEFT JOIN Issue i ON i.issue_id = cw.issue_id
+LEFT JOIN Visit v ON v.visit_id = i.visit_id
+WHERE cw.student_reported_at IS NULL OR cw.student_reported_at = '';
+
+CREATE INDEX idx_outstanding_student ON Outstanding_Item(student_id, opened_on);
+CREATE INDEX idx_outstanding_opened ON Outstanding_Item(opened_on);
+CREATE INDEX idx_outstanding_visit ON Outstanding_Item(visit_id);
+CREATE INDEX idx_outstanding_issue ON Outstanding_Item(issue_id);
+
+-- Suggestions: outstanding while student_reported_at is empty
+CREATE TRIGGER trg_outstanding_suggestion_insert AFTER INSERT ON Suggestion
+WHEN NEW.student_reported_at IS NULL OR NEW.student_reported_at = ''
+BEGIN
+    INSERT INTO Outstanding_Item (source, item_id, issue_id, visit_id, student_id, created_at)
+    SELECT 'Suggestion', NEW.suggestion_id, NULL, NEW.visit_id, v.student_id, v.date
+    FROM (SELECT 1)
+    LEFT JOIN Visit v ON v.visit_id = NEW.visit_id;
+END;
+
+CREATE TRIGGER trg_outstanding_suggestion_update
+AFTER UPDATE OF suggestion_id, visit_id, student_reported_at ON Suggestion
+BEGIN
+    DELETE FROM Outstanding_Item WHERE source = 'Suggestion' AND item_id = OLD.suggestion_id;
+    INSERT INTO Outstanding_Item (source, item_id, issue_id, visit_id, student_id, created_at)
+    SELECT 'Suggestion', NEW.suggestion_id, NULL, NEW.visit_id, v.student_id, v.date
+    FROM (SELECT 1)
+    LEFT JOIN Visit v ON v.visit_id = NEW.visit_id
+    WHERE NEW.student_reported_at IS NULL OR NEW.student_reported_at = '';
+END;
+
+CREATE TRIGGER trg_outstanding_suggestion_delete AFTER DELETE ON Suggestion
+BEGIN
+    DELETE FROM Outstanding_Item WHERE source = 'Suggestion' AND item_id = OLD.suggestion_id;
+END;
+
+-- Referrals, financial and coursework items: same, reached through their issue
+CREATE TRIGGER trg_outstanding_referral_insert AFTER INSERT ON Referral
+WHEN NEW.student_reported_at IS NULL OR NEW.student_reported_at = ''
+BEGIN
+    INSERT INTO Outstanding_Item (source, item_id, issue_id, visit_id, student_id, created_at)
+    SELECT 'Referral', NEW.referral_id, NEW.issue_id, i.visit_id, v.student_id, NEW.created_at
+    FROM (SELECT 1)
+    LEFT JOIN Issue i ON i.issue_id = NEW.issue_id
+    LEFT JOIN Visit v ON v.visit_id = i.visit_id;
+END;
+
+CREATE TRIGGER trg_outstanding_referral_update
+AFTER UPDATE OF referral_id, issue_id, created_at, student_reported_at ON Referral
+BEGIN
+    DELETE FROM Outstanding_Item WHERE source = 'Referral' AND item_id = OLD.referral_id;
+    INSERT INTO Outstanding_Item (source, item_id, issue_id, visit_id, student_id, created_at)
+    SELECT 'Referral', NEW.referral_id, NEW.issue_id, i.visit_id, v.student_id, NEW.created_at
+    FROM (SELECT 1)
+    LEFT JOIN Issue i ON i.issue_id = NEW.issue_id
+    LEFT JOIN Visit v ON v.visit_id = i.visit_id
+    WHERE NEW.student_reported_at IS NULL OR NEW.student_reported_at = '';
+END;
+
+CREATE TRIGGER trg_outstanding_referral_delete AFTER DELETE ON Referral
+BEGIN
+    DELETE FROM Outstanding_Item WHERE source = 'Referral' AND item_id = OLD.referral_id;
+END;
+
+CREATE TRIGGER trg_outstanding_financial_insert AFTER INSERT ON Financial
+WHEN NEW.student_reported_at IS NULL OR NEW.student_reported_at = ''
+BEGIN
+    INSERT INTO Outstanding_Item (source, item_id, issue_id, visit_id, student_id, created_at)
+    SELECT 'Financial', NEW.financial_id, NEW.issue_id, i.visit_id, v.student_id, NEW.created_at
+    FROM (SELECT 1)
+    LEFT JOIN Issue i ON i.issue_id = NEW.issue_id
+    LEFT JOIN Visit v ON v.visit_id = i.visit_id;
+END;
+
+CREATE TRIGGER trg_outstanding_financial_update
+AFTER UPDATE OF financial_id, issue_id, created_at, student_reported_at ON Financial
+BEGIN
+    DELETE FROM Outstanding_Item WHERE source = 'Financial' AND item_id = OLD.financial_id;
+    INSERT INTO Outstanding_Item (source, item_id, issue_id, visit_id, student_id, created_at)
+    SELECT 'Financial', NEW.financial_id, NEW.issue_id, i.visit_id, v.student_id, NEW.created_at
+    FROM (SELECT 1)
+    LEFT JOIN Issue i ON i.issue_id = NEW.issue_id
+    LEFT JOIN Visit v ON v.visit_id = i.visit_id
+    WHERE NEW.student_reported_at IS NULL OR NEW.student_reported_at = '';
+END;
+
+CREATE TRIGGER trg_outstanding_financial_delete AFTER DELETE ON Financial
+BEGIN
+    DELETE FROM Outstanding_Item WHERE source = 'Financial' AND item_id = OLD.financial_id;
+END;
+
+CREATE TRIGGER trg_outstanding_coursework_insert AFTER INSERT ON Coursework
+WHEN NEW.student_reported_at IS NULL OR NEW.student_reported_at = ''
+BEGIN
+    INSERT INTO Outstanding_Item (source, item_id, issue_id, visit_id, student_id, created_at)
+    SELECT 'Coursework', NEW.coursework_id, NEW.issue_id, i.visit_id, v.student_id, NEW.created_at
+    FROM (SELECT 1)
+    LEFT JOIN Issue i ON i.issue_id = NEW.issue_id
+    LEFT JOIN Visit v ON v.visit_id = i.visit_id;
+END;
+
+CREATE TRIGGER trg_outstanding_coursework_update
+AFTER UPDATE OF coursework_id, issue_id, created_at, student_reported_at ON Coursework
+BEGIN
+    DELETE FROM Outstanding_Item WHERE source = 'Coursework' AND item_id = OLD.coursework_id;
+    INSERT INTO Outstanding_Item (source, item_id, issue_id, visit_id, student_id, created_at)
+    SELECT 'Coursework', NEW.coursework_id, NEW.issue_id, i.visit_id, v.student_id, NEW.created_at
+    FROM (SELECT 1)
+    LEFT JOIN Issue i ON i.issue_id = NEW.issue_id
+    LEFT JOIN Visit v ON v.visit_id = i.visit_id
+    WHERE NEW.student_reported_at IS NULL OR NEW.student_reported_at = '';
+END;
+
+CREATE TRIGGER trg_outstanding_coursework_delete AFTER DELETE ON Coursework
+BEGIN
+    DELETE FROM Outstanding_Item WHERE source = 'Coursework' AND item_id = OLD.coursework_id;
+END;
+
+-- Issues: the visit (and so the student) of the items hanging off them
+CREATE TRIGGER trg_outstanding_issue_insert AFTER INSERT ON Issue
+BEGIN
+    UPDATE Outstanding_Item SET
+        visit_id = NEW.visit_id,
+        student_id = (SELECT student_id FROM Visit WHERE visit_id = NEW.visit_id)
+    WHERE issue_id = NEW.issue_id;
+END;
+
+CREATE TRIGGER trg_outstanding_issue_update AFTER UPDATE OF issue_id, visit_id ON Issue
+BEGIN
+    UPDATE Outstanding_Item SET visit_id = NULL, student_id = NULL WHERE issue_id = OLD.issue_id;
+    UPDATE Outstanding_Item SET
+        visit_id = NEW.visit_id,
+        student_id = (SELECT student_id FROM Visit WHERE visit_id = NEW.visit_id)
+    WHERE issue_id = NEW.issue_id;
+END;
+
+CREATE TRIGGER trg_outstanding_issue_delete AFTER DELETE ON Issue
+BEGIN
+    UPDATE Outstanding_Item SET visit_id = NULL, student_id = NULL WHERE issue_id = OLD.issue_id;
+END;
+
+-- Visits: the student of every item, and the date of suggestions
+CREATE TRIGGER trg_outstanding_visit_insert AFTER INSERT ON Visit
+BEGIN
+    UPDATE Outstanding_Item SET
+        student_id = NEW.student_id,
+        created_at = CASE WHEN source = 'Suggestion' THEN NEW.date ELSE created_at END
+    WHERE visit_id = NEW.visit_id;
+END;
+
+CREATE TRIGGER trg_outstanding_visit_update AFTER UPDATE OF visit_id, student_id, date ON Visit
+BEGIN
+    UPDATE Outstanding_Item SET
+        student_id = NULL,
+        created_at = CASE WHEN source = 'Suggestion' THEN NULL ELSE created_at END
+    WHERE visit_id = OLD.visit_id;
+    UPDATE Outstanding_Item SET
+        student_id = NEW.student_id,
+        created_at = CASE WHEN source = 'Suggestion' THEN NEW.date ELSE created_at END
+    WHERE visit_id = NEW.visit_id;
+END;
+
+CREATE TRIGGER trg_outstanding_visit_delete AFTER DELETE ON Visit
+BEGIN
+    UPDATE Outstanding_Item SET
+        student_id = NULL,
+        created_at = CASE WHEN source = 'Suggestion' THEN NULL ELSE created_at END
+    WHERE visit_id = OLD.visit_id;
+END;
+
+-- -----------------------------
+-- Visit_Summary (007) counted only suggestions without a student_report for the
+-- "report needed" flag. It now counts the visit's outstanding items, so the flag
+-- agrees with report 10: open_suggestions becomes open_items and follows the
+-- ledger instead of Suggestion.
+-- -----------------------------
+DROP TRIGGER trg_visit_summary_suggestion_insert;
+DROP TRIGGER trg_visit_summary_suggestion_update;
+DROP TRIGGER trg_visit_summary_suggestion_delete;
+DROP TRIGGER trg_visit_summary_visit_insert;
+DROP TRIGGER trg_visit_summary_visit_update;
+DROP INDEX idx_visit_summary_open;
+
+ALTER TABLE Visit_Summary RENAME COLUMN open_suggestions TO open_items;
+
+UPDATE Visit_Summary SET
+    open_items = (SELECT COUNT(*) FROM Outstanding_Item o WHERE o.visit_id = Visit_Summary.visit_id);
+
+CREATE INDEX idx_visit_summary_open ON Visit_Summary(open_items);
+
+CREATE TRIGGER trg_visit_summary_visit_insert AFTER INSERT ON Visit
+BEGIN
+    INSERT INTO Visit_Summary (visit_id, student_id, date, mode, issue_count, num_critical, open_items)
+    SELECT
+        NEW.visit_id,
+        NEW.student_id,
+        NEW.date,
+        NEW.mode,
+        (SELECT COUNT(*) FROM Issue i WHERE i.visit_id = NEW.visit_id),
+        (SELECT COALESCE(SUM(i.severity), 0) FROM Issue i WHERE i.visit_id = NEW.visit_id),
+        (SELECT COUNT(*) FROM Outstanding_Item o WHERE o.visit_id = NEW.visit_id);
+END;
+
+CREATE TRIGGER trg_visit_summary_visit_update AFTER UPDATE ON Visit
+BEGIN
+    DELETE FROM Visit_Summary WHERE visit_id = OLD.visit_id;
+    INSERT INTO Visit_Summary (visit_id, student_id, date, mode, issue_count, num_critical, open_items)
+    SELECT
+        NEW.visit_id,
+        NEW.student_id,
+        NEW.date,
+        NEW.mode,
+        (SELECT COUNT(*) FROM Issue i WHERE i.visit_id = NEW.visit_id),
+        (SELECT COALESCE(SUM(i.severity), 0) FROM Issue i WHERE i.visit_id = NEW.visit_id),
+        (SELECT COUNT(*) FROM Outstanding_Item o WHERE o.visit_id = NEW.visit_id);
+END;
+
+CREATE TRIGGER trg_visit_summary_outstanding_insert AFTER INSERT ON Outstanding_Item
+BEGIN
+    UPDATE Visit_Summary SET open_items = open_items + 1 WHERE visit_id = NEW.visit_id;
+END;
+
+CREATE TRIGGER trg_visit_summary_outstanding_update AFTER UPDATE OF visit_id ON Outstanding_Item
+BEGIN
+    UPDATE Visit_Summary SET open_items = open_items - 1 WHERE visit_id = OLD.visit_id;
+    UPDATE Visit_Summary SET open_items = open_items + 1 WHERE visit_id = NEW.visit_id;
+END;
+
+CREATE TRIGGER trg_visit_summary_outstanding_delete AFTER DELETE ON Outstanding_Item
+BEGIN
+    UPDATE Visit_Summary SET open_items = open_items - 1 WHERE visit_id = OLD.visit_id;
+END;
+
+-- Generation counter, like every other table (see 004)
+INSERT INTO Table_Generation (table_name) VALUES ('Outstanding_Item');
+
+CREATE TRIGGER trg_outstanding_generation_insert AFTER INSERT ON Outstanding_Item
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Outstanding_Item';
+END;
+
+CREATE TRIGGER trg_outstanding_generation_update AFTER UPDATE ON Outstanding_Item
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Outstanding_Item';
+END;
+
+CREATE TRIGGER trg_outstanding_generation_delete AFTER DELETE ON Outstanding_Item
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Outstanding_Item';
+END;
@@ -0,0 +1,18 @@
+-- -----------------------------
+-- STUDENT-STATS: renumbered students
+-- 006 moved a student's counters to the new id, but their visits still point at
+-- the old one, so the counters belong to nobody. Recount the new id from the
+-- visits that point at it instead, the same way a new student is counted.
+-- -----------------------------
+DROP TRIGGER trg_student_stats_student_update;
+
+CREATE TRIGGER trg_student_stats_student_update AFTER UPDATE OF student_id ON Student
+BEGIN
+    DELETE FROM Student_Stats WHERE student_id = OLD.student_id;
+    INSERT INTO Student_Stats (student_id, num_visits, num_issues, num_critical)
+    SELECT
+        NEW.student_id,
+        (SELECT COUNT(*) FROM Visit v WHERE v.student_id = NEW.student_id),
+        (SELECT COUNT(*) FROM Visit v JOIN Issue i ON i.visit_id = v.visit_id WHERE v.student_id = NEW.student_id),
+        (SELECT COALESCE(SUM(i.severity), 0) FROM Visit v JOIN Issue i ON i.visit_id = v.visit_id WHERE v.student_id = NEW.student_id);
+END;
@@ -0,0 +1,98 @@
+-- -----------------------------
+-- DASHBOARD-COUNTER
+-- The totals on the home page, one row each, kept current by the triggers
+-- below so the page reads five rows instead of counting whole tables:
+--   students, visits        rows in Student / Visit
+--   open_followups          rows in Open_Followup (009)
+--   critical_issues         issues with severity = 1
+--   outstanding_items       rows in Outstanding_Item (010)
+-- DERIVED_TABLES in app.py holds the same computation for `flask check-derived`.
+-- -----------------------------
+CREATE TABLE Dashboard_Counter (
+    name VARCHAR(30) PRIMARY KEY,
+    value INT NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT INTO Dashboard_Counter (name, value) VALUES
+    ('students', (SELECT COUNT(*) FROM Student)),
+    ('visits', (SELECT COUNT(*) FROM Visit)),
+    ('open_followups', (SELECT COUNT(*) FROM Open_Followup)),
+    ('critical_issues', (SELECT COUNT(*) FROM Issue WHERE severity = 1)),
+    ('outstanding_items', (SELECT COUNT(*) FROM Outstanding_Item));
+
+CREATE TRIGGER trg_dashboard_student_insert AFTER INSERT ON Student
+BEGIN
+    UPDATE Dashboard_Counter SET value = value + 1 WHERE name = 'students';
+END;
+
+CREATE TRIGGER trg_dashboard_student_delete AFTER DELETE ON Student
+BEGIN
+    UPDATE Dashboard_Counter SET value = value - 1 WHERE name = 'students';
+END;
+
+CREATE TRIGGER trg_dashboard_visit_insert AFTER INSERT ON Visit
+BEGIN
+    UPDATE Dashboard_Counter SET value = value + 1 WHERE name = 'visits';
+END;
+
+CREATE TRIGGER trg_dashboard_visit_delete AFTER DELETE ON Visit
+BEGIN
+    UPDATE Dashboard_Counter SET value = value - 1 WHERE name = 'visits';
+END;
+
+CREATE TRIGGER trg_dashboard_open_followup_insert AFTER INSERT ON Open_Followup
+BEGIN
+    UPDATE Dashboard_Counter SET value = value + 1 WHERE name = 'open_followups';
+END;
+
+CREATE TRIGGER trg_dashboard_open_followup_delete AFTER DELETE ON Open_Followup
+BEGIN
+    UPDATE Dashboard_Counter SET value = value - 1 WHERE name = 'open_followups';
+END;
+
+CREATE TRIGGER trg_dashboard_issue_insert AFTER INSERT ON Issue
+WHEN NEW.severity = 1
+BEGIN
+    UPDATE Dashboard_Counter SET value = value + 1 WHERE name = 'critical_issues';
+END;
+
+CREATE TRIGGER trg_dashboard_issue_update AFTER UPDATE OF severity ON Issue
+WHEN (OLD.severity = 1) <> (NEW.severity = 1)
+BEGIN
+    UPDATE Dashboard_Counter SET value = value + (NEW.severity = 1) - (OLD.severity = 1)
+    WHERE name = 'critical_issues';
+END;
+
+CREATE TRIGGER trg_dashboard_issue_delete AFTER DELETE ON Issue
+WHEN OLD.severity = 1
+BEGIN
+    UPDATE Dashboard_Counter SET value = value - 1 WHERE name = 'critical_issues';
+END;
+
+CREATE TRIGGER trg_dashboard_outstanding_insert AFTER INSERT ON Outstanding_Item
+BEGIN
+    UPDATE Dashboard_Counter SET value = value + 1 WHERE name = 'outstanding_items';
+END;
+
+CREATE TRIGGER trg_dashboard_outstanding_delete AFTER DELETE ON Outstanding_Item
+BEGIN
+    UPDATE Dashboard_Counter SET value = value - 1 WHERE name = 'outstanding_items';
+END;
+
+-- Generation counter, like every other table (see 004)
+INSERT INTO Table_Generation (table_name) VALUES ('Dashboard_Counter');
+
+CREATE TRIGGER trg_dashboard_counter_generation_insert AFTER INSERT ON Dashboard_Counter
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Dashboard_Counter';
+END;
+
+CREATE TRIGGER trg_dashboard_counter_generation_update AFTER UPDATE ON Dashboard_Counter
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Dashboard_Counter';
+END;
+
+CREATE TRIGGER trg_dashboard_counter_generation_delete AFTER DELETE ON Dashboard_Counter
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Dashboard_Counter';
+END;
@@ -0,0 +1,135 @@
+-- -----------------------------
+-- FACET-VALUE
+-- The distinct values behind the filter dropdowns on the students and courses
+-- lists, with how many rows carry each one:
+--   country, gender, zip          Student.country_of_birth / gender / zip_code
+--   teacher, period, classroom    Course.teacher / period / classroom
+-- The triggers below add or subtract one reference as rows come, go or change
+-- value, and drop a value once nothing refers to it, so a dropdown reads only
+-- its own values. value has no declared type so periods stay integers.
+-- DERIVED_TABLES in app.py holds the same computation for `flask check-derived`.
+-- -----------------------------
+CREATE TABLE Facet_Value (
+    facet VARCHAR(20) NOT NULL,
+    value NOT NULL,
+    refs INT NOT NULL,
+    PRIMARY KEY (facet, value)
+) WITHOUT ROWID;
+
+INSERT INTO Facet_Value (facet, value, refs)
+SELECT 'country', country_of_birth, COUNT(*) FROM Student GROUP BY country_of_birth
+UNION ALL SELECT 'gender', gender, COUNT(*) FROM Student GROUP BY gender
+UNION ALL SELECT 'zip', zip_code, COUNT(*) FROM Student GROUP BY zip_code
+UNION ALL SELECT 'teacher', teacher, COUNT(*) FROM Course GROUP BY teacher
+UNION ALL SELECT 'period', period, COUNT(*) FROM Course GROUP BY period
+UNION ALL SELECT 'classroom', classroom, COUNT(*) FROM Course GROUP BY classroom;
+
+-- Students
+CREATE TRIGGER trg_facet_student_insert AFTER INSERT ON Student
+BEGIN
+    INSERT INTO Facet_Value (facet, value, refs) VALUES ('country', NEW.country_of_birth, 1)
+    ON CONFLICT (facet, value) DO UPDATE SET refs = refs + 1;
+    INSERT INTO Facet_Value (facet, value, refs) VALUES ('gender', NEW.gender, 1)
+    ON CONFLICT (facet, value) DO UPDATE SET refs = refs + 1;
+    INSERT INTO Facet_Value (facet, value, refs) VALUES ('zip', NEW.zip_code, 1)
+    ON CONFLICT (facet, value) DO UPDATE SET refs = refs + 1;
+END;
+
+CREATE TRIGGER trg_facet_student_update AFTER UPDATE OF country_of_birth, gender, zip_code ON Student
+BEGIN
+    -- country
+    INSERT INTO Facet_Value (facet, value, refs)
+    SELECT 'country', NEW.country_of_birth, 1 WHERE OLD.country_of_birth IS NOT NEW.country_of_birth
+    ON CONFLICT (facet, value) DO UPDATE SET refs = refs + 1;
+    UPDATE Facet_Value SET refs = refs - 1
+    WHERE facet = 'country' AND value = OLD.country_of_birth AND OLD.country_of_birth IS NOT NEW.country_of_birth;
+    DELETE FROM Facet_Value WHERE facet = 'country' AND value = OLD.country_of_birth AND refs <= 0;
+    -- gender
+    INSERT INTO Facet_Value (facet, value, refs)
+    SELECT 'gender', NEW.gender, 1 WHERE OLD.gender IS NOT NEW.gender
+    ON CONFLICT (facet, value) DO UPDATE SET refs = refs + 1;
+    UPDATE Facet_Value SET refs = refs - 1
+    WHERE facet = 'gender' AND value = OLD.gender AND OLD.gender IS NOT NEW.gender;
+    DELETE FROM Facet_Value WHERE facet = 'gender' AND value = OLD.gender AND refs <= 0;
+    -- zip
+    INSERT INTO Facet_Value (facet, value, refs)
+    SELECT 'zip', NEW.zip_code, 1 WHERE OLD.zip_code IS NOT NEW.zip_code
+    ON CONFLICT (facet, value) DO UPDATE SET refs = refs + 1;
+    UPDATE Facet_Value SET refs = refs - 1
+    WHERE facet = 'zip' AND value = OLD.zip_code AND OLD.zip_code IS NOT NEW.zip_code;
+    DELETE FROM Facet_Value WHERE facet = 'zip' AND value = OLD.zip_code AND refs <= 0;
+END;
+
+CREATE TRIGGER trg_facet_student_delete AFTER DELETE ON Student
+BEGIN
+    UPDATE Facet_Value SET refs = refs - 1 WHERE facet = 'country' AND value = OLD.country_of_birth;
+    DELETE FROM Facet_Value WHERE facet = 'country' AND value = OLD.country_of_birth AND refs <= 0;
+    UPDATE Facet_Value SET refs = refs - 1 WHERE facet = 'gender' AND value = OLD.gender;
+    DELETE FROM Facet_Value WHERE facet = 'gender' AND value = OLD.gender AND refs <= 0;
+    UPDATE Facet_Value SET refs = refs - 1 WHERE facet = 'zip' AND value = OLD.zip_code;
+    DELETE FROM Facet_Value WHERE facet = 'zip' AND value = OLD.zip_code AND refs <= 0;
+END;
+
+-- Courses
+CREATE TRIGGER trg_facet_course_insert AFTER INSERT ON Course
+BEGIN
+    INSERT INTO Facet_Value (facet, value, refs) VALUES ('teacher', NEW.teacher, 1)
+    ON CONFLICT (facet, value) DO UPDATE SET refs = refs + 1;
+    INSERT INTO Facet_Value (facet, value, refs) VALUES ('period', NEW.period, 1)
+    ON CONFLICT (facet, value) DO UPDATE SET refs = refs + 1;
+    INSERT INTO Facet_Value (facet, value, refs) VALUES ('classroom', NEW.classroom, 1)
+    ON CONFLICT (facet, value) DO UPDATE SET refs = refs + 1;
+END;
+
+CREATE TRIGGER trg_facet_course_update AFTER UPDATE OF teacher, period, classroom ON Course
+BEGIN
+    -- teacher
+    INSERT INTO Facet_Value (facet, value, refs)
+    SELECT 'teacher', NEW.teacher, 1 WHERE OLD.teacher IS NOT NEW.teacher
+    ON CONFLICT (facet, value) DO UPDATE SET refs = refs + 1;
+    UPDATE Facet_Value SET refs = refs - 1
+    WHERE facet = 'teacher' AND value = OLD.teacher AND OLD.teacher IS NOT NEW.teacher;
+    DELETE FROM Facet_Value WHERE facet = 'teacher' AND value = OLD.teacher AND refs <= 0;
+    -- period
+    INSERT INTO Facet_Value (facet, value, refs)
+    SELECT 'period', NEW.period, 1 WHERE OLD.period IS NOT NEW.period
+    ON CONFLICT (facet, value) DO UPDATE SET refs = refs + 1;
+    UPDATE Facet_Value SET refs = refs - 1
+    WHERE facet = 'period' AND value = OLD.period AND OLD.period IS NOT NEW.period;
+    DELETE FROM Facet_Value WHERE facet = 'period' AND value = OLD.period AND refs <= 0;
+    -- classroom
+    INSERT INTO Facet_Value (facet, value, refs)
+    SELECT 'classroom', NEW.classroom, 1 WHERE OLD.classroom IS NOT NEW.classroom
+    ON CONFLICT (facet, value) DO UPDATE SET refs = refs + 1;
+    UPDATE Facet_Value SET refs = refs - 1
+    WHERE facet = 'classroom' AND value = OLD.classroom AND OLD.classroom IS NOT NEW.classroom;
+    DELETE FROM Facet_Value WHERE facet = 'classroom' AND value = OLD.classroom AND refs <= 0;
+END;
+
+CREATE TRIGGER trg_facet_course_delete AFTER DELETE ON Course
+BEGIN
+    UPDATE Facet_Value SET refs = refs - 1 WHERE facet = 'teacher' AND value = OLD.teacher;
+    DELETE FROM Facet_Value WHERE facet = 'teacher' AND value = OLD.teacher AND refs <= 0;
+    UPDATE Facet_Value SET refs = refs - 1 WHERE facet = 'period' AND value = OLD.period;
+    DELETE FROM Facet_Value WHERE facet = 'period' AND value = OLD.period AND refs <= 0;
+    UPDATE Facet_Value SET refs = refs - 1 WHERE facet = 'classroom' AND value = OLD.classroom;
+    DELETE FROM Facet_Value WHERE facet = 'classroom' AND value = OLD.classroom AND refs <= 0;
+END;
+
+-- Generation counter, like every other table (see 004)
+INSERT INTO Table_Generation (table_name) VALUES ('Facet_Value');
+
+CREATE TRIGGER trg_facet_value_generation_insert AFTER INSERT ON Facet_Value
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Facet_Value';
+END;
+
+CREATE TRIGGER trg_facet_value_generation_update AFTER UPDATE ON Facet_Value
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Facet_Value';
+END;
+
+CREATE TRIGGER trg_facet_value_generation_delete AFTER DELETE ON Facet_Value
+BEGIN
+    UPDATE Table_Generation SET generation = generation + 1 WHERE table_name = 'Facet_Value';
+END;
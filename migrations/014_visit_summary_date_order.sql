@@ -0,0 +1,21 @@
+-- -----------------------------
+-- VISIT-SUMMARY date order
+-- Visit dates are stored as typed (usually M/D/YYYY), which doesn't sort by
+-- date. visit_on gives the same date as YYYY-MM-DD (the expression matches
+-- Outstanding_Item.opened_on in 010), and the indexes below hold the visits
+-- list's order, newest first by (visit_on, visit_id), so a page of it or a
+-- from/to date range is one index range, with or without the mode filter.
+-- -----------------------------
+ALTER TABLE Visit_Summary ADD COLUMN visit_on DATE GENERATED ALWAYS AS (
+    CASE WHEN date LIKE '%/%/%' THEN printf('%04d-%02d-%02d',
+        CAST(substr(substr(date, instr(date, '/') + 1),
+                    instr(substr(date, instr(date, '/') + 1), '/') + 1) AS INT),
+        CAST(substr(date, 1, instr(date, '/') - 1) AS INT),
+        CAST(substr(substr(date, instr(date, '/') + 1), 1,
+                    instr(substr(date, instr(date, '/') + 1), '/') - 1) AS INT))
+    ELSE date END
+) VIRTUAL;
+
+DROP INDEX idx_visit_summary_mode_date;
+CREATE INDEX idx_visit_summary_visit_on ON Visit_Summary(visit_on, visit_id);
+CREATE INDEX idx_visit_summary_mode_visit_on ON Visit_Summary(mode, visit_on, visit_id);
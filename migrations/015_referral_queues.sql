@@ -0,0 +1,52 @@
+-- -----------------------------
+-- REFERRAL / COURSEWORK / FINANCIAL pages
+-- Each section of the referrals page is paged newest first by
+-- (created_on, id). created_at is stored as typed (usually M/D/YYYY), which
+-- doesn't sort by date; created_on gives the same date as YYYY-MM-DD (the
+-- expression matches Visit_Summary.visit_on in 014). The plain indexes hold
+-- that order for all rows; the partial ones hold only the rows whose
+-- student_reported_at is still empty, i.e. the queue the "outstanding only"
+-- mode works through, so a page of it is one range of a small index however
+-- many items have been reported back.
+-- -----------------------------
+ALTER TABLE Referral ADD COLUMN created_on DATE GENERATED ALWAYS AS (
+    CASE WHEN created_at LIKE '%/%/%' THEN printf('%04d-%02d-%02d',
+        CAST(substr(substr(created_at, instr(created_at, '/') + 1),
+                    instr(substr(created_at, instr(created_at, '/') + 1), '/') + 1) AS INT),
+        CAST(substr(created_at, 1, instr(created_at, '/') - 1) AS INT),
+        CAST(substr(substr(created_at, instr(created_at, '/') + 1), 1,
+                    instr(substr(created_at, instr(created_at, '/') + 1), '/') - 1) AS INT))
+    ELSE created_at END
+) VIRTUAL;
+
+ALTER TABLE Coursework ADD COLUMN created_on DATE GENERATED ALWAYS AS (
+    CASE WHEN created_at LIKE '%/%/%' THEN printf('%04d-%02d-%02d',
+        CAST(substr(substr(created_at, instr(created_at, '/') + 1),
+                    instr(substr(created_at, instr(created_at, '/') + 1), '/') + 1) AS INT),
+        CAST(substr(created_at, 1, instr(created_at, '/') - 1) AS INT),
+        CAST(substr(substr(created_at, instr(created_at, '/') + 1), 1,
+                    instr(substr(created_at, instr(created_at, '/') + 1), '/') - 1) AS INT))
+    ELSE created_at END
+) VIRTUAL;
+
+ALTER TABLE Financial ADD COLUMN created_on DATE GENERATED ALWAYS AS (
+    CASE WHEN created_at LIKE '%/%/%' THEN printf('%04d-%02d-%02d',
+        CAST(substr(substr(created_at, instr(created_at, '/') + 1),
+                    instr(substr(created_at, instr(created_at, '/') + 1), '/') + 1) AS INT),
+        CAST(substr(created_at, 1, instr(created_at, '/') - 1) AS INT),
+        CAST(substr(substr(created_at, instr(created_at, '/') + 1), 1,
+                    instr(substr(created_at, instr(created_at, '/') + 1), '/') - 1) AS INT))
+    ELSE created_at END
+) VIRTUAL;
+
+CREATE INDEX idx_referral_created_on ON Referral (created_on, referral_id);
+CREATE INDEX idx_referral_outstanding ON Referral (created_on, referral_id)
+    WHERE student_reported_at IS NULL OR student_reported_at = '';
+
+CREATE INDEX idx_coursework_created_on ON Coursework (created_on, coursework_id);
+CREATE INDEX idx_coursework_outstanding ON Coursework (created_on, coursework_id)
+    WHERE student_reported_at IS NULL OR student_reported_at = '';
+
+CREATE INDEX idx_financial_created_on ON Financial (created_on, financial_id);
+CREATE INDEX idx_financial_outstanding ON Financial (created_on, financial_id)
+    WHERE student_reported_at IS NULL OR student_reported_at = '';
@@ -0,0 +1,86 @@
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import app as app_module  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def sample_db(tmp_path_factory):
+    """The sample database built the way the README does it: create.sql, then insert.sql."""
+    sqlite_shell = shutil.which("sqlite3")
+    if sqlite_shell is None:
+        pytest.skip("the sqlite3 command-line shell is needed to run insert.sql")
+    path = tmp_path_factory.mktemp("sample") / "student_support_center.db"
+    for script in ("create.sql", "insert.sql"):
+        with open(os.path.join(ROOT, script)) as f:
+            subprocess.run([sqlite_shell, str(path)], stdin=f, cwd=ROOT, check=True, capture_output=True)
+    return path
+
+
+@pytest.fixture
+def db_path(sample_db, tmp_path, monkeypatch):
+    """
+    A fresh copy of the sample database behind fresh connection pools, with the schema
+    flag and every in-process cache reset, so no test sees another test's data.
+    """
+    path = tmp_path / "student_support_center.db"
+    shutil.copy(sample_db, path)
+    monkeypatch.setattr(app_module, "writer", app_module.ConnectionPool(str(path), size=1))
+    monkeypatch.setattr(app_module, "readers", app_module.ConnectionPool(str(path), readonly=True))
+    monkeypatch.setattr(app_module, "_schema_ready", False)
+    for cache in (app_module._generation_stamps, app_module._lookup_cache, app_module._report_cache):
+        cache.clear()
+    monkeypatch.setitem(app_module.app.config, "TESTING", True)
+    monkeypatch.setitem(app_module.app.config, "CAPTURE_SQL", False)
+    return path
+
+
+@pytest.fixture
+def client(db_path):
+    client = app_module.app.test_client()
+    client.get("/")  # applies the migrations
+    return client
+
+
+@pytest.fixture
+def db(client, db_path):
+    """A writable connection to the test database, for adding rows behind the app's back."""
+    conn = sqlite3.connect(db_path)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def query_log(client, monkeypatch):
+    """
+    query_log(url) -> the SQL statements a GET of `url` ran, in order, traced with
+    set_trace_callback on every connection the request took from get_db().
+    """
+    def run(url):
+        statements, traced = [], set()
+        get_db = app_module.get_db
+
+        def traced_get_db(*args, **kwargs):
+            conn = get_db(*args, **kwargs)
+            if conn not in traced:
+                conn.set_trace_callback(statements.append)
+                traced.add(conn)
+            return conn
+
+        with monkeypatch.context() as patch:
+            patch.setattr(app_module, "get_db", traced_get_db)
+            response = client.get(url)
+            response.close()
+        for conn in traced:
+            conn.set_trace_callback(None)
+        assert response.status_code == 200, url
+        return statements
+    return run
@@ -0,0 +1,34 @@
+"""Conditional GET on the list pages: an unchanged page revalidates with 304, and a write to
+one of the tables behind it gives the next GET a 200 and a new ETag."""
+
+
+def test_students_page_revalidates_until_a_student_changes(client, db):
+    first = client.get("/students")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "no-cache"
+
+    unchanged = client.get("/students", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag and unchanged.get_data() == b""
+
+    # Another query string is another page, with its own ETag
+    assert client.get("/students?per_page=25", headers={"If-None-Match": etag}).status_code == 200
+
+    # A write to a table the page doesn't read leaves it valid
+    followup_id = db.execute("SELECT MIN(followup_id) FROM Followup WHERE complete = 0").fetchone()[0]
+    client.post(f"/update_followup/{followup_id}", data={"date": "3/2/2026", "notes": "done", "complete": "on"})
+    assert client.get("/students", headers={"If-None-Match": etag}).status_code == 304
+
+    student_id, dob, country, gender, zip_code = db.execute(
+        "SELECT student_id, dob, country_of_birth, gender, zip_code FROM Student ORDER BY student_id LIMIT 1"
+    ).fetchone()
+    response = client.post(f"/students/{student_id}/edit",
+                           data={"name": "Edited Student", "dob": dob, "country_of_birth": country,
+                                 "gender": gender, "consent": "on", "zip_code": zip_code})
+    assert response.status_code == 302
+
+    changed = client.get("/students", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert "Edited Student" in changed.get_data(as_text=True)
+    assert client.get("/students", headers={"If-None-Match": changed.headers["ETag"]}).status_code == 304
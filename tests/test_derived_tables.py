@@ -0,0 +1,156 @@
+"""`flask check-derived` as a test: write through the app's own routes, then compare every
+trigger-maintained table with its from-scratch computation."""
+import re
+
+import app as app_module
+
+
+def new_visit_form(student_id, counselor_id, category_id, course_id, critical=False):
+    """The new-visit form for a visit with one issue of every type and a suggestion."""
+    form = {
+        "student_id": student_id,
+        "date": "3/1/2026",
+        "mode": "virtual",
+        "counselor_ids": counselor_id,
+        "issueCount": 1,
+        "issues[0][description]": "Test issue",
+        "issues[0][categories][]": category_id,
+        "issues[0][referral]": "on",
+        "issues[0][referral_details]": "See the nurse",
+        "issues[0][coursework]": "on",
+        "issues[0][course_id]": course_id,
+        "issues[0][financial]": "on",
+        "suggestionCount": 1,
+        "suggestions[0][counselor_id]": counselor_id,
+        "suggestions[0][details]": "Keep a diary",
+    }
+    if critical:
+        form["issues[0][critical]"] = "1"
+    return form
+
+
+def student_form(student, **changes):
+    form = {key: student[key] for key in ("name", "dob", "country_of_birth", "gender", "zip_code")}
+    form["form_type"] = "basic_info"
+    form.update(changes)
+    return form
+
+
+def first(db, sql, params=()):
+    return db.execute(sql, params).fetchone()[0]
+
+
+def home_counters(client):
+    """The five totals on the home page, in the order it shows them."""
+    html = client.get("/").get_data(as_text=True)
+    names = ("students", "visits", "critical_issues", "open_followups", "outstanding_items")
+    return dict(zip(names, map(int, re.findall(r'<span class="stat-number">(\d+)</span>', html))))
+
+
+def check_derived():
+    result = app_module.app.test_cli_runner().invoke(args=["check-derived"])
+    assert result.exit_code == 0, result.output
+    for table in app_module.DERIVED_TABLES:
+        assert f"{table}: ok" in result.output, result.output
+
+
+def test_writes_keep_derived_tables_in_sync(client, db):
+    db.row_factory = app_module.sqlite3.Row
+    student = db.execute("SELECT * FROM Student ORDER BY student_id LIMIT 1").fetchone()
+    student_id = student["student_id"]
+    counselor_id = first(db, "SELECT MIN(counselor_id) FROM Counselor")
+    category_id = first(db, "SELECT MIN(category_id) FROM Category")
+    course_id = first(db, "SELECT MIN(course_id) FROM Course")
+
+    # New visits with issues, referrals, coursework, financial items and suggestions
+    for critical in (False, True):
+        response = client.post("/visits/new", data=new_visit_form(student_id, counselor_id, category_id,
+                                                                   course_id, critical))
+        assert response.status_code == 302
+    visit_id = first(db, "SELECT MAX(visit_id) FROM Visit")
+
+    # Edit a visit: move it to another student and date
+    other_id = first(db, "SELECT MAX(student_id) FROM Student")
+    response = client.post(f"/visits/{visit_id}/edit",
+                           data={"student_id": other_id, "date": "12/31/2025", "mode": "in-person",
+                                 "counselor_ids": counselor_id})
+    assert response.status_code == 302
+
+    # Follow-up: completed without a new one, and rolled over to a new open one
+    followups = [row[0] for row in db.execute(
+        "SELECT followup_id FROM Followup WHERE complete = 0 ORDER BY followup_id LIMIT 2")]
+    client.post(f"/update_followup/{followups[0]}", data={"date": "3/2/2026", "notes": "done", "complete": "on"})
+    client.post(f"/update_followup/{followups[1]}", data={"date": "3/2/2026", "notes": "call again"})
+
+    # Student report-back on a suggestion, referral, coursework and financial item of the new visit
+    issue_id = first(db, "SELECT issue_id FROM Issue WHERE visit_id = ?", (visit_id,))
+    report = {"student_report": "went", "student_reported_at": "3/3/2026"}
+    suggestion_id = first(db, "SELECT suggestion_id FROM Suggestion WHERE visit_id = ?", (visit_id,))
+    client.post(f"/suggestions/{suggestion_id}/update", data=report)
+    for table, column in (("Referral", "referral_id"), ("Coursework", "coursework_id"), ("Financial", "financial_id")):
+        item_id = first(db, f"SELECT {column} FROM {table} WHERE issue_id = ?", (issue_id,))
+        response = client.post(f"/update_{table.lower()}_inline/{item_id}", data=report)
+        assert response.status_code == 302
+
+    # Student rename and move to another country and ZIP code
+    response = client.post(f"/students/{student_id}",
+                           data=student_form(student, name="Renamed Student", country_of_birth="Iceland",
+                                             zip_code="00001"))
+    assert response.status_code == 302
+
+    # Course add and remove
+    course_ids = [row[0] for row in db.execute(
+        "SELECT course_id FROM Course WHERE course_id NOT IN "
+        "(SELECT course_id FROM Student_Course WHERE student_id = ?) ORDER BY course_id", (student_id,))]
+    client.post(f"/students/{student_id}/course/add", data={"course_id": course_ids[0]})
+    client.post(f"/students/{student_id}/course/add", data={"course_id": course_ids[1]})
+    client.post(f"/students/{student_id}/course/{course_ids[0]}/remove")
+
+    # Delete a visit (the other new one, still with its issues and follow-ups)
+    response = client.post(f"/visits/{visit_id - 1}/delete")
+    assert response.status_code == 302
+
+    # Student added, then deleted
+    client.post("/students/new", data={"name": "Short Stay", "dob": "1/1/2010", "country_of_birth": "Tuvalu",
+                                       "gender": "F", "zip_code": "99999"})
+    client.post(f"/students/{first(db, 'SELECT MAX(student_id) FROM Student')}/delete")
+
+    # No route changes a student's id, but the triggers must follow it (migration 011)
+    db.execute("UPDATE Student SET student_id = ? WHERE student_id = ?", (other_id + 1, other_id))
+    db.commit()
+
+    check_derived()
+
+
+def test_home_totals_and_facets_follow_writes(client, db):
+    counselor_id = first(db, "SELECT MIN(counselor_id) FROM Counselor WHERE counselor_id != ?",
+                         (app_module.HEAD_COUNSELOR_ID,))
+    category_id = first(db, "SELECT MIN(category_id) FROM Category")
+    course_id = first(db, "SELECT MIN(course_id) FROM Course")
+    before = home_counters(client)
+    assert set(before) == {"students", "visits", "critical_issues", "open_followups", "outstanding_items"}
+    assert "Atlantis (" not in client.get("/students").get_data(as_text=True)
+
+    client.post("/students/new", data={"name": "New Student", "dob": "1/1/2010", "country_of_birth": "Atlantis",
+                                       "gender": "F", "zip_code": "99999"})
+    student_id = first(db, "SELECT MAX(student_id) FROM Student")
+    after_student = home_counters(client)
+    assert after_student == dict(before, students=before["students"] + 1)
+    assert "Atlantis (1)" in client.get("/students").get_data(as_text=True)
+
+    # One counselor, so one open follow-up; a suggestion, referral, coursework and financial item outstanding
+    client.post("/visits/new", data=new_visit_form(student_id, counselor_id, category_id, course_id))
+    after_visit = home_counters(client)
+    assert after_visit == dict(after_student, visits=before["visits"] + 1,
+                               open_followups=before["open_followups"] + 1,
+                               outstanding_items=before["outstanding_items"] + 4)
+
+    # A critical issue adds the head counselor, and a follow-up for them
+    client.post("/visits/new", data=new_visit_form(student_id, counselor_id, category_id, course_id, critical=True))
+    after_critical = home_counters(client)
+    assert after_critical == dict(after_visit, visits=before["visits"] + 2,
+                                  critical_issues=before["critical_issues"] + 1,
+                                  open_followups=before["open_followups"] + 3,
+                                  outstanding_items=before["outstanding_items"] + 8)
+
+    check_derived()
@@ -0,0 +1,124 @@
+"""Keyset pagination: walking a list forward with Next and back with Previous visits every row
+once, in the list's order, and each section of the referrals page keeps its own place."""
+import html
+import re
+
+STUDENT_LINK = re.compile(r'href="/students/(\d+)">')
+VISIT_LINK = re.compile(r'href="/visits/(\d+)">')
+ROW_ID = re.compile(r"<tr>\s*<td>(\d+)</td>")
+PAGER_LINK = re.compile(r'<a href="([^"]+)" class="button-link secondary">(?:&larr; )?(Previous|Next)')
+REFERRAL_SECTIONS = ("Referrals", "Coursework", "Financial")
+
+
+def pager(page):
+    return {label: html.unescape(url) for url, label in PAGER_LINK.findall(page)}
+
+
+def walk(client, url, row_ids):
+    """Every page from `url` on, following Next; then back from the last page, following
+    Previous. Returns the ids in the order each walk put them, and the number of pages."""
+    forward, urls = [], []
+    while url:
+        page = client.get(url).get_data(as_text=True)
+        forward += row_ids(page)
+        urls.append(url)
+        url = pager(page).get("Next")
+
+    backward = []
+    url = pager(client.get(urls[-1]).get_data(as_text=True)).get("Previous")
+    while url:
+        page = client.get(url).get_data(as_text=True)
+        backward = row_ids(page) + backward
+        url = pager(page).get("Previous")
+    last_page = row_ids(client.get(urls[-1]).get_data(as_text=True))
+    return forward, backward + last_page, len(urls)
+
+
+def referral_sections(page):
+    """The referrals page split into its three paged sections, by heading."""
+    starts = [page.index(f"<h3>{name}</h3>") for name in REFERRAL_SECTIONS]
+    return dict(zip(REFERRAL_SECTIONS, (page[start:end] for start, end in zip(starts, starts[1:] + [None]))))
+
+
+def add_referral_items(db, count):
+    """`count` more referrals, coursework and financial items on one issue, a few per day so
+    the id breaks ties between items of the same date."""
+    issue_id = db.execute("SELECT MIN(issue_id) FROM Issue").fetchone()[0]
+    course_id = db.execute("SELECT MIN(course_id) FROM Course").fetchone()[0]
+    for table, column, extra in (("Referral", "referral_id", {"details": "ref"}),
+                                 ("Coursework", "coursework_id", {"course_id": course_id}),
+                                 ("Financial", "financial_id", {})):
+        next_id = db.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM {table}").fetchone()[0]
+        columns = [column, "issue_id", "created_at", *extra]
+        db.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [(next_id + n, issue_id, f"10/{n // 3 + 1}/2025", *extra.values()) for n in range(count)])
+    db.commit()
+
+
+def section_ids(client, url):
+    page = client.get(url).get_data(as_text=True)
+    return {name: ROW_ID.findall(section) for name, section in referral_sections(page).items()}
+
+
+def test_students_walk_matches_name_order(client, db):
+    # Enough students with one name to straddle a page boundary, so the id breaks the tie
+    next_id = db.execute("SELECT MAX(student_id) + 1 FROM Student").fetchone()[0]
+    db.executemany(
+        "INSERT INTO Student (student_id, name, dob, country_of_birth, gender, consent, zip_code) "
+        "VALUES (?, 'Jordan Same', '1/1/2010', 'Canada', 'F', 1, '10001')",
+        [(next_id + n,) for n in range(40)])
+    db.commit()
+    expected = [str(row[0]) for row in db.execute("SELECT student_id FROM Student ORDER BY name, student_id")]
+
+    forward, backward, pages = walk(client, "/students?per_page=25", STUDENT_LINK.findall)
+
+    assert pages == -(-len(expected) // 25)
+    assert forward == expected
+    assert backward == expected
+
+
+def test_visits_walk_matches_date_order(client, db):
+    date_from, date_to = "2025-09-01", "2025-10-31"
+    expected = [str(row[0]) for row in db.execute(
+        "SELECT visit_id FROM Visit_Summary WHERE visit_on BETWEEN ? AND ? ORDER BY visit_on DESC, visit_id DESC",
+        (date_from, date_to))]
+    assert 2 * 25 < len(expected) < db.execute("SELECT COUNT(*) FROM Visit").fetchone()[0]
+
+    forward, backward, pages = walk(client, f"/visits?per_page=25&from={date_from}&to={date_to}", VISIT_LINK.findall)
+
+    assert pages == -(-len(expected) // 25)
+    assert forward == expected
+    assert backward == expected
+
+
+def test_bad_cursor_shows_first_page(client, db):
+    add_referral_items(db, 30)
+    first = client.get("/students?per_page=25").get_data(as_text=True)
+    # Not base64, not JSON, the wrong number of keys, keys of the wrong type
+    for cursor in ("garbage", "!!!", "W10", "WzFd", "W3t9LCB7fV0", "W1sxXSwgWzJdXQ"):
+        response = client.get(f"/students?per_page=25&after={cursor}")
+        assert response.status_code == 200
+        assert STUDENT_LINK.findall(response.get_data(as_text=True)) == STUDENT_LINK.findall(first)
+
+    assert section_ids(client, "/referrals?per_page=25&ref_after=garbage") == section_ids(client, "/referrals?per_page=25")
+
+
+def test_referral_sections_page_independently(client, db):
+    add_referral_items(db, 30)
+    start = section_ids(client, "/referrals?per_page=25")
+    assert all(len(ids) == 25 for ids in start.values())
+
+    # Coursework to its second page, then Referrals to its second page from there
+    cw_url = pager(referral_sections(client.get("/referrals?per_page=25").get_data(as_text=True))["Coursework"])["Next"]
+    cw_moved = section_ids(client, cw_url)
+    assert cw_moved["Coursework"] != start["Coursework"]
+    assert cw_moved["Referrals"] == start["Referrals"] and cw_moved["Financial"] == start["Financial"]
+    assert section_ids(client, f"{cw_url}&ref_after=garbage&fin_before=garbage") == cw_moved
+
+    ref_url = pager(referral_sections(client.get(cw_url).get_data(as_text=True))["Referrals"])["Next"]
+    assert "cw_after=" in ref_url and "ref_after=" in ref_url
+    both_moved = section_ids(client, ref_url)
+    assert both_moved["Referrals"] not in (start["Referrals"], [])
+    assert both_moved["Coursework"] == cw_moved["Coursework"]
+    assert both_moved["Financial"] == start["Financial"]
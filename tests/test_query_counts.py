@@ -0,0 +1,97 @@
+"""The student and visit pages, and load_visit_issues behind them, run a fixed number of
+queries however many visits, issues and follow-ups there are."""
+import app as app_module
+
+
+def next_id(db, table, column):
+    return db.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM {table}").fetchone()[0]
+
+
+def add_visit(db, student_id):
+    visit_id = next_id(db, "Visit", "visit_id")
+    db.execute("INSERT INTO Visit (visit_id, student_id, date, mode) VALUES (?, ?, '3/1/2026', 'virtual')",
+               (visit_id, student_id))
+    db.commit()
+    return visit_id
+
+
+def add_issues(db, visit_id, count):
+    """`count` issues on the visit, each with two categories, all three types and a referral,
+    coursework and financial item, plus a suggestion and a follow-up per issue."""
+    counselor_id = db.execute("SELECT MIN(counselor_id) FROM Counselor").fetchone()[0]
+    course_id = db.execute("SELECT MIN(course_id) FROM Course").fetchone()[0]
+    category_ids = [row[0] for row in db.execute("SELECT category_id FROM Category ORDER BY category_id LIMIT 2")]
+    for _ in range(count):
+        issue_id = next_id(db, "Issue", "issue_id")
+        db.execute("INSERT INTO Issue (issue_id, visit_id, issue_description, severity) VALUES (?, ?, ?, 0)",
+                   (issue_id, visit_id, f"Added issue {issue_id}"))
+        db.executemany("INSERT INTO Issue_Category (issue_id, category_id) VALUES (?, ?)",
+                       [(issue_id, category_id) for category_id in category_ids])
+        db.executemany("INSERT INTO Issue_Type (issue_id, issue_type) VALUES (?, ?)",
+                       [(issue_id, issue_type) for issue_type in ("Referral", "Coursework", "Financial")])
+        db.execute("INSERT INTO Referral (referral_id, issue_id, details, created_at) VALUES (?, ?, 'ref', '3/1/2026')",
+                   (next_id(db, "Referral", "referral_id"), issue_id))
+        db.execute("INSERT INTO Coursework (coursework_id, course_id, issue_id, created_at) VALUES (?, ?, ?, '3/1/2026')",
+                   (next_id(db, "Coursework", "coursework_id"), course_id, issue_id))
+        db.execute("INSERT INTO Financial (financial_id, issue_id, created_at) VALUES (?, ?, '3/1/2026')",
+                   (next_id(db, "Financial", "financial_id"), issue_id))
+        db.execute("INSERT INTO Suggestion (suggestion_id, visit_id, counselor_id, details) VALUES (?, ?, ?, 'try')",
+                   (next_id(db, "Suggestion", "suggestion_id"), visit_id, counselor_id))
+        db.execute("INSERT INTO Followup (followup_id, visit_id, counselor_id, date, notes, complete) "
+                   "VALUES (?, ?, ?, '3/2/2026', 'call', 0)",
+                   (next_id(db, "Followup", "followup_id"), visit_id, counselor_id))
+    db.commit()
+
+
+def warm_count(client, query_log, url):
+    """Statements for `url` once the caches have caught up with the latest writes."""
+    client.get(url)
+    return len(query_log(url))
+
+
+def test_student_page_query_count_is_constant(client, db, query_log):
+    student_id = db.execute("SELECT MIN(student_id) FROM Visit").fetchone()[0]
+    url = f"/students/{student_id}"
+    before = warm_count(client, query_log, url)
+
+    for _ in range(3):
+        add_issues(db, add_visit(db, student_id), 5)
+
+    assert warm_count(client, query_log, url) == before
+    assert client.get(url).get_data(as_text=True).count("Added issue") == 15
+
+
+def test_visit_page_query_count_is_constant(client, db, query_log):
+    visit_id = db.execute("SELECT MIN(visit_id) FROM Visit").fetchone()[0]
+    url = f"/visits/{visit_id}"
+    before = warm_count(client, query_log, url)
+
+    add_issues(db, visit_id, 20)
+
+    assert warm_count(client, query_log, url) == before
+    assert client.get(url).get_data(as_text=True).count("Added issue") == 20
+
+
+def test_load_visit_issues_is_set_based(client, db):
+    visit_ids = [row[0] for row in db.execute("SELECT visit_id FROM Visit ORDER BY visit_id LIMIT 3")]
+    conn = app_module.readers.acquire()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        app_module.load_visit_issues(conn, visit_ids[:1])
+        one_visit = len(statements)
+
+        for visit_id in visit_ids:
+            add_issues(db, visit_id, 40)
+        statements.clear()
+        loaded = app_module.load_visit_issues(conn, visit_ids)
+    finally:
+        conn.set_trace_callback(None)
+        app_module.readers.release(conn)
+
+    assert len(statements) == one_visit
+    for visit_id in visit_ids:
+        added = [issue for issue in loaded[visit_id] if issue["issue_description"].startswith("Added issue")]
+        assert len(added) == 40
+        assert all(len(issue["categories"]) == 2 and len(issue["referrals"]) == 1 for issue in added)
+        assert all(issue["types"] == ["Coursework", "Financial", "Referral"] for issue in added)
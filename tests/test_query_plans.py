@@ -0,0 +1,15 @@
+"""`flask check-query-plans` as a test: crawl every page, EXPLAIN what it ran and fail on
+unexpected full scans or tables missing from REPORTS / PAGE_TABLES."""
+import app as app_module
+
+# The sample data's tables hold tens to a few hundred rows, so the command's default
+# (scans of tables under 1000 rows are ignored) would check nothing. Below 10 rows are
+# only fixed-size tables such as Dashboard_Counter, which are read whole by design.
+MIN_ROWS = 10
+
+
+def test_pages_have_no_unexpected_full_scans(db_path):
+    # db_path gives fresh pools, so every connection the crawl opens has SQL capture on
+    result = app_module.app.test_cli_runner().invoke(args=["check-query-plans", "--min-rows", str(MIN_ROWS)])
+    assert result.exit_code == 0, result.output
+    assert "No unexpected full scans." in result.output